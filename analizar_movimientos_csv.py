@@ -10,11 +10,7 @@ from datetime import datetime
 from decimal import Decimal
 import json
 
-def normalize_product_name(name):
-    """Normaliza nombre de producto para búsqueda"""
-    if not name or name == '-':
-        return ''
-    return str(name).strip().upper()
+from core.matching import ProductMatcher
 
 def parse_date(date_str):
     """Convierte fecha DD/MM/YYYY a formato SQL YYYY-MM-DD"""
@@ -56,32 +52,19 @@ def get_products_from_api():
         print(f"Error al obtener productos de API: {e}")
         return []
 
+# (lista de productos, índice): se guarda la lista misma y se compara con `is`; con id()
+# una lista nueva podría recibir el id de otra ya liberada y usar un índice ajeno
+_matcher_cache = [None, None]
+
 def find_product_match(product_name, api_products):
-    """Encuentra coincidencia de producto en la API"""
-    normalized_search = normalize_product_name(product_name)
-    
-    if not normalized_search:
-        return None
-    
-    # Búsqueda exacta
-    for product in api_products:
-        if normalize_product_name(product['name']) == normalized_search:
-            return product
-    
-    # Búsqueda por similitud
-    from difflib import SequenceMatcher
-    best_match = None
-    best_similarity = 0.8  # Umbral mínimo
-    
-    for product in api_products:
-        similarity = SequenceMatcher(None, 
-                                   normalized_search, 
-                                   normalize_product_name(product['name'])).ratio()
-        if similarity > best_similarity:
-            best_similarity = similarity
-            best_match = product
-    
-    return best_match
+    """Encuentra coincidencia de producto en la API (índice de core.matching, umbral 0.8)"""
+    # El índice se construye una vez por lista de productos, no por renglón
+    products, matcher = _matcher_cache
+    if products is not api_products:
+        matcher = ProductMatcher((p['id'], p['name'], p) for p in api_products)
+        _matcher_cache[:] = [api_products, matcher]
+    result = matcher.match(product_name)
+    return result.payload if result else None
 
 def analyze_csv_and_generate_sql():
     """Analiza el CSV y genera scripts SQL"""
@@ -57,3 +57,20 @@ class SalePaymentAdmin(admin.ModelAdmin):
     list_filter = ['payment_method', 'payment_date']
     search_fields = ['sale__sale_number', 'reference_number']
     readonly_fields = ['payment_date']
+
+from .models import StockSnapshot
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['period_end', 'product_variant', 'warehouse', 'quantity', 'unit_cost', 'total_value']
+    list_filter = ['period_end', 'warehouse']
+    search_fields = ['product_variant__sku', 'product_variant__name']
+
+from .models import StockAlert
+
+@admin.register(StockAlert)
+class StockAlertAdmin(admin.ModelAdmin):
+    list_display = ['product_variant', 'warehouse', 'level', 'status', 'quantity', 'threshold', 'created_at', 'resolved_at', 'notified_at']
+    list_filter = ['status', 'level', 'warehouse']
+    search_fields = ['product_variant__sku', 'product_variant__name']
+    raw_id_fields = ['product_variant']
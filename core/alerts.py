@@ -0,0 +1,196 @@
+"""
+Motor de alertas de existencia baja.
+
+scan_stock_alerts() compara, con una consulta por almacén, la existencia de cada fila de
+ProductWarehouseStock contra su mínimo vigente (core.stock.STOCK_THRESHOLD) y lo cruza con
+las alertas activas de StockAlert. Sólo escribe y notifica las transiciones:
+
+- sin alerta -> LOW/OUT: se abre una alerta
+- LOW <-> OUT: se resuelve la anterior y se abre otra con el nivel nuevo
+- LOW/OUT -> normal: se resuelve
+
+Las filas que siguen en el mismo estado no generan escrituras, así que el escaneo del
+catálogo completo puede correr cada pocos minutos (send_low_stock_report en Celery beat).
+
+Los eventos se entregan a los canales de STOCK_ALERT_CHANNELS (rutas a clases con
+send(events)): base de datos (las alertas quedan consultables en /api/stock-alerts/),
+correo o webhook. Un canal que falla se registra en el log y no deshace el escaneo.
+"""
+import json
+import logging
+import urllib.request
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Case, CharField, Q, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ProductWarehouseStock, StockAlert, Warehouse
+from .stock import LOW_STOCK, STOCK_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+OPENED = 'opened'
+RESOLVED = 'resolved'
+
+
+@dataclass
+class AlertEvent:
+    kind: str  # OPENED o RESOLVED
+    alert: StockAlert
+
+    def as_dict(self):
+        alert = self.alert
+        return {
+            'event': self.kind,
+            'alert_id': alert.pk,
+            'level': alert.level,
+            'variant_id': alert.product_variant_id,
+            'sku': alert.product_variant.sku,
+            'variant': alert.product_variant.name,
+            'warehouse_id': alert.warehouse_id,
+            'warehouse': alert.warehouse.name,
+            'quantity': alert.quantity,
+            'threshold': alert.threshold,
+        }
+
+
+def current_levels(warehouse_id):
+    """{variant_id: (nivel, cantidad, mínimo)} de las filas en alerta de un almacén (una consulta)"""
+    rows = (
+        ProductWarehouseStock.objects
+        .filter(warehouse_id=warehouse_id, product_variant__is_active=True, product_variant__product__is_active=True)
+        .filter(Q(quantity__lte=0) | LOW_STOCK)
+        .annotate(threshold=STOCK_THRESHOLD)
+        .annotate(level=Case(
+            When(quantity__lte=0, then=Value('OUT')),
+            default=Value('LOW'),
+            output_field=CharField(),
+        ))
+        .values_list('product_variant_id', 'level', 'quantity', 'threshold')
+    )
+    return {variant_id: (level, quantity, threshold) for variant_id, level, quantity, threshold in rows}
+
+
+@transaction.atomic
+def scan_warehouse(warehouse_id, now=None):
+    """Aplica las transiciones de un almacén; devuelve (abiertas, resueltas) como StockAlert"""
+    now = now or timezone.now()
+    levels = current_levels(warehouse_id)
+    active = {
+        alert.product_variant_id: alert
+        for alert in StockAlert.objects.select_for_update().filter(warehouse_id=warehouse_id, status='ACTIVE').order_by()
+    }
+    to_resolve = [
+        alert for variant_id, alert in active.items()
+        if variant_id not in levels or levels[variant_id][0] != alert.level
+    ]
+    to_open = [
+        StockAlert(
+            product_variant_id=variant_id, warehouse_id=warehouse_id,
+            level=level, quantity=quantity, threshold=threshold,
+        )
+        for variant_id, (level, quantity, threshold) in levels.items()
+        if variant_id not in active or active[variant_id].level != level
+    ]
+    if to_resolve:
+        StockAlert.objects.filter(pk__in=[alert.pk for alert in to_resolve]).update(status='RESOLVED', resolved_at=now)
+        for alert in to_resolve:
+            alert.status, alert.resolved_at = 'RESOLVED', now
+    opened = StockAlert.objects.bulk_create(to_open) if to_open else []
+    return opened, to_resolve
+
+
+def scan_stock_alerts(warehouse_ids=None, channels=None):
+    """Escanea los almacenes activos (o los indicados) y notifica las transiciones"""
+    warehouses = Warehouse.objects.filter(is_active=True)
+    if warehouse_ids is not None:
+        warehouses = warehouses.filter(pk__in=warehouse_ids)
+    events = []
+    for warehouse_id in warehouses.values_list('pk', flat=True):
+        opened, resolved = scan_warehouse(warehouse_id)
+        events += [AlertEvent(RESOLVED, alert) for alert in resolved]
+        events += [AlertEvent(OPENED, alert) for alert in opened]
+    if events:
+        notify(events, channels)
+    return {
+        'opened': sum(event.kind == OPENED for event in events),
+        'resolved': sum(event.kind == RESOLVED for event in events),
+    }
+
+
+# ============================================================================
+# Canales de salida
+# ============================================================================
+
+def get_channels():
+    paths = getattr(settings, 'STOCK_ALERT_CHANNELS', ['core.alerts.DatabaseChannel'])
+    return [import_string(path)() for path in paths]
+
+
+def notify(events, channels=None):
+    """Entrega los eventos a cada canal; marca notified_at si todos los canales respondieron"""
+    # nombres de variante y almacén en una sola consulta para los mensajes
+    alerts = {
+        alert.pk: alert for alert in
+        StockAlert.objects.select_related('product_variant', 'warehouse').filter(pk__in=[e.alert.pk for e in events])
+    }
+    for event in events:
+        event.alert = alerts.get(event.alert.pk, event.alert)
+    delivered = True
+    for channel in get_channels() if channels is None else channels:
+        try:
+            channel.send(events)
+        except Exception:
+            delivered = False
+            logger.exception("No se pudieron entregar %s alertas de stock por %s", len(events), type(channel).__name__)
+    if delivered:
+        StockAlert.objects.filter(pk__in=alerts).update(notified_at=timezone.now())
+    return delivered
+
+
+class DatabaseChannel:
+    """Las alertas ya quedan en StockAlert; el canal sólo deja constancia en el log"""
+
+    def send(self, events):
+        logger.info("Alertas de stock: %s", ', '.join(f"{e.kind} {e.alert.level} {e.alert.product_variant.sku}" for e in events))
+
+
+class EmailChannel:
+    """Un correo por escaneo a STOCK_ALERT_EMAILS con el backend de correo de Django"""
+
+    def send(self, events):
+        recipients = getattr(settings, 'STOCK_ALERT_EMAILS', [])
+        if not recipients:
+            return
+        opened = [e for e in events if e.kind == OPENED]
+        resolved = [e for e in events if e.kind == RESOLVED]
+        lines = [
+            f"[{'NUEVA' if e.kind == OPENED else 'RESUELTA'}] {e.alert.get_level_display()}: "
+            f"{e.alert.product_variant.sku} {e.alert.product_variant.name} en {e.alert.warehouse.name} "
+            f"(existencia {e.alert.quantity:g}, mínimo {e.alert.threshold:g})"
+            for e in opened + resolved
+        ]
+        send_mail(
+            subject=f"Alertas de stock: {len(opened)} nuevas, {len(resolved)} resueltas",
+            message='\n'.join(lines),
+            from_email=None,
+            recipient_list=recipients,
+        )
+
+
+class WebhookChannel:
+    """POST JSON con la lista de eventos a STOCK_ALERT_WEBHOOK_URL"""
+    timeout = 10
+
+    def send(self, events):
+        url = getattr(settings, 'STOCK_ALERT_WEBHOOK_URL', '')
+        if not url:
+            return
+        body = json.dumps({'events': [event.as_dict() for event in events]}).encode()
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
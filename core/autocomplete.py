@@ -0,0 +1,183 @@
+"""
+Índice de autocompletado de productos en memoria (uno por proceso worker).
+
+Indexa nombre, SKU y código de barras del producto y de sus variantes:
+- prefijos de cada palabra (un trie aplanado en dict prefijo -> ids)
+- trigramas de cada palabra, para coincidencias en medio de la palabra
+
+Se construye en la primera consulta del worker, se actualiza por producto con las
+señales post_save/post_delete de Product y ProductVariant, y se reconstruye completo
+cada AUTOCOMPLETE_REFRESH_SECONDS para recoger cambios hechos por otros procesos.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from .search import normalize_search_text
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MAX_PREFIX_LENGTH = 20
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class AutocompleteEntry:
+    __slots__ = ('data', 'name', 'codes', 'words', 'text')
+
+    def __init__(self, data, codes):
+        self.data = data
+        self.name = normalize_search_text(data['name'])
+        self.codes = {normalize_search_text(code) for code in codes if code}
+        self.words = set(self.name.split()) | self.codes
+        self.text = ' '.join(sorted(self.words))
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._prefixes = defaultdict(set)
+        self._trigrams = defaultdict(set)
+        self.built_at = None
+
+    # ==========================
+    # Construcción
+    # ==========================
+
+    @staticmethod
+    def load_entries(product_ids=None):
+        """Lee productos y variantes en dos consultas y arma las entradas"""
+        from .models import Product, ProductVariant
+        products = Product.objects.order_by()
+        variants = ProductVariant.objects.order_by('product_id', 'id')
+        if product_ids is not None:
+            products = products.filter(id__in=product_ids)
+            variants = variants.filter(product_id__in=product_ids)
+        by_product = defaultdict(list)
+        for variant in variants.values('id', 'product_id', 'sku', 'barcode', 'sale_price'):
+            by_product[variant['product_id']].append(variant)
+        entries = {}
+        for product in products.values('id', 'name', 'sku', 'barcode', 'is_active'):
+            product_variants = by_product.get(product['id'], [])
+            main = product_variants[0] if product_variants else None
+            data = {
+                'id': product['id'],
+                'name': product['name'],
+                'sku': product['sku'],
+                'barcode': product['barcode'],
+                'is_active': product['is_active'],
+                'variant_id': main['id'] if main else None,
+                'variant_sku': main['sku'] if main else None,
+                'price': main['sale_price'] if main else None,
+            }
+            codes = [product['sku'], product['barcode']]
+            for variant in product_variants:
+                codes += [variant['sku'], variant['barcode']]
+            entries[product['id']] = AutocompleteEntry(data, codes)
+        return entries
+
+    def _add(self, product_id, entry, prefixes, trigrams):
+        for word in entry.words:
+            for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+                prefixes[word[:length]].add(product_id)
+            for gram in _trigrams(word):
+                trigrams[gram].add(product_id)
+
+    def _discard(self, product_id):
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return
+        for word in entry.words:
+            for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+                self._prefixes[word[:length]].discard(product_id)
+            for gram in _trigrams(word):
+                self._trigrams[gram].discard(product_id)
+
+    def rebuild(self):
+        entries = self.load_entries()
+        prefixes, trigrams = defaultdict(set), defaultdict(set)
+        for product_id, entry in entries.items():
+            self._add(product_id, entry, prefixes, trigrams)
+        with self._lock:
+            self._entries, self._prefixes, self._trigrams = entries, prefixes, trigrams
+            self.built_at = time.monotonic()
+        return len(entries)
+
+    def ensure_built(self):
+        refresh = getattr(settings, 'AUTOCOMPLETE_REFRESH_SECONDS', 300)
+        if self.built_at is None or (refresh and time.monotonic() - self.built_at > refresh):
+            self.rebuild()
+
+    def refresh_products(self, product_ids):
+        """Actualización incremental: vuelve a leer (o elimina) solo estos productos"""
+        if self.built_at is None:
+            return  # se construirá completo en la primera consulta
+        entries = self.load_entries(product_ids)
+        with self._lock:
+            for product_id in product_ids:
+                self._discard(product_id)
+                entry = entries.get(product_id)
+                if entry is not None:
+                    self._entries[product_id] = entry
+                    self._add(product_id, entry, self._prefixes, self._trigrams)
+
+    def clear(self):
+        with self._lock:
+            self._entries, self._prefixes, self._trigrams = {}, defaultdict(set), defaultdict(set)
+            self.built_at = None
+
+    # ==========================
+    # Consulta
+    # ==========================
+
+    def _term_matches(self, term):
+        """ids cuyo alguna palabra empieza con `term`, y los que solo lo contienen"""
+        prefix = self._prefixes.get(term[:MAX_PREFIX_LENGTH], set())
+        if len(term) > MAX_PREFIX_LENGTH:
+            prefix = {pid for pid in prefix if any(w.startswith(term) for w in self._entries[pid].words)}
+        infix = set()
+        if len(term) >= 3:
+            grams = sorted((self._trigrams.get(gram, set()) for gram in _trigrams(term)), key=len)
+            infix = set.intersection(*grams) - prefix if grams else set()
+            infix = {pid for pid in infix if term in self._entries[pid].text}
+        return prefix, infix
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        self.ensure_built()
+        terms = normalize_search_text(query).split()
+        if not terms:
+            return []
+        normalized = ' '.join(terms)
+        with self._lock:
+            candidates, infix_ids = None, set()
+            for term in terms:
+                prefix, infix = self._term_matches(term)
+                matches = prefix | infix
+                infix_ids |= infix
+                candidates = matches if candidates is None else candidates & matches
+                if not candidates:
+                    return []
+
+            def rank(product_id):
+                entry = self._entries[product_id]
+                if normalized in entry.codes:
+                    tier = 0
+                elif entry.name.startswith(normalized):
+                    tier = 1
+                elif product_id not in infix_ids:
+                    tier = 2
+                else:
+                    tier = 3
+                return tier, entry.name, product_id
+
+            best = heapq.nsmallest(limit, candidates, key=rank)
+            return [self._entries[product_id].data for product_id in best]
+
+
+product_index = AutocompleteIndex()
@@ -0,0 +1,458 @@
+"""
+Respaldos por tabla en JSONL comprimido, completos o incrementales, y su restauración.
+
+Estructura de un respaldo (un directorio dentro de BACKUP_DIR):
+
+    20261018_031500_full/
+        manifest.json
+        core.product.0001.jsonl.gz
+        core.product.0002.jsonl.gz
+        ...
+
+- Cada tabla se lee con .iterator() (cursor del lado del servidor en PostgreSQL) y se
+  escribe por partes de BACKUP_CHUNK_ROWS filas: una línea JSON por fila con los valores
+  en el orden de `columns` del manifiesto. Nunca se carga una tabla completa en memoria.
+- El manifiesto registra columnas, filas y sha256 de cada parte, y la marca de agua: la
+  hora de inicio del respaldo menos BACKUP_WATERMARK_MARGIN_SECONDS, para alcanzar las
+  filas de transacciones que seguían abiertas al empezar (su auto_now es anterior).
+- Un respaldo incremental toma de cada tabla sólo las filas con auto_now >= la marca del
+  respaldo anterior. Las tablas sin columna auto_now (sólo auto_now_add, como movimientos o
+  ventas, cuyas filas cambian después de crearse) se copian completas. Las bajas no se
+  registran: se recuperan con el siguiente respaldo completo.
+- Los permisos (auth.permission) los crea migrate en cada base con sus propios ids: las
+  tablas que los referencian (permisos de grupos y usuarios) guardan su llave natural.
+- En PostgreSQL todo el respaldo corre en una transacción REPEATABLE READ de sólo lectura,
+  así las tablas quedan consistentes entre sí.
+
+La restauración sigue la cadena (completo + incrementales en orden), verifica sumas y
+filas antes de escribir, inserta con upsert por llave primaria y restaura en paralelo
+las tablas de un mismo nivel de dependencias (un hilo y una conexión por tabla).
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connection, connections, models, transaction
+from django.utils import timezone
+
+from .seeding import manual_timestamps
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+# Tablas que crea/gestiona migrate o que no aportan al respaldo
+EXCLUDED_MODELS = {'contenttypes.contenttype', 'sessions.session', 'admin.logentry', 'auth.permission'}
+
+
+class BackupError(Exception):
+    pass
+
+
+class BackupJSONEncoder(DjangoJSONEncoder):
+    """Como DjangoJSONEncoder pero sin recortar fechas y horas a milisegundos"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def backup_dir():
+    return Path(getattr(settings, 'BACKUP_DIR', Path(settings.BASE_DIR) / 'backups'))
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def natural_key_fields(model):
+    """{columna: modelo} de las llaves foráneas a modelos excluidos: se guardan por llave natural"""
+    return {
+        field.attname: field.related_model for field in model._meta.concrete_fields
+        if field.is_relation and model_label(field.related_model) in EXCLUDED_MODELS
+    }
+
+
+def backup_models():
+    """Modelos concretos a respaldar, incluidas las tablas intermedias de ManyToMany"""
+    selected = []
+    for model in apps.get_models(include_auto_created=True):
+        meta = model._meta
+        if meta.proxy or not meta.managed or model_label(model) in EXCLUDED_MODELS:
+            continue
+        for column, related in natural_key_fields(model).items():
+            if not hasattr(related, 'natural_key'):
+                raise BackupError(
+                    f'{model_label(model)}.{column} referencia a {model_label(related)}, '
+                    'que no se respalda y no tiene llave natural'
+                )
+        selected.append(model)
+    return sorted(selected, key=model_label)
+
+
+def natural_keys(model, using=DEFAULT_DB_ALIAS):
+    """{pk: llave natural} de un modelo, p. ej. Permission → (codename, app_label, model)"""
+    related = [field.name for field in model._meta.concrete_fields if field.is_relation]
+    return {obj.pk: tuple(obj.natural_key()) for obj in model._base_manager.using(using).select_related(*related)}
+
+
+def translate_columns(rows, columns, mappings):
+    """Reemplaza en cada fila los valores de las columnas de `mappings` ({columna: {valor: nuevo}})"""
+    positions = [(columns.index(column), column, mapping) for column, mapping in mappings.items()]
+    for row in rows:
+        if positions:
+            row = list(row)
+            for index, column, mapping in positions:
+                if row[index] is not None:
+                    try:
+                        row[index] = mapping[row[index]]
+                    except KeyError:
+                        raise BackupError(f'{column}: {row[index]} no existe en la base destino') from None
+        yield row
+
+
+def dependency_levels(model_list):
+    """
+    Agrupa los modelos en niveles: cada uno sólo referencia modelos de niveles anteriores.
+    Si queda un ciclo, sus modelos forman el último nivel (se restauran juntos en serie).
+    """
+    pending = set(model_list)
+    done = set()
+    levels = []
+    while pending:
+        level = [
+            model for model in pending
+            if all(
+                field.related_model is model or field.related_model in done or field.related_model not in pending
+                for field in model._meta.concrete_fields if field.is_relation
+            )
+        ]
+        if not level:
+            levels.append(sorted(pending, key=model_label))
+            break
+        levels.append(sorted(level, key=model_label))
+        done.update(level)
+        pending.difference_update(level)
+    return levels
+
+
+def is_cyclic(level):
+    """El nivel tiene modelos que se referencian entre sí (el resto de ciclo de dependency_levels)"""
+    return any(
+        field.related_model in level and field.related_model is not model
+        for model in level for field in model._meta.concrete_fields if field.is_relation
+    )
+
+
+def watermark_field(model):
+    """
+    Columna de fecha para incrementales: la auto_now, que cambia con cada save(). Una
+    auto_now_add sólo marca altas y perdería las modificaciones, así que esas tablas no
+    tienen marca y se copian completas.
+    """
+    for field in model._meta.concrete_fields:
+        if isinstance(field, models.DateTimeField) and field.auto_now:
+            return field
+    return None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ============================================================================
+# Respaldo
+# ============================================================================
+
+def list_backups(directory=None):
+    """Manifiestos de BACKUP_DIR ordenados del más antiguo al más reciente"""
+    directory = Path(directory or backup_dir())
+    if not directory.exists():
+        return []
+    manifests = []
+    for path in sorted(directory.iterdir()):
+        if (path / MANIFEST_NAME).is_file():
+            manifests.append(load_manifest(path))
+    return manifests
+
+
+def _write_table(model, rows, directory, chunk_rows):
+    """Escribe las filas de una tabla por partes; devuelve (partes, filas)"""
+    label = model_label(model)
+    files, total, part, handle, part_rows, part_path = [], 0, 0, None, 0, None
+
+    def close_part():
+        handle.close()
+        files.append({'name': part_path.name, 'rows': part_rows, 'sha256': file_sha256(part_path)})
+
+    for row in rows:
+        if handle is None or part_rows >= chunk_rows:
+            if handle is not None:
+                close_part()
+            part += 1
+            part_rows = 0
+            part_path = directory / f'{label}.{part:04d}.jsonl.gz'
+            handle = gzip.open(part_path, 'wt', encoding='utf-8', compresslevel=6)
+        handle.write(json.dumps(row, cls=BackupJSONEncoder, ensure_ascii=False, separators=(',', ':')))
+        handle.write('\n')
+        part_rows += 1
+        total += 1
+    if handle is not None:
+        close_part()
+    return files, total
+
+
+def create_backup(incremental=False, directory=None, chunk_rows=None, log=None):
+    """
+    Genera un respaldo completo o incremental (sobre el último de `directory`).
+    Devuelve la ruta del respaldo. Si no hay respaldo previo, el incremental se hace completo.
+    """
+    log = log or (lambda message: None)
+    directory = Path(directory or backup_dir())
+    chunk_rows = chunk_rows or getattr(settings, 'BACKUP_CHUNK_ROWS', 100000)
+    previous = list_backups(directory) if incremental else []
+    parent = previous[-1] if previous else None
+    kind = 'incremental' if parent else 'full'
+    started = timezone.now()
+    margin = datetime.timedelta(seconds=getattr(settings, 'BACKUP_WATERMARK_MARGIN_SECONDS', 300))
+    watermark = (started - margin).isoformat()
+    backup_id = f"{started:%Y%m%d_%H%M%S_%f}_{kind}"
+    target = directory / backup_id
+    partial = directory / f'{backup_id}.partial'
+    partial.mkdir(parents=True, exist_ok=False)
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'id': backup_id,
+        'kind': kind,
+        'parent': parent['id'] if parent else None,
+        'created_at': started.isoformat(),
+        'watermark': watermark,
+        'vendor': connection.vendor,
+        'compression': 'gzip',
+        'models': {},
+    }
+    try:
+        outermost = not connection.in_atomic_block
+        with transaction.atomic():
+            if outermost and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+            for model in backup_models():
+                label = model_label(model)
+                columns = [field.attname for field in model._meta.concrete_fields]
+                field = watermark_field(model)
+                queryset = model._base_manager.all()
+                since = None
+                if parent and field is not None:
+                    since = (parent['models'].get(label) or {}).get('watermark')
+                    if since:
+                        condition = models.Q(**{f'{field.attname}__gte': since})
+                        if field.null:
+                            condition |= models.Q(**{f'{field.attname}__isnull': True})
+                        queryset = queryset.filter(condition)
+                related = natural_key_fields(model)
+                values = translate_columns(
+                    queryset.values_list(*columns).order_by('pk').iterator(chunk_size=2000), columns,
+                    {column: natural_keys(related_model) for column, related_model in related.items()},
+                )
+                files, rows = _write_table(model, values, partial, chunk_rows)
+                manifest['models'][label] = {
+                    'columns': columns,
+                    'rows': rows,
+                    'natural_keys': {column: model_label(related_model) for column, related_model in related.items()},
+                    'watermark_field': field.attname if field is not None else None,
+                    'since': since,
+                    'watermark': watermark if field is not None else None,
+                    'files': files,
+                }
+                log(f'{label}: {rows} filas en {len(files)} partes')
+        manifest['finished_at'] = timezone.now().isoformat()
+        with open(partial / MANIFEST_NAME, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, ensure_ascii=False, indent=2)
+        os.replace(partial, target)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    return target
+
+
+# ============================================================================
+# Verificación y restauración
+# ============================================================================
+
+def load_manifest(path):
+    path = Path(path)
+    if path.is_dir():
+        path = path / MANIFEST_NAME
+    if not path.is_file():
+        raise BackupError(f'No existe el manifiesto {path}')
+    with open(path, encoding='utf-8') as handle:
+        manifest = json.load(handle)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise BackupError(f"Formato de respaldo no soportado: {manifest.get('format')}")
+    manifest['path'] = str(path.parent)
+    return manifest
+
+
+def backup_chain(path):
+    """[completo, incremental1, ...] hasta el respaldo indicado"""
+    chain = [load_manifest(path)]
+    while chain[0]['parent']:
+        parent = Path(chain[0]['path']).parent / chain[0]['parent']
+        chain.insert(0, load_manifest(parent))
+    return chain
+
+
+def verify_backup(manifest):
+    """Compara sha256 y filas de cada parte con el manifiesto; devuelve la lista de errores"""
+    errors = []
+    directory = Path(manifest['path'])
+    for label, entry in manifest['models'].items():
+        for part in entry['files']:
+            path = directory / part['name']
+            if not path.is_file():
+                errors.append(f'{label}: falta {part["name"]}')
+                continue
+            if file_sha256(path) != part['sha256']:
+                errors.append(f'{label}: suma sha256 distinta en {part["name"]}')
+                continue
+            with gzip.open(path, 'rt', encoding='utf-8') as handle:
+                rows = sum(1 for _ in handle)
+            if rows != part['rows']:
+                errors.append(f'{label}: {rows} filas en {part["name"]}, el manifiesto indica {part["rows"]}')
+    return errors
+
+
+def _read_rows(manifest, entry):
+    directory = Path(manifest['path'])
+    for part in entry['files']:
+        with gzip.open(directory / part['name'], 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                yield json.loads(line)
+
+
+def restore_table(model, manifests, batch_size=2000):
+    """Inserta/actualiza (upsert por pk) las filas de un modelo en cada respaldo de la cadena"""
+    label = model_label(model)
+    restored = set()
+    with manual_timestamps(model):  # conservar created_at/updated_at del respaldo
+        for manifest in manifests:
+            entry = manifest['models'].get(label)
+            if entry and entry['rows']:
+                _restore_entry(model, manifest, entry, restored, batch_size)
+    return label, len(restored)
+
+
+def _restore_entry(model, manifest, entry, restored, batch_size):
+    fields_by_attname = {field.attname: field for field in model._meta.concrete_fields}
+    unknown = [column for column in entry['columns'] if column not in fields_by_attname]
+    if unknown:
+        raise BackupError(f"{model_label(model)}: columnas {', '.join(unknown)} no existen en el modelo actual")
+    fields = [fields_by_attname[column] for column in entry['columns']]
+    update_fields = [field.name for field in fields if not field.primary_key]
+    batch = []
+    local_pks = {
+        column: {key: pk for pk, key in natural_keys(apps.get_model(label)).items()}
+        for column, label in entry.get('natural_keys', {}).items()
+    }
+
+    def flush():
+        if update_fields:
+            model._base_manager.bulk_create(
+                batch, update_conflicts=True, unique_fields=[model._meta.pk.name], update_fields=update_fields,
+            )
+        else:
+            model._base_manager.bulk_create(batch, ignore_conflicts=True)
+        batch.clear()
+
+    for values in _read_rows(manifest, entry):
+        for column, pks in local_pks.items():
+            index = entry['columns'].index(column)
+            if values[index] is not None:
+                key = tuple(values[index])
+                if key not in pks:
+                    raise BackupError(f'{model_label(model)}: no existe {key} en esta base (¿falta ejecutar migrate?)')
+                values[index] = pks[key]
+        obj = model(**{field.attname: field.to_python(value) for field, value in zip(fields, values)})
+        restored.add(obj.pk)
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+
+def _restore_in_thread(model, manifests):
+    try:
+        with transaction.atomic():
+            return restore_table(model, manifests)
+    finally:
+        connections.close_all()
+
+
+def reset_sequences(model_list):
+    statements = connection.ops.sequence_reset_sql(no_style(), model_list)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def restore_backup(path, workers=1, log=None):
+    """
+    Restaura la cadena que termina en `path`. Verifica antes de escribir y devuelve
+    {modelo: (filas distintas restauradas, filas en la base al terminar)}.
+    """
+    log = log or (lambda message: None)
+    chain = backup_chain(path)
+    for manifest in chain:
+        errors = verify_backup(manifest)
+        if errors:
+            raise BackupError(f"Respaldo {manifest['id']} dañado: " + '; '.join(errors))
+    labels = set().union(*(manifest['models'] for manifest in chain))
+    model_list = [model for model in backup_models() if model_label(model) in labels]
+    missing = labels - {model_label(model) for model in model_list}
+    if missing:
+        raise BackupError(f"Modelos del respaldo que no existen en esta base: {', '.join(sorted(missing))}")
+    levels = dependency_levels(model_list)
+    if connection.vendor == 'sqlite':
+        workers = 1  # SQLite admite un solo escritor
+    log(f"{len(chain)} respaldo(s), {len(model_list)} tablas en {len(levels)} niveles, {workers} hilo(s)")
+
+    results = {}
+    if workers <= 1:
+        with transaction.atomic():
+            for level in levels:
+                for model in level:
+                    label, count = restore_table(model, chain)
+                    results[label] = count
+                    log(f'{label}: {count} filas')
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for level in levels:
+                if is_cyclic(level):
+                    with transaction.atomic():
+                        outcomes = [restore_table(model, chain) for model in level]
+                else:
+                    outcomes = list(executor.map(lambda model: _restore_in_thread(model, chain), level))
+                for label, count in outcomes:
+                    results[label] = count
+                    log(f'{label}: {count} filas')
+    reset_sequences(model_list)
+    return {
+        model_label(model): (results[model_label(model)], model._base_manager.count())
+        for model in model_list
+    }
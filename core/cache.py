@@ -0,0 +1,192 @@
+"""
+Caché de lectura para catálogos de referencia (categorías, marcas, unidades, almacenes,
+tipos de cliente y tipos de cambio).
+
+Cada modelo tiene un número de versión en el caché, global ('all') y por empresa; la de
+empresa la usan las listas filtradas con ?business=<id> (CachedCatalogMixin).
+Las señales post_save/post_delete (y m2m_changed de sus ManyToMany) lo incrementan, lo que invalida de golpe todas las
+respuestas guardadas con la versión anterior sin tener que borrarlas una por una.
+El ETag sale de la versión y la URL, así un If-None-Match vigente responde 304 sin
+tocar la base de datos ni serializar nada.
+
+Si el backend de caché (Redis) no responde, las vistas funcionan igual sin caché.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .metrics import observe_cache
+
+logger = logging.getLogger(__name__)
+
+ALL_SCOPE = 'all'
+
+
+def _version_key(model, scope):
+    return f"catalog:v:{model._meta.label_lower}:{scope}"
+
+
+def model_version(model, scope=ALL_SCOPE):
+    key = _version_key(model, scope)
+    try:
+        cache.add(key, 1, timeout=None)
+        return cache.get(key, 1)
+    except Exception:
+        logger.warning("Caché no disponible leyendo %s", key, exc_info=True)
+        return None
+
+
+def bump_version(model, scope=ALL_SCOPE):
+    key = _version_key(model, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)  # la clave no existía: cualquier valor distinto de 1 invalida
+    except Exception:
+        logger.warning("Caché no disponible invalidando %s", key, exc_info=True)
+
+
+def remember_business(sender, instance, update_fields=None, **kwargs):
+    """Receptor de pre_save: empresa anterior, para invalidar también su versión si el registro se mueve"""
+    if instance._state.adding or (update_fields is not None and 'business' not in update_fields):
+        return
+    instance._cache_previous_business_id = (
+        sender._base_manager.filter(pk=instance.pk).values_list('business_id', flat=True).first()
+    )
+
+
+def invalidate_instance(sender, instance, **kwargs):
+    """Receptor de post_save/post_delete: versión global y, si aplica, la de su empresa"""
+    bump_version(sender)
+    business_ids = {getattr(instance, 'business_id', None), getattr(instance, '_cache_previous_business_id', None)}
+    for business_id in business_ids - {None}:
+        bump_version(sender, business_id)
+
+
+def invalidate_m2m(sender, instance, action, model, **kwargs):
+    """Receptor de m2m_changed: add/remove/clear no pasan por post_save; cambian ambos lados"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(type(instance))
+        bump_version(model)
+
+
+def register_cached_model(model):
+    label = model._meta.label_lower
+    if any(field.name == 'business' for field in model._meta.fields):
+        pre_save.connect(remember_business, sender=model, dispatch_uid=f'catalog-cache-presave-{label}')
+    post_save.connect(invalidate_instance, sender=model, dispatch_uid=f'catalog-cache-save-{label}')
+    post_delete.connect(invalidate_instance, sender=model, dispatch_uid=f'catalog-cache-delete-{label}')
+    for field in model._meta.local_many_to_many:
+        m2m_changed.connect(invalidate_m2m, sender=field.remote_field.through,
+                            dispatch_uid=f'catalog-cache-m2m-{label}-{field.name}')
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return etag in candidates
+
+
+def not_modified(etag, **headers):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = etag
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def with_validators(response, etag):
+    response['ETag'] = etag
+    # El navegador guarda la respuesta pero revalida siempre con If-None-Match
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_response(request, models, build, scope=ALL_SCOPE):
+    """
+    Respuesta con caché versionado para datos que dependen de `models`.
+    `build()` devuelve los datos (ya serializados) cuando no están en caché.
+    """
+    versions = [model_version(model, scope) for model in models]
+    if None in versions:
+        return Response(build())
+    path = request.get_full_path()
+    etag = make_etag(scope, versions, path)
+    if etag_matches(request, etag):
+        observe_cache('conditional', True)
+        return not_modified(etag, **{'Cache-Control': 'private, no-cache'})
+    observe_cache('conditional', False)
+    key = 'catalog:r:' + etag.strip('"')
+    try:
+        data = cache.get(key)
+    except Exception:
+        data = None
+    observe_cache('catalog', data is not None)
+    if data is None:
+        data = build()
+        try:
+            cache.set(key, data, timeout=getattr(settings, 'CATALOG_CACHE_TIMEOUT', 3600))
+        except Exception:
+            logger.warning("Caché no disponible guardando %s", key, exc_info=True)
+    return with_validators(Response(data), etag)
+
+
+class CachedCatalogMixin:
+    """
+    Para ModelViewSet de catálogos: list y retrieve salen del caché versionado del modelo.
+    Las escrituras siguen el camino normal y las señales invalidan la versión.
+
+    Con ?business=<id> la respuesta se filtra por esa empresa y usa la versión de la
+    empresa: los cambios de otras empresas no la invalidan. Sólo aplica si todos los
+    modelos de get_cache_models() tienen empresa (los demás sólo suben la versión global).
+    """
+    cache_models = None  # modelos adicionales cuyo cambio también invalida (p. ej. relaciones)
+
+    def get_cache_models(self):
+        return [self.queryset.model, *(self.cache_models or [])]
+
+    def get_business_filter(self):
+        models = self.get_cache_models()
+        if not all(any(field.name == 'business' for field in model._meta.fields) for model in models):
+            return None
+        business = self.request.query_params.get('business')
+        if not business:
+            return None
+        if not business.isdigit():
+            raise ValidationError({'business': 'Debe ser un id numérico'})
+        return int(business)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        business = self.get_business_filter()
+        return queryset if business is None else queryset.filter(business_id=business)
+
+    def get_cache_scope(self):
+        business = self.get_business_filter()
+        return ALL_SCOPE if business is None else business
+
+    def list(self, request, *args, **kwargs):
+        parent = super().list
+        return cached_response(
+            request, self.get_cache_models(), lambda: parent(request, *args, **kwargs).data, scope=self.get_cache_scope(),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        parent = super().retrieve
+        return cached_response(
+            request, self.get_cache_models(), lambda: parent(request, *args, **kwargs).data, scope=self.get_cache_scope(),
+        )
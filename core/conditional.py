@@ -0,0 +1,119 @@
+"""
+Peticiones condicionales (ETag / Last-Modified) para los ViewSet de la API.
+
+- Listas: la huella es Max(updated_at) + Count del queryset ya filtrado, una sola
+  consulta agregada sin serializar nada. Un alta, cambio o baja la modifica.
+- Detalle: el updated_at del objeto.
+- Los modelos que no tienen updated_at, y las relaciones que aparecen en la respuesta
+  (variantes, stock, renglones...), entran por su contador de versión de core/cache.py,
+  que incrementan las señales post_save/post_delete.
+
+Si el If-None-Match del cliente coincide se responde 304 sin serializar. El ETag incluye
+la URL completa, el usuario y el formato, así que páginas y filtros no se mezclan.
+"""
+from functools import partial
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_http_date_safe
+
+from rest_framework.response import Response
+
+from .cache import etag_matches, make_etag, model_version, not_modified, register_cached_model, with_validators
+from .metrics import observe_cache
+from .pagination import KnownCountPaginator
+
+
+def has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value else None
+
+
+class ConditionalRequestMixin:
+    """
+    Para ModelViewSet: list y retrieve envían ETag/Last-Modified y responden 304 si nada cambió.
+    `conditional_models` son los modelos relacionados cuyo cambio también altera la respuesta.
+    """
+    conditional_models = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Los contadores de versión sólo sirven si las señales están conectadas
+        models = list(cls.conditional_models)
+        queryset = getattr(cls, 'queryset', None)
+        if queryset is not None and not has_updated_at(queryset.model):
+            models.append(queryset.model)
+        for model in models:
+            register_cached_model(model)
+
+    def _request_parts(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return [self.request.get_full_path(), self.request.user.pk, getattr(renderer, 'format', '')]
+
+    def _not_modified_since(self, last_modified):
+        # If-Modified-Since sólo se respeta sin If-None-Match (el ETag es más preciso)
+        if not last_modified or 'HTTP_IF_NONE_MATCH' in self.request.META:
+            return False
+        since = parse_http_date_safe(self.request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return since is not None and last_modified <= since
+
+    def _conditional(self, parts, last_modified, render, use_since=False):
+        """Responde 304 si el cliente ya tiene la versión vigente; si no, `render()` con validadores"""
+        versions = [model_version(model) for model in self.conditional_models]
+        if None in versions or parts[-1] is None:
+            # Caché de versiones no disponible (o updated_at vacío): respuesta sin validadores
+            return render()
+        etag = make_etag(*parts, *versions, *self._request_parts())
+        headers = {'Cache-Control': 'private, no-cache'}
+        if last_modified:
+            headers['Last-Modified'] = http_date(last_modified)
+        if etag_matches(self.request, etag) or (use_since and self._not_modified_since(last_modified)):
+            observe_cache('conditional', True)
+            return not_modified(etag, **headers)
+        observe_cache('conditional', False)
+        response = render()
+        if response.status_code != 200:
+            return response
+        if last_modified:
+            response['Last-Modified'] = headers['Last-Modified']
+        return with_validators(response, etag)
+
+    def list(self, request, *args, **kwargs):
+        parent = super().list
+        queryset = self.filter_queryset(self.get_queryset())
+        model = queryset.model
+        if has_updated_at(model):
+            if not queryset.query.is_sliced:
+                queryset = queryset.order_by()
+            stats = queryset.aggregate(last=Max('updated_at'), total=Count('pk'))
+            last_modified = _timestamp(stats['last'])
+            parts = ['list', model._meta.label_lower, stats['last'], stats['total']]
+            self._list_total = stats['total']
+        else:
+            last_modified = None
+            parts = ['list', model._meta.label_lower, model_version(model)]
+        # Una baja no cambia Max(updated_at): en listas sólo se usa el ETag (incluye el conteo)
+        return self._conditional(parts, last_modified, lambda: parent(request, *args, **kwargs))
+
+    def paginate_queryset(self, queryset):
+        # El conteo de la huella sirve también para la paginación por número de página
+        total = getattr(self, '_list_total', None)
+        if total is not None and hasattr(self.paginator, 'django_paginator_class'):
+            self.paginator.django_paginator_class = partial(KnownCountPaginator, count=total)
+        return super().paginate_queryset(queryset)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        model = type(instance)
+        if has_updated_at(model):
+            last_modified = _timestamp(instance.updated_at)
+            parts = ['detail', model._meta.label_lower, instance.pk, instance.updated_at]
+        else:
+            last_modified = None
+            parts = ['detail', model._meta.label_lower, instance.pk, model_version(model)]
+        return self._conditional(
+            parts, last_modified, lambda: Response(self.get_serializer(instance).data),
+            use_since=not self.conditional_models,
+        )
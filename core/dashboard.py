@@ -0,0 +1,129 @@
+"""
+Resumen del tablero (/api/dashboard/summary/) calculado con agregados en SQL.
+
+Cada sección se guarda en caché por separado, con TTL corto (DASHBOARD_CACHE_TIMEOUT)
+y con las versiones de los modelos de los que depende dentro de la llave (ver
+core/cache.py). Así un movimiento autorizado sólo recalcula las secciones de existencias
+y un pago sólo la de saldos; las demás siguen saliendo del caché.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Min, Q, Sum
+
+from .cache import model_version
+from .metrics import observe_cache
+from .models import (
+    Brand, Category, Customer, CustomerPayment, InventoryMovement, Product, ProductVariant,
+    ProductWarehouseStock, Sale, SalePayment, Supplier, SupplierPayment, Warehouse,
+)
+from .stock import LOW_STOCK
+
+logger = logging.getLogger(__name__)
+
+
+def _money(value):
+    return round(float(value or 0), 2)
+
+
+def stock_value():
+    """Valor del inventario (cantidad positiva x costo) total y por almacén, categoría y marca"""
+    value = Sum(F('quantity') * F('product_variant__cost_price'), output_field=FloatField())
+    stocks = ProductWarehouseStock.objects.filter(quantity__gt=0)
+
+    def grouped(id_field, name_field):
+        rows = stocks.values(key=F(id_field), label=F(name_field)).annotate(value=value, units=Sum('quantity'))
+        return [
+            {'id': row['key'], 'name': row['label'] or '', 'value': _money(row['value']), 'units': row['units']}
+            for row in rows.order_by('-value')
+        ]
+
+    by_warehouse = grouped('warehouse_id', 'warehouse__name')
+    return {
+        'total': _money(sum(row['value'] for row in by_warehouse)),
+        'by_warehouse': by_warehouse,
+        'by_category': grouped('product_variant__product__category_id', 'product_variant__product__category__name'),
+        'by_brand': grouped('product_variant__product__brand_id', 'product_variant__product__brand__name'),
+    }
+
+
+def stock_alerts():
+    """Filas (variante, almacén) con existencia baja, agotada o negativa"""
+    return ProductWarehouseStock.objects.aggregate(
+        low_stock=Count('id', filter=LOW_STOCK),
+        out_of_stock=Count('id', filter=Q(quantity__lte=0)),
+        negative=Count('id', filter=Q(quantity__lt=0)),
+    )
+
+
+def pending_authorizations():
+    """Movimientos sin autorizar ni cancelar y la fecha del más antiguo"""
+    return InventoryMovement.objects.filter(authorized=False, is_cancelled=False).aggregate(
+        movements=Count('id'), oldest=Min('created_at'),
+    )
+
+
+def receivables():
+    """Cuentas por cobrar: saldo de clientes y ventas pendientes de pago"""
+    customers = Customer.objects.aggregate(
+        balance=Sum('current_balance'), customers=Count('id', filter=Q(current_balance__gt=0)),
+    )
+    sales = Sale.objects.filter(is_paid=False).exclude(status='CANCELLED').aggregate(
+        remaining=Sum('remaining_balance'), sales=Count('id'),
+    )
+    return {
+        'customer_balance': _money(customers['balance']),
+        'customers_with_balance': customers['customers'],
+        'unpaid_sales': sales['sales'],
+        'unpaid_sales_balance': _money(sales['remaining']),
+    }
+
+
+def payables():
+    """Cuentas por pagar: saldo con proveedores"""
+    suppliers = Supplier.objects.aggregate(
+        balance=Sum('current_balance'), suppliers=Count('id', filter=Q(current_balance__gt=0)),
+    )
+    return {
+        'supplier_balance': _money(suppliers['balance']),
+        'suppliers_with_balance': suppliers['suppliers'],
+    }
+
+
+# sección -> (modelos cuyo cambio la invalida, función que la calcula)
+SECTIONS = {
+    'stock_value': ((ProductWarehouseStock, ProductVariant, Product, Category, Brand, Warehouse), stock_value),
+    'stock_alerts': ((ProductWarehouseStock, ProductVariant), stock_alerts),
+    'pending_authorizations': ((InventoryMovement,), pending_authorizations),
+    'receivables': ((Customer, CustomerPayment, Sale, SalePayment), receivables),
+    'payables': ((Supplier, SupplierPayment), payables),
+}
+
+DASHBOARD_MODELS = {model for models, _ in SECTIONS.values() for model in models}
+
+
+def section(name):
+    """Una sección del resumen: del caché si sus modelos no cambiaron y no venció el TTL"""
+    models, build = SECTIONS[name]
+    versions = [model_version(model) for model in models]
+    if None in versions:
+        return build()
+    key = 'dashboard:%s:%s' % (name, hashlib.md5('|'.join(map(str, versions)).encode()).hexdigest())
+    try:
+        data = cache.get(key)
+    except Exception:
+        data = None
+    observe_cache('dashboard', data is not None)
+    if data is None:
+        data = build()
+        try:
+            cache.set(key, data, timeout=getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60))
+        except Exception:
+            logger.warning("Caché no disponible guardando %s", key, exc_info=True)
+    return data
+
+
+def dashboard_summary():
+    return {name: section(name) for name in SECTIONS}
@@ -0,0 +1,47 @@
+"""
+Conexiones sin statement_timeout para tareas largas.
+
+DATABASE_STATEMENT_TIMEOUT_MS (settings.py) existe para cortar consultas de peticiones
+web. Los respaldos, restauraciones, la migración a PostgreSQL, el recálculo de stock y
+los datos de benchmark pueden tardar más que eso por sentencia (un COPY o un CREATE INDEX
+por tabla), así que corren dentro de without_statement_timeout(). migrate no pasa por aquí:
+se corre con DATABASE_STATEMENT_TIMEOUT_MS=0 en el entorno (docker-entrypoint.sh).
+
+El bloque cubre las conexiones ya abiertas y las que se abran dentro de él, también las
+de hilos o procesos hijos (fork) que las tareas crean; al salir se vuelve al valor con el
+que se abrió la conexión (RESET), útil en procesos largos como los workers de Celery.
+"""
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_DISPATCH_UID = 'core-without-statement-timeout'
+
+
+def _set_statement_timeout(connection, statement):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(statement)
+
+
+def _disable_on_connect(sender, connection, **kwargs):
+    _set_statement_timeout(connection, 'SET statement_timeout = 0')
+
+
+def _open_connections():
+    return [connection for connection in connections.all(initialized_only=True) if connection.connection is not None]
+
+
+@contextmanager
+def without_statement_timeout():
+    connection_created.connect(_disable_on_connect, dispatch_uid=_DISPATCH_UID)
+    try:
+        for connection in _open_connections():
+            _set_statement_timeout(connection, 'SET statement_timeout = 0')
+        yield
+    finally:
+        connection_created.disconnect(dispatch_uid=_DISPATCH_UID)
+        for connection in _open_connections():
+            if connection.is_usable():
+                _set_statement_timeout(connection, 'RESET statement_timeout')
@@ -0,0 +1,318 @@
+"""
+Importación masiva de productos y marcas desde CSV.
+
+El archivo se lee como stream y se procesa por bloques; cada bloque es su propia
+transacción. Para productos, cada bloque resuelve categorías, marcas, unidades y
+SKUs existentes con una consulta IN por tabla y crea productos y sus variantes por
+defecto con bulk_create. El costo en consultas depende del número de bloques y no
+del de filas.
+
+Productos: sku,name,category,brand[,base_unit,description,minimum_stock,maximum_stock,image_url,barcode]
+Marcas:    name[,code,description,country]
+"""
+import csv
+import io
+import logging
+from abc import ABC, abstractmethod
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Brand, Business, Category, ImportJob, Product, ProductVariant, Unit
+from .search import build_search_document
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+# Errores/duplicados que se guardan en ImportJob.errors (los contadores siempre son exactos)
+MAX_STORED_JOB_ERRORS = 1000
+REQUIRED_PRODUCT_FIELDS = ('sku', 'name', 'category', 'brand')
+
+
+class ImportFileError(Exception):
+    """El archivo no se puede leer como CSV UTF-8"""
+
+
+def _clean(value):
+    return (value or '').strip()
+
+
+def _to_float(value, field):
+    value = _clean(value)
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f'{field} debe ser numérico.')
+
+
+def iter_csv_rows(file):
+    """(número de fila, dict) leyendo el archivo subido sin cargarlo completo en memoria"""
+    stream = io.TextIOWrapper(getattr(file, 'file', file), encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(stream)
+        for number, row in enumerate(reader, start=2):  # la fila 1 es el encabezado
+            yield number, row
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(str(exc))
+    finally:
+        stream.detach()  # no cerrar el archivo subido
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def invalidate_catalog_cache(model, business_id=None):
+    """bulk_create no dispara post_save: invalidar el caché de catálogos a mano"""
+    from .cache import bump_version
+    bump_version(model)
+    if business_id:
+        bump_version(model, business_id)
+
+
+def _resolve_by_name(model, names, defaults, **scope):
+    """{nombre: id} para los nombres dados; crea los que falten con bulk_create"""
+    if not names:
+        return {}
+    found = dict(
+        model.objects.filter(name__in=names, **scope).values('name').annotate(first_id=Min('id'))
+        .values_list('name', 'first_id')
+    )
+    missing = [name for name in names if name not in found]
+    if missing:
+        created = model.objects.bulk_create([model(name=name, **scope, **defaults(name)) for name in missing])
+        found.update({obj.name: obj.id for obj in created})
+        invalidate_catalog_cache(model, scope.get('business_id'))
+    return found
+
+
+def count_csv_rows(file):
+    """Filas de datos del archivo (sin encabezado); deja el archivo al inicio"""
+    total = sum(1 for _ in iter_csv_rows(file))
+    file.seek(0)
+    return total
+
+
+class CsvImporter(ABC):
+    """Base de los importadores: lectura por bloques, acumulado de resultados y avance"""
+
+    def __init__(self, business_id, chunk_size=IMPORT_CHUNK_SIZE, on_progress=None):
+        self.business = Business.objects.get(id=business_id)
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.created, self.errors, self.duplicates = [], [], []
+        self.rows_read = 0
+        self.total_rows = 0
+
+    def result(self):
+        return {'created': self.created, 'errors': self.errors, 'duplicates': self.duplicates}
+
+    def run(self, file):
+        # Primero se lee el archivo completo: un error de codificación o de CSV a mitad del
+        # archivo lo rechaza (ImportFileError) antes de confirmar el primer bloque
+        self.total_rows = count_csv_rows(file)
+        if self.on_progress:
+            self.on_progress(self)
+        for chunk in _chunks(iter_csv_rows(file), self.chunk_size):
+            self.import_chunk(chunk)
+            self.rows_read += len(chunk)
+            if self.on_progress:
+                self.on_progress(self)
+        return self.result()
+
+    @abstractmethod
+    def import_chunk(self, chunk):
+        """Procesa un bloque de (número de fila, fila) y acumula en created/errors/duplicates"""
+
+
+class ProductImporter(CsvImporter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._seen_skus = set()
+
+    def _valid_rows(self, chunk):
+        rows = []
+        for number, raw in chunk:
+            row = {key: _clean(value) for key, value in raw.items() if key}
+            sku = row.get('sku')
+            if not all(row.get(field) for field in REQUIRED_PRODUCT_FIELDS):
+                self.errors.append({'row': number, 'sku': sku, 'error': 'Faltan campos requeridos.'})
+                continue
+            try:
+                row['minimum_stock'] = _to_float(row.get('minimum_stock'), 'minimum_stock')
+                row['maximum_stock'] = _to_float(row.get('maximum_stock'), 'maximum_stock')
+            except ValueError as exc:
+                self.errors.append({'row': number, 'sku': sku, 'error': str(exc)})
+                continue
+            if sku in self._seen_skus:
+                self.duplicates.append({'row': number, 'sku': sku, 'error': 'SKU repetido en el archivo.'})
+                continue
+            self._seen_skus.add(sku)
+            rows.append((number, row))
+        return rows
+
+    @transaction.atomic
+    def import_chunk(self, chunk):
+        rows = self._valid_rows(chunk)
+        skus = [row['sku'] for _, row in rows]
+        existing = set(Product.objects.filter(sku__in=skus).values_list('sku', flat=True))
+        new_rows = []
+        for number, row in rows:
+            if row['sku'] in existing:
+                self.duplicates.append({'row': number, 'sku': row['sku'], 'error': 'SKU duplicado.'})
+            else:
+                new_rows.append(row)
+        if not new_rows:
+            return
+
+        scope = {'business_id': self.business.id}
+        categories = _resolve_by_name(Category, {r['category'] for r in new_rows}, lambda name: {'code': ''}, **scope)
+        brands = _resolve_by_name(Brand, {r['brand'] for r in new_rows}, lambda name: {'code': ''}, **scope)
+        units = _resolve_by_name(
+            Unit, {r['base_unit'] for r in new_rows if r.get('base_unit')},
+            lambda name: {'symbol': name[:10], 'unit_type': ''},
+        )
+        category_names = {pk: name for name, pk in categories.items()}
+        brand_names = {pk: name for name, pk in brands.items()}
+
+        products = []
+        for row in new_rows:
+            product = Product(
+                business=self.business, sku=row['sku'], name=row['name'],
+                category_id=categories[row['category']], brand_id=brands[row['brand']],
+                base_unit_id=units.get(row.get('base_unit')), description=row.get('description', ''),
+                barcode=row.get('barcode', ''), minimum_stock=row['minimum_stock'],
+                maximum_stock=row['maximum_stock'], image_url=row.get('image_url') or None,
+            )
+            # bulk_create no llama a save(): el documento de búsqueda se arma aquí
+            product.category = Category(id=product.category_id, name=category_names[product.category_id])
+            product.brand = Brand(id=product.brand_id, name=brand_names[product.brand_id])
+            product.search_document = build_search_document(product)
+            products.append(product)
+        products = Product.objects.bulk_create(products, batch_size=self.chunk_size)
+        self._create_default_variants(products)
+
+        from .autocomplete import product_index
+        product_ids = [product.id for product in products]
+        transaction.on_commit(lambda: product_index.refresh_products(product_ids))
+        self.created += [{'sku': p.sku, 'name': p.name, 'id': p.id} for p in products]
+
+    def _create_default_variants(self, products):
+        """
+        Variante por defecto como la de la señal post_save, en un solo INSERT. Usa el SKU
+        del producto (el aleatorio de generate_sku choca con miles de nombres parecidos)
+        y, si ya lo tiene otra variante, el SKU más el id del producto.
+        """
+        taken = set(ProductVariant.objects.filter(sku__in=[p.sku for p in products]).values_list('sku', flat=True))
+        ProductVariant.objects.bulk_create([
+            ProductVariant(
+                product=product, name=product.name,
+                sku=product.sku if product.sku not in taken else f'{product.sku}-{product.id}',
+                cost_price=0, sale_price=0, purchase_price=0, barcode=product.barcode or '',
+                unit_id=product.base_unit_id, low_stock_threshold=0, is_active=product.is_active,
+            ) for product in products
+        ], batch_size=self.chunk_size)
+
+
+class BrandImporter(CsvImporter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._seen_names = set()
+
+    @transaction.atomic
+    def import_chunk(self, chunk):
+        rows = []
+        for number, raw in chunk:
+            row = {key: _clean(value) for key, value in raw.items() if key}
+            name = row.get('name')
+            if not name:
+                self.errors.append({'row': number, 'name': name, 'error': 'Falta nombre.'})
+            elif name in self._seen_names:
+                self.duplicates.append({'row': number, 'name': name, 'error': 'Marca repetida en el archivo.'})
+            else:
+                self._seen_names.add(name)
+                rows.append((number, row))
+        existing = set(Brand.objects.filter(
+            business=self.business, name__in=[row['name'] for _, row in rows]
+        ).values_list('name', flat=True))
+        brands = []
+        for number, row in rows:
+            if row['name'] in existing:
+                self.duplicates.append({'row': number, 'name': row['name'], 'error': 'Marca duplicada.'})
+                continue
+            brands.append(Brand(
+                business=self.business, name=row['name'], code=row.get('code', ''),
+                description=row.get('description', ''), country=row.get('country', ''),
+            ))
+        brands = Brand.objects.bulk_create(brands, batch_size=self.chunk_size)
+        if brands:
+            invalidate_catalog_cache(Brand, self.business.id)
+        self.created += [{'name': brand.name, 'id': brand.id} for brand in brands]
+
+
+IMPORTERS = {
+    'PRODUCTS': ProductImporter,
+    'BRANDS': BrandImporter,
+}
+
+
+def import_products(file, business_id, chunk_size=IMPORT_CHUNK_SIZE):
+    return ProductImporter(business_id, chunk_size=chunk_size).run(file)
+
+
+# ==========================
+# Trabajos de importación (ImportJob)
+# ==========================
+
+def _job_counts(importer):
+    return {
+        'total_rows': importer.total_rows,
+        'processed_rows': importer.rows_read,
+        'created_count': len(importer.created),
+        'duplicate_count': len(importer.duplicates),
+        'error_count': len(importer.errors),
+    }
+
+
+def run_import_job(job):
+    """
+    Procesa un ImportJob completo. Cada bloque confirma su propia transacción y
+    actualiza el avance, así una falla a mitad conserva lo ya importado.
+    Devuelve el resultado del importador (None si el trabajo falló).
+    """
+    ImportJob.objects.filter(pk=job.pk).update(status='RUNNING', started_at=timezone.now())
+
+    def save_progress(importer):
+        ImportJob.objects.filter(pk=job.pk).update(**_job_counts(importer))
+
+    importer = IMPORTERS[job.kind](job.business_id, on_progress=save_progress)
+    try:
+        with job.file.open('rb') as file:
+            result = importer.run(file)
+    except ImportFileError:
+        status, message, result = 'FAILED', 'Archivo inválido o formato incorrecto.', None
+    except Exception as exc:
+        logger.exception("Falló la importación %s", job.pk)
+        status, message, result = 'FAILED', str(exc), None
+    else:
+        status, message = 'COMPLETED', ''
+
+    ImportJob.objects.filter(pk=job.pk).update(
+        status=status, message=message, finished_at=timezone.now(),
+        errors=(importer.errors + importer.duplicates)[:MAX_STORED_JOB_ERRORS],
+        **_job_counts(importer),
+    )
+    if status == 'COMPLETED':
+        job.file.delete(save=False)  # el archivo solo se conserva si hay que reintentar
+        ImportJob.objects.filter(pk=job.pk).update(file='')
+    job.refresh_from_db()
+    return result
@@ -0,0 +1,280 @@
+"""
+Motor de kardex basado en conjuntos.
+
+Obtiene todos los InventoryMovementDetail de un producto en una sola consulta con
+join a movimiento, almacén y usuario, ordenados por fecha, y calcula el saldo
+acumulado en una única pasada en Python. Soporta filtros por rango de fechas y
+almacén, y paginación por cursor (el cursor lleva el saldo acumulado, así cada
+página cuesta solo sus propias filas).
+
+Los StockSnapshot mensuales funcionan como puntos de control: el saldo inicial de
+un rango con `date_from` parte del snapshot más cercano y solo suma los movimientos
+posteriores a él, así el costo depende del rango y no de todo el historial.
+"""
+import base64
+import json
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Min, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import InventoryMovementDetail, ProductVariant, StockSnapshot
+from .stock import annotate_signed_quantity
+
+KARDEX_ORDERING = ('movement__created_at', 'movement_id', 'id')
+KARDEX_FIELDS = (
+    'id', 'movement_id', 'movement__created_at', 'movement__movement_type',
+    'movement__reference_document', 'movement__notes', 'movement__warehouse_id',
+    'movement__warehouse__name', 'movement__user__email', 'product_variant_id',
+    'product_variant__sku', 'quantity', 'price', 'signed_quantity',
+)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class KardexPage:
+    def __init__(self, entries, next_cursor=None):
+        self.entries = entries
+        self.next_cursor = next_cursor
+
+
+def _day_start(value):
+    dt = datetime.combine(value, time.min)
+    return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+
+
+def parse_date_param(value, name):
+    """Convierte un parámetro YYYY-MM-DD (o ISO datetime) en date; None si viene vacío"""
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        parsed_dt = parse_datetime(value)
+        parsed = parsed_dt.date() if parsed_dt else None
+    if parsed is None:
+        raise ValidationError({name: 'Fecha inválida, use el formato YYYY-MM-DD'})
+    return parsed
+
+
+def encode_cursor(created_at, movement_id, detail_id, balance):
+    payload = json.dumps([created_at.isoformat(), movement_id, detail_id, balance])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, movement_id, detail_id, balance = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return parse_datetime(created_at), int(movement_id), int(detail_id), float(balance)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValidationError({'cursor': 'Cursor inválido'})
+
+
+def kardex_details(product_id, warehouse_id=None):
+    """Detalles del producto con la cantidad con signo anotada (sin ordenar ni paginar)"""
+    details = InventoryMovementDetail.objects.filter(product_variant__product_id=product_id)
+    if warehouse_id:
+        details = details.filter(movement__warehouse_id=warehouse_id)
+    return annotate_signed_quantity(details)
+
+
+def latest_snapshot_before(day):
+    """Fecha del último snapshot cuyo cierre es anterior a `day` (None si no hay)"""
+    return StockSnapshot.objects.filter(period_end__lt=day).aggregate(latest=Max('period_end'))['latest']
+
+
+def opening_balance(product_id, warehouse_id=None, before=None):
+    """
+    Saldo acumulado de todos los movimientos anteriores a `before` (datetime).
+    Parte del snapshot mensual más cercano y solo suma los movimientos posteriores.
+    """
+    if before is None:
+        return 0.0
+    details = kardex_details(product_id, warehouse_id).filter(movement__created_at__lt=before)
+    balance = 0.0
+    snapshot_date = latest_snapshot_before(timezone.localtime(before).date())
+    if snapshot_date:
+        snapshots = StockSnapshot.objects.filter(period_end=snapshot_date, product_variant__product_id=product_id)
+        if warehouse_id:
+            snapshots = snapshots.filter(warehouse_id=warehouse_id)
+        balance = snapshots.aggregate(total=Sum('quantity'))['total'] or 0.0
+        details = details.filter(movement__created_at__gte=_day_start(snapshot_date + timedelta(days=1)))
+    return balance + (details.aggregate(total=Sum('signed_quantity'))['total'] or 0.0)
+
+
+def month_end(day):
+    """Último día del mes de `day`"""
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def pending_snapshot_periods(until):
+    """Cierres de mes aún sin snapshot, desde el último existente (o el primer movimiento) hasta `until`"""
+    latest = StockSnapshot.objects.aggregate(latest=Max('period_end'))['latest']
+    if latest:
+        current = month_end(latest + timedelta(days=1))
+    else:
+        first = InventoryMovementDetail.objects.aggregate(first=Min('movement__created_at'))['first']
+        if first is None:
+            return []
+        current = month_end(timezone.localtime(first).date())
+    periods = []
+    while current <= until:
+        periods.append(current)
+        current = month_end(current + timedelta(days=1))
+    return periods
+
+
+@transaction.atomic
+def create_stock_snapshot(period_end):
+    """
+    Genera (o regenera) los saldos de cierre de `period_end` para todas las variantes
+    y almacenes: snapshot anterior + movimientos del periodo, en una agregación.
+    Solo se guardan saldos distintos de cero. Devuelve el número de filas creadas.
+    """
+    period_end = month_end(period_end)
+    boundary = _day_start(period_end + timedelta(days=1))
+    balances = defaultdict(float)
+    details = annotate_signed_quantity(InventoryMovementDetail.objects.filter(movement__created_at__lt=boundary))
+    previous = latest_snapshot_before(period_end)
+    if previous:
+        for variant_id, warehouse_id, quantity in StockSnapshot.objects.filter(period_end=previous).values_list(
+            'product_variant_id', 'warehouse_id', 'quantity'
+        ):
+            balances[(variant_id, warehouse_id)] += quantity
+        details = details.filter(movement__created_at__gte=_day_start(previous + timedelta(days=1)))
+    totals = details.values('product_variant_id', 'movement__warehouse_id').annotate(total=Sum('signed_quantity')).order_by()
+    for row in totals:
+        balances[(row['product_variant_id'], row['movement__warehouse_id'])] += row['total'] or 0
+
+    balances = {key: quantity for key, quantity in balances.items() if quantity}
+    costs = dict(ProductVariant.objects.filter(
+        id__in={variant_id for variant_id, _ in balances}
+    ).values_list('id', 'cost_price'))
+    StockSnapshot.objects.filter(period_end=period_end).delete()
+    snapshots = []
+    for (variant_id, warehouse_id), quantity in balances.items():
+        unit_cost = costs.get(variant_id) or Decimal('0')
+        snapshots.append(StockSnapshot(
+            product_variant_id=variant_id, warehouse_id=warehouse_id, period_end=period_end,
+            quantity=quantity, unit_cost=unit_cost,
+            total_value=(Decimal(str(quantity)) * unit_cost).quantize(Decimal('0.01')),
+        ))
+    StockSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
+
+
+def _entry(row, balance):
+    unit_cost = float(row['price'] or 0)
+    quantity = abs(row['quantity'] or 0)
+    inbound = row['signed_quantity'] >= 0
+    return {
+        'id': row['id'],
+        'date': str(row['movement__created_at']),
+        'movement_id': row['movement_id'],
+        'description': row['movement__movement_type'],
+        'movement_type': row['movement__movement_type'],
+        'quantity_in': quantity if inbound else None,
+        'quantity_out': quantity if not inbound else None,
+        'balance': balance,
+        'unit_cost': unit_cost,
+        'total_value': balance * unit_cost,
+        'reference': row['movement__reference_document'] or row['movement_id'],
+        'warehouse_id': row['movement__warehouse_id'],
+        'warehouse': row['movement__warehouse__name'],
+        'variant_id': row['product_variant_id'],
+        'variant_sku': row['product_variant__sku'],
+        'user': row['movement__user__email'],
+        'notes': row['movement__notes'],
+    }
+
+
+def kardex_rows(product_id, warehouse_id=None, start=None, end=None, after=None):
+    """
+    Consulta de las filas del kardex, ordenadas: desde `start` o después de la fila
+    `after` = (created_at, movement_id, detail_id) de un cursor, y antes de `end`.
+    """
+    details = kardex_details(product_id, warehouse_id)
+    if end:
+        details = details.filter(movement__created_at__lt=end)
+    if after:
+        created_at, movement_id, detail_id = after
+        details = details.filter(
+            Q(movement__created_at__gt=created_at)
+            | Q(movement__created_at=created_at, movement_id__gt=movement_id)
+            | Q(movement__created_at=created_at, movement_id=movement_id, id__gt=detail_id)
+        )
+    elif start:
+        details = details.filter(movement__created_at__gte=start)
+    return details.order_by(*KARDEX_ORDERING).values(*KARDEX_FIELDS)
+
+
+def build_kardex(product_id, warehouse_id=None, date_from=None, date_to=None, cursor=None, page_size=None):
+    """
+    Construye el kardex de un producto.
+
+    Sin `page_size` ni `cursor` devuelve todas las filas del rango. Con paginación,
+    `next_cursor` permite pedir la siguiente página sin recalcular saldos previos.
+    """
+    end = _day_start(date_to + timedelta(days=1)) if date_to else None
+    if cursor:
+        created_at, movement_id, detail_id, balance = decode_cursor(cursor)
+        start, after = None, (created_at, movement_id, detail_id)
+    else:
+        start, after = (_day_start(date_from) if date_from else None), None
+        balance = opening_balance(product_id, warehouse_id, start)
+
+    rows = kardex_rows(product_id, warehouse_id, start=start, end=end, after=after)
+    paginate = bool(cursor or page_size)
+    if paginate:
+        page_size = min(page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        rows = rows[:page_size + 1]
+
+    entries, last_row = [], None
+    for row in rows.iterator(chunk_size=2000):
+        if paginate and len(entries) == page_size:
+            return KardexPage(entries, encode_cursor(
+                last_row['movement__created_at'], last_row['movement_id'], last_row['id'], balance
+            ))
+        balance += row['signed_quantity']
+        entries.append(_entry(row, balance))
+        last_row = row
+    return KardexPage(entries)
+
+
+def kardex_from_request(request, product_id, default_page_size=None):
+    """Lee filtros y paginación de los query params estándar del kardex"""
+    params = request.query_params
+    page_size = params.get('page_size')
+    try:
+        page_size = int(page_size) if page_size else default_page_size
+    except ValueError:
+        raise ValidationError({'page_size': 'Debe ser un número entero'})
+    warehouse_id = params.get('warehouse') or None
+    if warehouse_id and not warehouse_id.isdigit():
+        raise ValidationError({'warehouse': 'Debe ser un id numérico'})
+    return build_kardex(
+        product_id,
+        warehouse_id=warehouse_id,
+        date_from=parse_date_param(params.get('date_from'), 'date_from'),
+        date_to=parse_date_param(params.get('date_to'), 'date_to'),
+        cursor=params.get('cursor') or None,
+        page_size=page_size,
+    )
+
+
+def kardex_response_data(request, page):
+    """Lista simple (compatibilidad) o página con cursor si se pidió paginación"""
+    params = request.query_params
+    if not (params.get('cursor') or params.get('page_size')):
+        return page.entries
+    next_url = None
+    if page.next_cursor:
+        query = params.copy()
+        query['cursor'] = page.next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+    return {'next': next_url, 'next_cursor': page.next_cursor, 'results': page.entries}
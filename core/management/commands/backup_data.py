@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.backup import create_backup
+from core.db import without_statement_timeout
+
+
+class Command(BaseCommand):
+    help = (
+        'Respaldo por tabla en JSONL comprimido (gzip) con manifiesto de filas y sumas sha256. '
+        'Con --incremental sólo copia lo modificado desde el último respaldo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true', help='Filas nuevas/modificadas desde el último respaldo')
+        parser.add_argument('--output', help='Directorio de respaldos (por defecto BACKUP_DIR)')
+        parser.add_argument('--chunk-rows', type=int, help='Filas por archivo (por defecto BACKUP_CHUNK_ROWS)')
+
+    def handle(self, *args, **options):
+        self.stdout.write("💾 Generando respaldo...")
+        started = time.perf_counter()
+        with without_statement_timeout():
+            path = create_backup(
+                incremental=options['incremental'], directory=options['output'],
+                chunk_rows=options['chunk_rows'], log=lambda message: self.stdout.write(f"   {message}"),
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ Respaldo listo en {elapsed:.1f}s: {path}"))
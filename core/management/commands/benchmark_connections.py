@@ -0,0 +1,94 @@
+import statistics
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+
+def request_cycle(alias, query):
+    """
+    Lo que hace Django alrededor de cada petición en un worker: request_started cierra las
+    conexiones vencidas, la vista consulta y request_finished cierra o conserva la conexión
+    según CONN_MAX_AGE (o la devuelve al pool).
+    """
+    request_started.send(sender=WSGIHandler)
+    with connections[alias].cursor() as cursor:
+        cursor.execute(query)
+        cursor.fetchall()
+    request_finished.send(sender=WSGIHandler)
+
+
+def measure(alias, requests, query):
+    """Tiempos (ms) de cada ciclo y número de conexiones abiertas"""
+    opened = []
+
+    def count_connection(sender, connection, **kwargs):
+        if connection.alias == alias:
+            opened.append(connection)
+
+    connection_created.connect(count_connection)
+    try:
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            request_cycle(alias, query)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        connection_created.disconnect(count_connection)
+        connections[alias].close()
+    return timings, len(opened)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el costo de conexión por petición: compara una conexión nueva por petición '
+        '(CONN_MAX_AGE=0, sin pool) contra la configuración actual de DATABASES (persistente o pool).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Peticiones simuladas por modo')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Alias de la base a medir')
+        parser.add_argument('--query', default='SELECT 1', help='Consulta que ejecuta cada petición')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        if connection.in_atomic_block:
+            # request_finished cerraría la conexión en medio de la transacción
+            raise CommandError('benchmark_connections no puede correr dentro de una transacción')
+        configured = connection.settings_dict
+        baseline = {
+            **configured,
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+            'OPTIONS': {key: value for key, value in configured['OPTIONS'].items() if key != 'pool'},
+        }
+        pool = configured['OPTIONS'].get('pool')
+        current = f"pool {pool.get('min_size')}-{pool.get('max_size')}" if isinstance(pool, dict) else (
+            'pool' if pool else f"CONN_MAX_AGE={configured['CONN_MAX_AGE']}"
+        )
+        target = configured['NAME'] if connection.vendor == 'sqlite' else f"{configured['HOST']}:{configured['PORT']}"
+        self.stdout.write(f"🔌 {connection.vendor} {target}: {options['requests']} peticiones por modo")
+
+        results = []
+        for label, settings_dict in (('Conexión nueva por petición', baseline), (f'Configuración actual ({current})', configured)):
+            connection.close()
+            connection.settings_dict = settings_dict
+            try:
+                measure(alias, 5, options['query'])  # calentamiento
+                timings, opened = measure(alias, options['requests'], options['query'])
+            finally:
+                connection.settings_dict = configured
+            results.append((label, timings, opened))
+
+        for label, timings, opened in results:
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            self.stdout.write(
+                f"   {label}: p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms, "
+                f"{opened} conexiones abiertas"
+            )
+        saved = statistics.median(results[0][1]) - statistics.median(results[1][1])
+        self.stdout.write(self.style.SUCCESS(f"✅ Costo de conexión evitado por petición (p50): {saved:.2f} ms"))
@@ -0,0 +1,150 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from core.kardex import DEFAULT_PAGE_SIZE, kardex_rows
+from core.models import (
+    AuditLog, CustomerPayment, CustomerProductDiscount, InventoryMovement, InventoryMovementDetail,
+    Product, Sale, SupplierPayment,
+)
+from core.seeding import DatasetSeeder
+
+# Índices de la migración 0024_hot_query_indexes
+HOT_INDEX_MODELS = (
+    AuditLog, InventoryMovement, Product, CustomerPayment, SupplierPayment, Sale, CustomerProductDiscount,
+)
+HOT_INDEX_NAMES = {
+    'auditlog_object_ts_idx', 'auditlog_timestamp_idx', 'movement_created_idx', 'product_name_id_idx',
+    'custpayment_date_idx', 'custpayment_customer_date_idx', 'suppayment_date_idx', 'suppayment_supplier_date_idx',
+    'sale_customer_status_idx', 'sale_status_idx', 'sale_unpaid_idx', 'discount_active_product_idx',
+}
+
+
+def hot_queries(sample):
+    """Mismas formas de consulta que core/views.py, core/new_views.py y core/kardex.py"""
+    product_id, customer_id = sample['product_id'], sample['customer_id']
+    first_name = sample['first_name']
+    return [
+        ('Bitácora de un producto', AuditLog.objects.filter(object_id=str(product_id), model='Product').order_by('-timestamp')),
+        ('Bitácora (listado)', AuditLog.objects.order_by('-timestamp')[:50]),
+        ('Movimientos (listado)', InventoryMovement.objects.order_by('-created_at')[:50]),
+        # La primera página de /kardex/?page_size= (build_kardex pide una fila de más)
+        ('Kardex de un producto', kardex_rows(sample['kardex_product_id'])[:DEFAULT_PAGE_SIZE + 1]),
+        ('Catálogo por nombre', Product.objects.order_by('name', 'id')[:100]),
+        ('Catálogo keyset', Product.objects.filter(
+            Q(name__gt=first_name) | Q(name=first_name, id__gt=product_id)
+        ).order_by('name', 'id')[:100]),
+        ('Pagos de clientes', CustomerPayment.objects.order_by('-payment_date')[:50]),
+        ('Pagos de un cliente', CustomerPayment.objects.filter(customer_id=customer_id).order_by('-payment_date')),
+        ('Ventas por estado', Sale.objects.filter(status='CONFIRMED')[:50]),
+        ('Ventas pendientes de un cliente', Sale.objects.filter(customer_id=customer_id, is_paid=False)),
+        ('Descuentos vigentes de un producto', CustomerProductDiscount.objects.filter(product_id=product_id, is_active=True)),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara planes y tiempos de las consultas frecuentes con y sin los índices de '
+        '0024_hot_query_indexes. Todo corre en una transacción que se revierte al final, pero '
+        'los DROP INDEX bloquean las tablas (ACCESS EXCLUSIVE en PostgreSQL) mientras mide: '
+        'sólo para bases de benchmark (--seed o --i-know-this-locks-tables).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Genera datos sintéticos antes de medir (se revierten)')
+        parser.add_argument('--products', type=int, help='Productos a generar con --seed')
+        parser.add_argument('--movements', type=int, help='Movimientos a generar con --seed')
+        parser.add_argument('--customers', type=int, help='Clientes a generar con --seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Ejecuciones por consulta (se reporta la mediana)')
+        parser.add_argument('--plans', action='store_true', help='Imprime el plan completo de cada consulta')
+        parser.add_argument('--output', help='Guarda el resultado en JSON')
+        parser.add_argument(
+            '--i-know-this-locks-tables', action='store_true', dest='locks_tables',
+            help='Confirma que la base es de benchmark: las tablas medidas quedan bloqueadas durante la comparación',
+        )
+
+    def handle(self, *args, **options):
+        if not (options['seed'] or options['locks_tables']):
+            raise CommandError(
+                f"explain_hot_queries borra índices de {', '.join(model._meta.db_table for model in HOT_INDEX_MODELS)} "
+                'dentro de una transacción y los bloquea hasta terminar. Úselo sólo en una base de benchmark, '
+                'con --seed o --i-know-this-locks-tables.'
+            )
+        self.repeat = max(1, options['repeat'])
+        with transaction.atomic():
+            if options['seed']:
+                self.stdout.write("🌱 Generando datos sintéticos (se revierten al terminar)...")
+                DatasetSeeder(
+                    log=self.stdout.write, products=options['products'],
+                    movements=options['movements'], customers=options['customers'],
+                ).run()
+            self._analyze()
+            queries = hot_queries(self._sample())
+
+            after = self._measure(queries)
+            savepoint = transaction.savepoint()
+            dropped = self._drop_hot_indexes()
+            self._analyze()
+            before = self._measure(queries)
+            transaction.savepoint_rollback(savepoint)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"🗂️  Índices comparados: {dropped} ({connection.vendor})")
+        results = []
+        for (name, before_ms, before_plan), (_, after_ms, after_plan) in zip(before, after):
+            speedup = before_ms / after_ms if after_ms else 0
+            self.stdout.write(f"⏱️  {name}: {before_ms:.2f} ms -> {after_ms:.2f} ms (x{speedup:.1f})")
+            if options['plans']:
+                self.stdout.write(f"   antes:\n{self._indent(before_plan)}\n   después:\n{self._indent(after_plan)}")
+            results.append({
+                'query': name, 'before_ms': round(before_ms, 3), 'after_ms': round(after_ms, 3),
+                'before_plan': before_plan, 'after_plan': after_plan,
+            })
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                json.dump({'vendor': connection.vendor, 'results': results}, out, ensure_ascii=False, indent=2)
+            self.stdout.write(f"💾 Resultado guardado en {options['output']}")
+        self.stdout.write(self.style.SUCCESS("✅ Comparación terminada (sin cambios en la base de datos)"))
+
+    def _sample(self):
+        product = Product.objects.order_by('name', 'id').values('id', 'name').first() or {'id': 0, 'name': ''}
+        audited = AuditLog.objects.filter(model='Product').values_list('object_id', flat=True).first()
+        return {
+            'product_id': int(audited) if audited and audited.isdigit() else product['id'],
+            'first_name': product['name'],
+            'kardex_product_id': InventoryMovementDetail.objects.values_list(
+                'product_variant__product_id', flat=True).first() or 0,
+            'customer_id': CustomerPayment.objects.values_list('customer_id', flat=True).first() or 0,
+        }
+
+    def _analyze(self):
+        # Estadísticas frescas para que el planificador vea los datos recién generados
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _drop_hot_indexes(self):
+        dropped = 0
+        with connection.cursor() as cursor:
+            for model in HOT_INDEX_MODELS:
+                for index in model._meta.indexes:
+                    if index.name in HOT_INDEX_NAMES:
+                        cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+                        dropped += 1
+        return dropped
+
+    def _measure(self, queries):
+        results = []
+        for name, queryset in queries:
+            timings = []
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results.append((name, statistics.median(timings), queryset.explain()))
+        return results
+
+    def _indent(self, plan):
+        return '\n'.join(f'      {line}' for line in plan.splitlines())
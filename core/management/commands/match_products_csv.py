@@ -0,0 +1,65 @@
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from core.matching import DEFAULT_THRESHOLD, catalog_matcher
+
+NAME_COLUMNS = ('Producto', 'producto', 'nombre', 'name')
+
+
+class Command(BaseCommand):
+    help = 'Concilia los nombres de producto de un CSV (mov_inv.csv, inv_inicial30.csv...) contra el catálogo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Archivo CSV a conciliar')
+        parser.add_argument('--column', help=f'Columna con el nombre (por defecto la primera de {", ".join(NAME_COLUMNS)})')
+        parser.add_argument('--delimiter', help="Separador; por defecto '|' si aparece en el encabezado, si no ','")
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Puntaje mínimo (0-1)')
+        parser.add_argument('--output', help='CSV de salida con nombre, producto, id y puntaje por renglón')
+
+    def handle(self, *args, **options):
+        try:
+            file = open(options['csv_file'], 'r', encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(f'No se pudo abrir el archivo: {exc}')
+
+        with file:
+            header = file.readline()
+            file.seek(0)
+            delimiter = options['delimiter'] or ('|' if '|' in header else ',')
+            reader = csv.DictReader(file, delimiter=delimiter)
+            column = options['column'] or next((c for c in NAME_COLUMNS if c in (reader.fieldnames or [])), None)
+            if not column or column not in (reader.fieldnames or []):
+                raise CommandError(f'No se encontró la columna de nombre en {reader.fieldnames}')
+
+            started = time.perf_counter()
+            matcher = catalog_matcher()
+            self.stdout.write(f"📚 Catálogo indexado: {len(matcher)} productos en {time.perf_counter() - started:.2f}s")
+
+            cache, rows = {}, []
+            started = time.perf_counter()
+            for row in reader:
+                name = (row.get(column) or '').strip()
+                if name not in cache:
+                    cache[name] = matcher.match(name, threshold=options['threshold'])
+                rows.append((name, cache[name]))
+            elapsed = time.perf_counter() - started
+
+        matched = sum(1 for _, result in rows if result)
+        unmatched = sorted({name for name, result in rows if not result and name})
+        for name in unmatched:
+            suggestion = matcher.top(name, limit=1)
+            hint = f" (¿{suggestion[0].name}? {suggestion[0].score:.2f})" if suggestion else ''
+            self.stdout.write(f"⚠️  Sin coincidencia: {name}{hint}")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as out:
+                writer = csv.writer(out)
+                writer.writerow(['nombre_csv', 'producto', 'product_id', 'puntaje'])
+                for name, result in rows:
+                    writer.writerow([name, result.name, result.product_id, f'{result.score:.3f}'] if result else [name, '', '', ''])
+            self.stdout.write(f"💾 Resultado guardado en {options['output']}")
+
+        per_row = elapsed * 1000 / len(rows) if rows else 0
+        self.stdout.write(f"✅ Renglones con coincidencia: {matched}/{len(rows)}")
+        self.stdout.write(f"❌ Nombres distintos sin coincidencia: {len(unmatched)}")
+        self.stdout.write(self.style.SUCCESS(f"⏱️  {per_row:.3f} ms por renglón"))
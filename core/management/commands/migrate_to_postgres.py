@@ -0,0 +1,58 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.db import without_statement_timeout
+from core.pgmigrate import MigrationError, migrate_database, mismatches
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia una base SQLite a la base PostgreSQL configurada con COPY FROM STDIN: tablas por niveles '
+        'de llaves foráneas, en paralelo por proceso, reinicia secuencias y verifica filas y sumas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', default=str(Path(settings.BASE_DIR) / 'db.sqlite3'),
+            help='Archivo SQLite de origen (con las mismas migraciones aplicadas que el destino)',
+        )
+        parser.add_argument('--workers', type=int, default=4, help='Procesos que cargan tablas en paralelo')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Filas por lectura del cursor de origen')
+        parser.add_argument('--truncate', action='store_true', help='Vacía las tablas del destino antes de copiar')
+        parser.add_argument('--no-verify', action='store_true', help='Omite la comparación de filas y sumas')
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        if not source.is_file():
+            raise CommandError(f'No existe la base de origen {source}')
+        started = time.perf_counter()
+        self.stdout.write(f"🔄 Migrando {source} a PostgreSQL...")
+        try:
+            with without_statement_timeout():  # un solo COPY por tabla
+                results = migrate_database(
+                    source,
+                    workers=options['workers'],
+                    truncate=options['truncate'],
+                    chunk_size=options['chunk_size'],
+                    verify=not options['no_verify'],
+                    log=lambda message: self.stdout.write(f"   {message}"),
+                )
+        except MigrationError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+        total = sum(result['rows'] for result in results.values())
+        failed = mismatches(results)
+        for label in failed:
+            result = results[label]
+            self.stdout.write(self.style.ERROR(
+                f"❌ {label}: origen {result['rows']} filas ({result['checksum'][:12]}), "
+                f"destino {result['target_rows']} filas ({result['target_checksum'][:12]})"
+            ))
+        if failed:
+            raise CommandError(f'{len(failed)} tablas no coinciden con el origen')
+        verified = '' if options['no_verify'] else ', filas y sumas verificadas'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total} filas copiadas en {len(results)} tablas ({elapsed:.1f}s){verified}"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from core.db import without_statement_timeout
+from core.stock import rebuild_stock
+
+
+class Command(BaseCommand):
+    help = 'Recalcula ProductWarehouseStock desde el historial de movimientos autorizados en una sola agregación'
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔄 Recalculando existencias desde InventoryMovementDetail...")
+        with without_statement_timeout():
+            updated, created, zeroed = rebuild_stock()
+        self.stdout.write(f"✅ Filas actualizadas: {updated}")
+        self.stdout.write(f"➕ Filas creadas: {created}")
+        self.stdout.write(f"⚪ Filas puestas en cero: {zeroed}")
+        self.stdout.write(self.style.SUCCESS("🎉 Stock reconstruido"))
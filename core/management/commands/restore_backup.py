@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from core.backup import BackupError, backup_chain, restore_backup, verify_backup
+from core.db import without_statement_timeout
+
+
+class Command(BaseCommand):
+    help = (
+        'Restaura un respaldo de backup_data (y los anteriores de su cadena incremental) en la base '
+        'configurada: verifica sumas y filas, inserta con upsert y restaura en paralelo por niveles de dependencia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Directorio del respaldo (o su manifest.json)')
+        parser.add_argument('--workers', type=int, default=4, help='Tablas en paralelo (SQLite usa 1)')
+        parser.add_argument('--verify-only', action='store_true', help='Sólo verifica archivos, sin escribir en la base')
+
+    def handle(self, *args, **options):
+        try:
+            if options['verify_only']:
+                self.verify(options['path'])
+                return
+            started = time.perf_counter()
+            self.stdout.write("🔄 Restaurando respaldo...")
+            with without_statement_timeout():
+                results = restore_backup(
+                    options['path'], workers=options['workers'], log=lambda message: self.stdout.write(f"   {message}")
+                )
+        except BackupError as exc:
+            raise CommandError(str(exc))
+        mismatched = {label: counts for label, counts in results.items() if counts[1] < counts[0]}
+        for label, (restored, in_db) in mismatched.items():
+            self.stdout.write(self.style.WARNING(f"⚠️ {label}: {restored} filas restauradas, {in_db} en la base"))
+        elapsed = time.perf_counter() - started
+        total = sum(restored for restored, _ in results.values())
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} filas restauradas en {len(results)} tablas ({elapsed:.1f}s)"))
+
+    def verify(self, path):
+        failed = False
+        for manifest in backup_chain(path):
+            errors = verify_backup(manifest)
+            rows = sum(entry['rows'] for entry in manifest['models'].values())
+            if errors:
+                failed = True
+                for error in errors:
+                    self.stdout.write(self.style.ERROR(f"❌ {manifest['id']}: {error}"))
+            else:
+                self.stdout.write(f"✅ {manifest['id']} ({manifest['kind']}): {rows} filas verificadas")
+        if failed:
+            raise CommandError('El respaldo tiene archivos dañados o incompletos')
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.db import without_statement_timeout
+from core.models import Product
+from core.seeding import SEED_PREFIX, DatasetSeeder
+from core.stock import rebuild_stock
+
+# Volúmenes de referencia: 'full' es el tamaño esperado en producción a mediano plazo
+SCALES = {
+    'small': {'products': 2000, 'movements': 8000, 'details_per_movement': 5, 'customers': 400,
+              'audit_logs': 20000, 'payments': 4000, 'sales': 4000, 'discounts': 2000, 'quotations': 500},
+    'full': {'products': 50000, 'movements': 200000, 'details_per_movement': 5, 'customers': 10000,
+             'audit_logs': 200000, 'payments': 50000, 'sales': 50000, 'discounts': 20000, 'quotations': 10000},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos en volumen (prefijo BENCH) para benchmarks: productos, '
+        'movimientos con detalles, clientes, ventas, cotizaciones y bitácora. Escribe en la base configurada.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='full', help='Volúmenes predefinidos')
+        parser.add_argument('--products', type=int)
+        parser.add_argument('--movements', type=int)
+        parser.add_argument('--details-per-movement', type=int)
+        parser.add_argument('--customers', type=int)
+        parser.add_argument('--quotations', type=int)
+        parser.add_argument('--seed', type=int, default=42, help='Semilla para datos reproducibles')
+        parser.add_argument('--force', action='store_true', help='Genera aunque ya existan datos BENCH')
+
+    def handle(self, *args, **options):
+        if not options['force'] and Product.objects.filter(sku__startswith=f'{SEED_PREFIX}-').exists():
+            raise CommandError('Ya existen datos BENCH en esta base; use --force para agregar otro lote')
+        counts = dict(SCALES[options['scale']])
+        for option in ('products', 'movements', 'details_per_movement', 'customers', 'quotations'):
+            if options[option] is not None:
+                counts[option] = options[option]
+
+        self.stdout.write(f"🌱 Generando datos '{options['scale']}' en {connection.vendor} ({connection.settings_dict['NAME']})")
+        started = time.perf_counter()
+        with without_statement_timeout():
+            stats = DatasetSeeder(seed=options['seed'], log=self.stdout.write, **counts).run()
+            self.stdout.write("🔄 Recalculando existencias desde los movimientos...")
+            updated, created, _ = rebuild_stock()
+            self.stdout.write(f"📊 Filas de stock: {updated + created}")
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f'{name}={value}' for name, value in stats.items())
+        self.stdout.write(self.style.SUCCESS(f"✅ Datos generados en {elapsed:.1f}s: {summary}"))
@@ -0,0 +1,166 @@
+"""
+Coincidencia difusa de nombres de producto para conciliar CSV de movimientos e inventario.
+
+En lugar de comparar cada renglón contra todo el catálogo con difflib, el catálogo se
+indexa una vez:
+- normalización: mayúsculas/acentos/espacios, laboratorio entre paréntesis y dosis
+  ("30 MG" -> "30mg", "C/30" -> "c/30") como rasgos aparte
+- índice invertido de palabras y trigramas para generar pocos candidatos
+- vectores dispersos de trigramas con norma precalculada; el puntaje de cada candidato
+  es un producto punto entre diccionarios, más ajustes por dosis y laboratorio
+
+No depende de modelos ni de settings, así que también lo usan los scripts sueltos
+(analizar_movimientos_csv.py, procesar_inventario_inicial.py).
+"""
+import math
+import re
+from collections import Counter
+
+from .search import normalize_search_text
+
+DEFAULT_THRESHOLD = 0.8
+MAX_CANDIDATES = 50
+# Palabras/trigramas presentes en más de esta fracción del catálogo no votan ("tabs", " c/")
+COMMON_FEATURE_RATIO = 0.2
+DOSE_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*(mg|mcg|g|ml|ui|%)(?![a-z])')
+COUNT_PATTERN = re.compile(r'c\s*/\s*(\d+)')
+PAREN_PATTERN = re.compile(r'\(([^)]*)\)')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[./][a-z0-9]+)*')
+
+
+def normalize_product_name(name):
+    """Misma regla base que los scripts (vacío o '-' es nada), sin acentos y en minúsculas"""
+    if not name or str(name).strip() == '-':
+        return ''
+    return normalize_search_text(name)
+
+
+class ParsedName:
+    """Nombre normalizado separado en texto base, laboratorio, dosis y presentación"""
+    __slots__ = ('normalized', 'key', 'base', 'lab', 'extras', 'doses', 'tokens', 'grams', 'norm')
+
+    def __init__(self, name):
+        self.normalized = normalize_product_name(name)
+        groups = [group.strip() for group in PAREN_PATTERN.findall(self.normalized)]
+        self.lab = groups[0] if groups else ''
+        self.extras = frozenset(groups[1:])  # (SIN EMPAQUE), (EMPAQUE)...
+        base = PAREN_PATTERN.sub(' ', self.normalized)
+        doses = {f"{value.replace(',', '.')}{unit}" for value, unit in DOSE_PATTERN.findall(base)}
+        doses |= {f"c/{count}" for count in COUNT_PATTERN.findall(base)}
+        self.doses = frozenset(doses)
+        base = COUNT_PATTERN.sub(lambda m: f" c/{m.group(1)} ", DOSE_PATTERN.sub(
+            lambda m: f" {m.group(1).replace(',', '.')}{m.group(2)} ", base))
+        self.base = ' '.join(base.split())
+        self.key = (self.base, self.lab, self.extras)  # igualdad sin importar "30 MG" vs "30MG"
+        self.tokens = frozenset(TOKEN_PATTERN.findall(self.base)) | {f"({group})" for group in groups if group}
+        self.grams = Counter()
+        for token in self.tokens:
+            padded = f" {token} "
+            self.grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        self.norm = math.sqrt(sum(count * count for count in self.grams.values())) or 1.0
+
+
+def similarity(query, candidate):
+    """Puntaje 0..1 entre dos ParsedName"""
+    if query.key == candidate.key:
+        return 1.0
+    small, large = sorted((query.grams, candidate.grams), key=len)
+    cosine = sum(count * large.get(gram, 0) for gram, count in small.items()) / (query.norm * candidate.norm)
+    union = query.tokens | candidate.tokens
+    jaccard = len(query.tokens & candidate.tokens) / len(union) if union else 0.0
+    score = 0.7 * cosine + 0.3 * jaccard
+    # 30MG vs 100MG o C/30 vs C/60 son productos distintos aunque el texto se parezca
+    if query.doses and candidate.doses and query.doses != candidate.doses:
+        score *= 0.6
+    if query.lab and candidate.lab:
+        score += 0.05 if query.lab == candidate.lab else -0.1
+    if query.extras != candidate.extras:
+        score -= 0.05
+    return max(0.0, min(1.0, score))
+
+
+class MatchResult:
+    __slots__ = ('product_id', 'name', 'score', 'payload')
+
+    def __init__(self, product_id, name, score, payload=None):
+        self.product_id = product_id
+        self.name = name
+        self.score = score
+        self.payload = payload
+
+    def __repr__(self):
+        return f"MatchResult({self.product_id}, {self.name!r}, {self.score:.3f})"
+
+
+class ProductMatcher:
+    """
+    Índice del catálogo. `products` es un iterable de (id, nombre) o de (id, nombre, payload);
+    el payload (p. ej. el dict de la API) se devuelve tal cual en el resultado.
+    """
+
+    def __init__(self, products):
+        self._ids, self._names, self._payloads, self._parsed = [], [], [], []
+        self._exact = {}
+        self._token_index = {}
+        self._gram_index = {}
+        for item in products:
+            product_id, name = item[0], item[1]
+            parsed = ParsedName(name)
+            if not parsed.normalized:
+                continue
+            position = len(self._ids)
+            self._ids.append(product_id)
+            self._names.append(name)
+            self._payloads.append(item[2] if len(item) > 2 else None)
+            self._parsed.append(parsed)
+            self._exact.setdefault(parsed.key, position)
+            for token in parsed.tokens:
+                self._token_index.setdefault(token, []).append(position)
+            for gram in parsed.grams:
+                self._gram_index.setdefault(gram, []).append(position)
+        self._common_limit = max(100, int(len(self._ids) * COMMON_FEATURE_RATIO))
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(queryset.values_list('id', 'name'))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _result(self, position, score):
+        return MatchResult(self._ids[position], self._names[position], score, self._payloads[position])
+
+    def candidates(self, parsed, limit=MAX_CANDIDATES):
+        """Posiciones que comparten más trigramas/palabras con la consulta"""
+        votes = Counter()
+        for features, index, weight in ((parsed.tokens, self._token_index, 3), (parsed.grams, self._gram_index, 1)):
+            for feature in features:
+                postings = index.get(feature, ())
+                if len(postings) <= self._common_limit:
+                    votes.update(dict.fromkeys(postings, weight))
+        return [position for position, _ in votes.most_common(limit)]
+
+    def top(self, name, limit=5):
+        parsed = name if isinstance(name, ParsedName) else ParsedName(name)
+        if not parsed.normalized:
+            return []
+        scored = [(similarity(parsed, self._parsed[pos]), pos) for pos in self.candidates(parsed)]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self._result(position, score) for score, position in scored[:limit]]
+
+    def match(self, name, threshold=DEFAULT_THRESHOLD):
+        """Mejor coincidencia con puntaje >= threshold, o None"""
+        parsed = ParsedName(name)
+        if not parsed.normalized:
+            return None
+        exact = self._exact.get(parsed.key)
+        if exact is not None:
+            return self._result(exact, 1.0)
+        best = self.top(parsed, limit=1)
+        return best[0] if best and best[0].score >= threshold else None
+
+
+def catalog_matcher():
+    """Matcher sobre todos los productos de la base de datos"""
+    from .models import Product
+    return ProductMatcher.from_queryset(Product.objects.order_by('id'))
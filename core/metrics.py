@@ -0,0 +1,114 @@
+"""
+Métricas estilo Prometheus para la API, la base de datos, el caché y Celery.
+
+- Los contadores e histogramas viven en el proceso (prometheus_client). Con gunicorn
+  (varios workers) se define PROMETHEUS_MULTIPROC_DIR antes de arrancar: cada proceso
+  escribe sus valores en archivos mmap de ese directorio y /metrics los suma al
+  responder, sin importar qué worker atienda el scrape. gunicorn.conf.py limpia los
+  archivos de los workers que terminan.
+- Los workers de Celery sólo aparecen en /metrics si comparten ese directorio con
+  gunicorn (mismo contenedor o volumen compartido).
+- Los indicadores de dominio (movimientos sin autorizar, variantes con existencia
+  negativa) no son contadores: se calculan con una consulta en cada scrape.
+
+La tasa de aciertos del caché se obtiene en Prometheus, p. ej.:
+    sum(rate(cache_requests_total{result="hit"}[5m])) / sum(rate(cache_requests_total[5m]))
+"""
+import os
+import time
+
+from celery.signals import task_postrun, task_prerun
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+UNMATCHED_VIEW = 'unmatched'  # rutas sin resolver (404): no se etiquetan por path para no disparar la cardinalidad
+
+REQUESTS = Counter(
+    'http_requests_total', 'Peticiones HTTP atendidas por ruta', ['method', 'view', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP por ruta', ['method', 'view'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Consultas SQL por petición', ['view'],
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 250, 500),
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_duration_seconds', 'Tiempo en base de datos por petición', ['view'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Consultas de caché por resultado (hit/miss)', ['cache', 'result'],
+)
+TASK_DURATION = Histogram(
+    'celery_task_duration_seconds', 'Duración de las tareas de Celery', ['task', 'state'],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 1800, 3600),
+)
+
+
+def observe_request(method, view, status, duration, queries, db_duration):
+    view = view or UNMATCHED_VIEW
+    REQUESTS.labels(method, view, str(status)).inc()
+    REQUEST_LATENCY.labels(method, view).observe(duration)
+    REQUEST_QUERIES.labels(view).observe(queries)
+    REQUEST_DB_TIME.labels(view).observe(db_duration)
+
+
+def observe_cache(name, hit):
+    CACHE_REQUESTS.labels(name, 'hit' if hit else 'miss').inc()
+
+
+# ============================================================================
+# Tareas de Celery
+# ============================================================================
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+# ============================================================================
+# Indicadores de dominio (calculados en cada scrape)
+# ============================================================================
+
+class DomainCollector:
+    def collect(self):
+        from .models import InventoryMovement, ProductWarehouseStock
+
+        pending = InventoryMovement.objects.filter(authorized=False, is_cancelled=False).count()
+        negative = (
+            ProductWarehouseStock.objects.filter(quantity__lt=0)
+            .values('product_variant').distinct().count()
+        )
+        yield GaugeMetricFamily(
+            'inventory_movements_pending_authorization', 'Movimientos de inventario sin autorizar ni cancelar',
+            value=pending,
+        )
+        yield GaugeMetricFamily(
+            'inventory_negative_stock_variants', 'Variantes con existencia negativa en algún almacén',
+            value=negative,
+        )
+
+
+def render_metrics():
+    """Texto de exposición de Prometheus: métricas de proceso (o de todos los workers) más las de dominio"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    domain = CollectorRegistry()
+    domain.register(DomainCollector())
+    return generate_latest(registry) + generate_latest(domain), CONTENT_TYPE_LATEST
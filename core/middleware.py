@@ -0,0 +1,181 @@
+"""
+Instrumentación por petición: consultas SQL, tiempo de base de datos, tiempo de
+render (serialización a JSON) y tamaño de la respuesta.
+
+- Las consultas se cuentan con connection.execute_wrapper: un perf_counter y un
+  incremento por consulta, sin guardar el SQL completo (DEBUG puede seguir en False).
+- Las consultas repetidas con el mismo SQL (mismos placeholders, distintos parámetros)
+  se cuentan aparte: muchas repetidas casi siempre es un N+1.
+- Cada respuesta lleva un encabezado Server-Timing (visible en las DevTools) y una
+  línea JSON en el logger 'core.requests'; las que exceden los presupuestos de
+  REQUEST_METRICS se registran como WARNING con la lista de presupuestos excedidos.
+- Con REQUEST_METRICS['PROMETHEUS'] los mismos datos alimentan los contadores de
+  core/metrics.py (expuestos en /metrics), etiquetados por nombre de vista.
+"""
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger('core.requests')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'QUERY_BUDGET': 50,
+    'DUPLICATE_QUERY_BUDGET': 20,
+    'TIME_BUDGET_MS': 1000,
+    'DB_TIME_BUDGET_MS': 500,
+    'SERVER_TIMING': True,
+    'TIMING_ALLOW_ORIGIN': '',
+    'PROMETHEUS': True,
+}
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_METRICS', {})}
+
+
+class QueryRecorder:
+    """execute_wrapper que acumula número de consultas, tiempo y SQL repetido"""
+    __slots__ = ('count', 'duration', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        return self.count - len(self.statements)
+
+    def merge(self, other):
+        """Suma las consultas que la petición hizo en otro hilo (ver core/product_center.py)"""
+        self.count += other.count
+        self.duration += other.duration
+        self.statements.update(other.statements)
+
+
+def record_queries(recorder):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+    return stack
+
+
+class RequestMetricsMiddleware:
+    # Con ASGI se queda en modo asíncrono: un middleware sólo síncrono obligaría a Django a
+    # ocupar un hilo durante toda la petición aunque la vista sea asíncrona.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = metrics_settings()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.config['ENABLED']:
+            return self.get_response(request)
+        recorder = request._metrics_recorder = QueryRecorder()
+        request._metrics_render = [None, None]
+        started = time.perf_counter()
+        with record_queries(recorder):
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        self.report(request, response, recorder, total)
+        return response
+
+    async def __acall__(self, request):
+        if not self.config['ENABLED']:
+            return await self.get_response(request)
+        recorder = request._metrics_recorder = QueryRecorder()
+        request._metrics_render = [None, None]
+        started = time.perf_counter()
+        # Se instala del lado síncrono: las conexiones son las que verán los sync_to_async de la
+        # vista (en modo asíncrono connections.all() daría otros objetos)
+        with await sync_to_async(record_queries)(recorder):
+            response = await self.get_response(request)
+        total = time.perf_counter() - started
+        self.report(request, response, recorder, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # Las Response de DRF se renderizan (JSON) justo después de este gancho
+        render = getattr(request, '_metrics_render', None)
+        if render is not None:
+            render[0] = time.perf_counter()
+
+            def rendered(response):
+                render[1] = time.perf_counter()
+            response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, recorder, total):
+        config = self.config
+        render_start, render_end = request._metrics_render
+        render_ms = (render_end - render_start) * 1000 if render_start and render_end else 0.0
+        db_ms = recorder.duration * 1000
+        total_ms = total * 1000
+        size = None if response.streaming else len(response.content)
+        match = getattr(request, 'resolver_match', None)
+
+        over_budget = [
+            name for name, value, budget in (
+                ('queries', recorder.count, config['QUERY_BUDGET']),
+                ('duplicate_queries', recorder.duplicates, config['DUPLICATE_QUERY_BUDGET']),
+                ('time', total_ms, config['TIME_BUDGET_MS']),
+                ('db_time', db_ms, config['DB_TIME_BUDGET_MS']),
+            ) if budget is not None and value > budget
+        ]
+
+        if config['SERVER_TIMING']:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={db_ms:.1f};desc="{recorder.count} queries, {recorder.duplicates} repeated"',
+                f'render;dur={render_ms:.1f}',
+                f'app;dur={max(total_ms - db_ms - render_ms, 0):.1f}',
+                f'total;dur={total_ms:.1f}',
+            ))
+            if config['TIMING_ALLOW_ORIGIN']:
+                response['Timing-Allow-Origin'] = config['TIMING_ALLOW_ORIGIN']
+
+        if config['PROMETHEUS']:
+            metrics.observe_request(
+                request.method, match.view_name if match else None, response.status_code,
+                total, recorder.count, recorder.duration,
+            )
+
+        level = logging.WARNING if over_budget else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'queries': recorder.count,
+                'duplicate_queries': recorder.duplicates,
+                'db_ms': round(db_ms, 2),
+                'render_ms': round(render_ms, 2),
+                'total_ms': round(total_ms, 2),
+                'bytes': size,
+                'over_budget': over_budget,
+            }))
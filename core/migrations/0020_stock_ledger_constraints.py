@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:42
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_stock_rows(apps, schema_editor):
+    # Antes de la restricción única: fusionar filas repetidas de (variante, almacén)
+    # en la de menor id, conservando la cantidad total
+    ProductWarehouseStock = apps.get_model('core', 'ProductWarehouseStock')
+    duplicates = (
+        ProductWarehouseStock.objects.values('product_variant_id', 'warehouse_id')
+        .annotate(rows=Count('id'), keep_id=Min('id'), total=Sum('quantity'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for dup in duplicates:
+        ProductWarehouseStock.objects.filter(id=dup['keep_id']).update(quantity=dup['total'] or 0)
+        ProductWarehouseStock.objects.filter(
+            product_variant_id=dup['product_variant_id'], warehouse_id=dup['warehouse_id']
+        ).exclude(id=dup['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_add_supplier_payment_model'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='movement_type',
+            field=models.CharField(max_length=40),
+        ),
+        migrations.RunPython(merge_duplicate_stock_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='productwarehousestock',
+            constraint=models.UniqueConstraint(fields=('product_variant', 'warehouse'), name='unique_stock_variant_warehouse'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_stock_ledger_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_end', models.DateField(help_text='Último día del mes que cierra el snapshot')),
+                ('quantity', models.FloatField(default=0)),
+                ('unit_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product_variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='core.productvariant')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.warehouse')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period_end', 'product_variant'], name='snapshot_period_variant_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product_variant', 'warehouse', 'period_end'), name='unique_snapshot_variant_warehouse_period')],
+            },
+        ),
+    ]
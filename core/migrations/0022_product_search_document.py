@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:49
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copia de core.search (normalize_search_text y build_search_document) al crear la
+# migración: el resultado no debe cambiar si después cambia el código de la app.
+def normalize_search_text(value):
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', value.lower()).strip()
+
+
+def build_search_document(product):
+    parts = [
+        product.name,
+        product.sku,
+        product.barcode,
+        product.category.name if product.category_id else '',
+        product.brand.name if product.brand_id else '',
+        product.description,
+    ]
+    return normalize_search_text(' '.join(part for part in parts if part))
+
+
+def fill_search_documents(apps, schema_editor):
+    Product = apps.get_model('core', 'Product')
+    products = list(Product.objects.select_related('category', 'brand'))
+    for product in products:
+        product.search_document = build_search_document(product)
+    Product.objects.bulk_update(products, ['search_document'], batch_size=1000)
+
+
+def create_search_indexes(apps, schema_editor):
+    # Índices GIN solo en PostgreSQL; SQLite usa el ranking en Python de core/search.py
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS product_search_trgm_idx '
+        'ON core_product USING gin (search_document gin_trgm_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS product_search_tsv_idx '
+        "ON core_product USING gin (to_tsvector('simple'::regconfig, search_document))"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS product_search_trgm_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS product_search_tsv_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_stock_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_import_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['model', 'object_id', '-timestamp'], name='auditlog_object_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-timestamp'], name='auditlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerpayment',
+            index=models.Index(fields=['-payment_date'], name='custpayment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerpayment',
+            index=models.Index(fields=['customer', '-payment_date'], name='custpayment_customer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerproductdiscount',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['product', 'customer'], name='discount_active_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['-created_at'], name='movement_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['customer', 'status'], name='sale_customer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['status'], name='sale_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(condition=models.Q(('is_paid', False)), fields=['customer', 'sale_date'], name='sale_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierpayment',
+            index=models.Index(fields=['-payment_date'], name='suppayment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierpayment',
+            index=models.Index(fields=['supplier', '-payment_date'], name='suppayment_supplier_date_idx'),
+        ),
+    ]
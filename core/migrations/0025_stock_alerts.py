@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('LOW', 'Existencia baja'), ('OUT', 'Sin existencia')], max_length=10)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Activa'), ('RESOLVED', 'Resuelta')], default='ACTIVE', max_length=10)),
+                ('quantity', models.FloatField(help_text='Existencia al detectar la alerta')),
+                ('threshold', models.FloatField(help_text='Mínimo vigente al detectar la alerta')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('product_variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='core.productvariant')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.warehouse')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['warehouse', 'status'], name='stockalert_warehouse_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'ACTIVE')), fields=('product_variant', 'warehouse'), name='unique_active_stock_alert')],
+            },
+        ),
+    ]
@@ -19,6 +19,13 @@ class AuditLog(models.Model):
     description = models.TextField(blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Historial de un objeto: filter(model=, object_id=).order_by('-timestamp')
+            models.Index(fields=['model', 'object_id', '-timestamp'], name='auditlog_object_ts_idx'),
+            models.Index(fields=['-timestamp'], name='auditlog_timestamp_idx'),
+        ]
+
     def __str__(self):
         return f"{self.timestamp} - {self.user} - {self.action} - {self.model}"
 from django.db import models
@@ -158,8 +165,25 @@ class Product(models.Model):
         default='REGULAR',
         help_text="Estado del producto"
     )
+    # Texto desnormalizado para búsqueda (ver core/search.py); se recalcula en save()
+    search_document = models.TextField(blank=True, default='', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Orden del catálogo y paginación keyset por (name, id)
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .search import SEARCH_SOURCE_FIELDS, build_search_document
+        self.search_document = build_search_document(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(SEARCH_SOURCE_FIELDS):
+            kwargs['update_fields'] = set(update_fields) | {'search_document'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -201,9 +225,73 @@ class ProductWarehouseStock(models.Model):
     location = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product_variant', 'warehouse'], name='unique_stock_variant_warehouse'),
+        ]
+
     def __str__(self):
         return f"{self.product_variant} in {self.warehouse}"
 
+# StockSnapshot - Saldo de cierre mensual por variante y almacén (punto de partida del kardex)
+class StockSnapshot(models.Model):
+    product_variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name='snapshots')
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE)
+    period_end = models.DateField(help_text="Último día del mes que cierra el snapshot")
+    quantity = models.FloatField(default=0)
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_value = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product_variant', 'warehouse', 'period_end'], name='unique_snapshot_variant_warehouse_period'),
+        ]
+        indexes = [
+            models.Index(fields=['period_end', 'product_variant'], name='snapshot_period_variant_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_variant} in {self.warehouse} @ {self.period_end}: {self.quantity}"
+
+
+# Alertas de existencia baja: una alerta activa por (variante, almacén); se cierra al reponerse
+class StockAlert(models.Model):
+    LEVEL_CHOICES = [
+        ('LOW', 'Existencia baja'),
+        ('OUT', 'Sin existencia'),
+    ]
+    STATUS_CHOICES = [
+        ('ACTIVE', 'Activa'),
+        ('RESOLVED', 'Resuelta'),
+    ]
+
+    product_variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name='stock_alerts')
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE)
+    level = models.CharField(max_length=10, choices=LEVEL_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ACTIVE')
+    quantity = models.FloatField(help_text="Existencia al detectar la alerta")
+    threshold = models.FloatField(help_text="Mínimo vigente al detectar la alerta")
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product_variant', 'warehouse'], condition=models.Q(status='ACTIVE'),
+                name='unique_active_stock_alert',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['warehouse', 'status'], name='stockalert_warehouse_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_level_display()}: {self.product_variant} in {self.warehouse}"
+
 # Supplier
 class Supplier(models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
@@ -314,7 +402,7 @@ class PurchaseOrderReceiptItem(models.Model):
 class InventoryMovement(models.Model):
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='movements_created')
-    movement_type = models.CharField(max_length=20)
+    movement_type = models.CharField(max_length=40)  # admite el prefijo CANCELACION_ de los inversos
     reference_document = models.CharField(max_length=100, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -333,6 +421,12 @@ class InventoryMovement(models.Model):
     # Movimientos inversos/reversión
     is_reversal = models.BooleanField(default=False)  # Indica si es un movimiento inverso
     original_movement = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='reversal_movements')
+
+    class Meta:
+        indexes = [
+            # Listado de movimientos: order_by('-created_at')
+            models.Index(fields=['-created_at'], name='movement_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.movement_type} {self.created_at}"
@@ -341,45 +435,72 @@ class InventoryMovement(models.Model):
         """Verifica si el movimiento puede ser cancelado"""
         return not self.is_cancelled and not self.is_reversal and self.authorized
     
+    def authorize(self, user):
+        """Autoriza el movimiento y aplica sus cantidades al stock en la misma transacción"""
+        from django.db import transaction
+        from .stock import apply_movement
+
+        with transaction.atomic():
+            # Bloquear el movimiento para que dos autorizaciones simultáneas no dupliquen stock
+            locked = InventoryMovement.objects.select_for_update().get(pk=self.pk)
+            if locked.authorized:
+                raise ValueError("Este movimiento ya está autorizado")
+            if locked.is_cancelled:
+                raise ValueError("No se puede autorizar un movimiento cancelado")
+            self.authorized = True
+            self.authorized_by = user
+            self.authorized_at = timezone.now()
+            self.save(update_fields=['authorized', 'authorized_by', 'authorized_at'])
+            apply_movement(self)
+    
     def cancel_movement(self, user, reason):
         """Cancela el movimiento creando un movimiento inverso"""
-        if not self.can_be_cancelled():
-            raise ValueError("Este movimiento no puede ser cancelado")
-        
-        # Marcar como cancelado
-        self.is_cancelled = True
-        self.cancelled_at = timezone.now()
-        self.cancelled_by = user
-        self.cancellation_reason = reason
-        self.save()
-        
-        # Crear movimiento inverso
-        reverse_movement = InventoryMovement.objects.create(
-            warehouse=self.warehouse,
-            user=user,
-            movement_type=f"CANCELACION_{self.movement_type}",
-            reference_document=f"CANCEL-{self.reference_document}",
-            notes=f"Cancelación del movimiento #{self.id}: {reason}",
-            authorized=True,  # Auto-autorizado
-            authorized_by=user,
-            authorized_at=timezone.now(),
-            is_reversal=True,
-            original_movement=self
-        )
-        
-        # Crear movimientos de detalle inversos
-        for detail in self.inventorymovementdetail_set.all():
-            # Invertir tipo de movimiento
-            reverse_type = 'IN' if detail.movement_type == 'OUT' else 'OUT'
+        from django.db import transaction
+        from .stock import apply_movement
+
+        with transaction.atomic():
+            locked = InventoryMovement.objects.select_for_update().get(pk=self.pk)
+            if not locked.can_be_cancelled():
+                raise ValueError("Este movimiento no puede ser cancelado")
             
-            InventoryMovementDetail.objects.create(
-                movement=reverse_movement,
-                product_variant=detail.product_variant,
-                quantity=detail.quantity,  # Misma cantidad
-                movement_type=reverse_type,  # Tipo inverso
-                unit_cost=detail.unit_cost,
-                notes=f"Reverso de {detail.movement_type} del movimiento #{self.id}"
+            # Marcar como cancelado
+            self.is_cancelled = True
+            self.cancelled_at = timezone.now()
+            self.cancelled_by = user
+            self.cancellation_reason = reason
+            self.save()
+            
+            # Crear movimiento inverso (su tipo CANCELACION_* invierte el sentido en el stock)
+            reverse_movement = InventoryMovement.objects.create(
+                warehouse=self.warehouse,
+                user=user,
+                movement_type=f"CANCELACION_{self.movement_type}",
+                reference_document=f"CANCEL-{self.reference_document}",
+                notes=f"Cancelación del movimiento #{self.id}: {reason}",
+                authorized=True,  # Auto-autorizado
+                authorized_by=user,
+                authorized_at=timezone.now(),
+                is_reversal=True,
+                original_movement=self
             )
+            
+            # Crear detalles inversos con la misma cantidad
+            InventoryMovementDetail.objects.bulk_create([
+                InventoryMovementDetail(
+                    movement=reverse_movement,
+                    product_variant_id=detail.product_variant_id,
+                    quantity=detail.quantity,
+                    price=detail.price,
+                    total=detail.total,
+                    lote=detail.lote,
+                    expiration_date=detail.expiration_date,
+                    notes=f"Reverso del movimiento #{self.id}"
+                )
+                for detail in self.details.all()
+            ])
+            
+            # El inverso nace autorizado: revertir su efecto en el stock ahora
+            apply_movement(reverse_movement)
         
         return reverse_movement
 
@@ -604,6 +725,10 @@ class CustomerProductDiscount(models.Model):
         unique_together = ['customer', 'product']
         verbose_name = "Descuento Cliente-Producto"
         verbose_name_plural = "Descuentos Cliente-Producto"
+        indexes = [
+            # Descuentos vigentes de un producto: filter(product=, is_active=True)
+            models.Index(fields=['product', 'customer'], name='discount_active_product_idx', condition=models.Q(is_active=True)),
+        ]
         
     def __str__(self):
         return f"{self.customer.name} - {self.product.name} ({self.discount_percentage}%)"
@@ -678,6 +803,12 @@ class Sale(models.Model):
     class Meta:
         verbose_name = "Venta"
         verbose_name_plural = "Ventas"
+        indexes = [
+            models.Index(fields=['customer', 'status'], name='sale_customer_status_idx'),
+            models.Index(fields=['status'], name='sale_status_idx'),
+            # Ventas con saldo pendiente (pending_payments)
+            models.Index(fields=['customer', 'sale_date'], name='sale_unpaid_idx', condition=models.Q(is_paid=False)),
+        ]
         
     def save(self, *args, **kwargs):
         if not self.sale_number:
@@ -766,6 +897,10 @@ class CustomerPayment(models.Model):
         verbose_name = "Pago de Cliente"
         verbose_name_plural = "Pagos de Clientes"
         ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['-payment_date'], name='custpayment_date_idx'),
+            models.Index(fields=['customer', '-payment_date'], name='custpayment_customer_date_idx'),
+        ]
         
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -821,6 +956,10 @@ class SupplierPayment(models.Model):
         verbose_name = "Pago a Proveedor"
         verbose_name_plural = "Pagos a Proveedores"
         ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['-payment_date'], name='suppayment_date_idx'),
+            models.Index(fields=['supplier', '-payment_date'], name='suppayment_supplier_date_idx'),
+        ]
         
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -833,3 +972,47 @@ class SupplierPayment(models.Model):
         
     def __str__(self):
         return f"Pago a {self.supplier.name} - ${self.amount}"
+
+# ImportJob - Importación CSV procesada en segundo plano (Celery) con avance consultable
+class ImportJob(models.Model):
+    KIND_CHOICES = [
+        ('PRODUCTS', 'Productos'),
+        ('BRANDS', 'Marcas'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pendiente'),
+        ('RUNNING', 'En proceso'),
+        ('COMPLETED', 'Completado'),
+        ('FAILED', 'Fallido'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    business = models.ForeignKey(Business, on_delete=models.CASCADE)
+    user = models.ForeignKey('User', on_delete=models.SET_NULL, null=True, blank=True)
+    file = models.FileField(upload_to='imports/%Y/%m/', blank=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="Errores y duplicados por fila")
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def progress(self):
+        if self.status == 'COMPLETED':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, round(self.processed_rows * 100 / self.total_rows))
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
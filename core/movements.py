@@ -0,0 +1,176 @@
+"""
+Alta masiva de movimientos de inventario.
+
+Valida en memoria uno o muchos movimientos con sus detalles: los almacenes y las
+variantes (por product_variant_id o por product_id -> primera variante) se resuelven
+con una consulta IN cada uno, y movimientos y detalles se insertan con bulk_create en
+una sola transacción. Si cualquier renglón es inválido no se guarda nada.
+
+Formato de cada movimiento (mismos alias que el alta normal):
+    {"warehouse_id"|"warehouse": 1, "movement_type"|"type": "IN", "reference_document": "",
+     "notes": "", "details": [{"product_variant_id"|"product_id": 5, "quantity": 3, "price": 10,
+     "total": 30, "lote": "", "expiration_date": "2026-01-31", "notes": ""}]}
+"""
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import InventoryMovement, InventoryMovementDetail, ProductVariant, Warehouse
+
+MAX_BULK_MOVEMENTS = 500
+MAX_BULK_DETAILS = 20000
+
+
+class BulkMovementError(Exception):
+    """Errores de validación por movimiento/detalle; no se guardó nada"""
+
+    def __init__(self, errors):
+        super().__init__('Movimientos inválidos')
+        self.errors = errors
+
+
+def _int_or_none(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _decimal(value, default=None):
+    if value in (None, ''):
+        return default
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError('Debe ser numérico.')
+
+
+def _expiration(value):
+    if not value:
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        day = parse_date(str(value))
+        if day is None:
+            raise ValueError('Fecha inválida, use el formato YYYY-MM-DD.')
+        parsed = datetime.combine(day, time.min)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _lookup_tables(movements):
+    """Almacenes y variantes de todo el lote en una consulta por tabla"""
+    warehouse_ids, variant_ids, product_ids = set(), set(), set()
+    for movement in movements:
+        warehouse_ids.add(_int_or_none(movement.get('warehouse_id') or movement.get('warehouse')))
+        for detail in movement.get('details') or []:
+            if isinstance(detail, dict):
+                variant_ids.add(_int_or_none(detail.get('product_variant_id') or detail.get('product_variant')))
+                product_ids.add(_int_or_none(detail.get('product_id')))
+    warehouse_ids.discard(None)
+    variant_ids.discard(None)
+    product_ids.discard(None)
+    warehouses = set(Warehouse.objects.filter(id__in=warehouse_ids).values_list('id', flat=True))
+    variants = set(ProductVariant.objects.filter(id__in=variant_ids).values_list('id', flat=True))
+    # Primera variante (menor id) de cada producto, como el alta normal
+    default_variants = {}
+    for variant_id, product_id in (
+        ProductVariant.objects.filter(product_id__in=product_ids).order_by('product_id', 'id').values_list('id', 'product_id')
+    ):
+        default_variants.setdefault(product_id, variant_id)
+    return warehouses, variants, default_variants
+
+
+def _build_detail(detail, variants, default_variants):
+    if not isinstance(detail, dict):
+        raise ValueError({'non_field_errors': 'Cada detalle debe ser un objeto.'})
+    errors = {}
+    variant_id = _int_or_none(detail.get('product_variant_id') or detail.get('product_variant'))
+    product_id = _int_or_none(detail.get('product_id'))
+    if variant_id is not None:
+        if variant_id not in variants:
+            errors['product_variant_id'] = f'No existe ProductVariant con id {variant_id}'
+    elif product_id is not None:
+        variant_id = default_variants.get(product_id)
+        if variant_id is None:
+            errors['product_id'] = f'No se pudo determinar la variante para el producto {product_id}'
+    else:
+        errors['product_variant_id'] = 'Debes especificar la variante de producto (product_variant_id) para movimientos de inventario.'
+    try:
+        quantity = float(detail.get('quantity'))
+    except (TypeError, ValueError):
+        errors['quantity'] = 'Debe ser numérico.'
+        quantity = None
+    values = {}
+    for field, default in (('price', Decimal('0')), ('total', None)):
+        try:
+            values[field] = _decimal(detail.get(field), default)
+        except ValueError as exc:
+            errors[field] = str(exc)
+    try:
+        expiration_date = _expiration(detail.get('expiration_date'))
+    except ValueError as exc:
+        errors['expiration_date'] = str(exc)
+    if errors:
+        raise ValueError(errors)
+    price = values['price']
+    total = values['total'] if values['total'] is not None else price * Decimal(str(quantity))
+    return InventoryMovementDetail(
+        product_variant_id=variant_id, quantity=quantity, price=price, total=total,
+        lote=detail.get('lote') or '', expiration_date=expiration_date, notes=detail.get('notes') or '',
+    )
+
+
+def build_movements(movements, user):
+    """
+    Valida el lote y arma las instancias sin tocar la base (salvo las dos consultas de búsqueda).
+    Devuelve [(InventoryMovement, [InventoryMovementDetail])] o lanza BulkMovementError.
+    """
+    if len(movements) > MAX_BULK_MOVEMENTS:
+        raise BulkMovementError([{'movement_index': None, 'errors': f'Máximo {MAX_BULK_MOVEMENTS} movimientos por petición.'}])
+    if sum(len(m.get('details') or []) for m in movements if isinstance(m, dict)) > MAX_BULK_DETAILS:
+        raise BulkMovementError([{'movement_index': None, 'errors': f'Máximo {MAX_BULK_DETAILS} detalles por petición.'}])
+    movements = [m if isinstance(m, dict) else {} for m in movements]
+    warehouses, variants, default_variants = _lookup_tables(movements)
+    built, errors = [], []
+    for index, data in enumerate(movements):
+        movement_errors = {}
+        warehouse_id = _int_or_none(data.get('warehouse_id') or data.get('warehouse'))
+        if warehouse_id not in warehouses:
+            movement_errors['warehouse'] = 'Almacén inválido o inexistente.'
+        movement_type = (data.get('movement_type') or data.get('type') or '').strip()
+        if not movement_type:
+            movement_errors['movement_type'] = 'Este campo es requerido.'
+        elif len(movement_type) > InventoryMovement._meta.get_field('movement_type').max_length:
+            movement_errors['movement_type'] = 'Tipo de movimiento demasiado largo.'
+        if movement_errors:
+            errors.append({'movement_index': index, 'errors': movement_errors})
+        details = []
+        for detail_index, detail in enumerate(data.get('details') or []):
+            try:
+                details.append(_build_detail(detail, variants, default_variants))
+            except ValueError as exc:
+                errors.append({'movement_index': index, 'detail_index': detail_index, 'errors': exc.args[0]})
+        built.append((InventoryMovement(
+            warehouse_id=warehouse_id, user=user, movement_type=movement_type,
+            reference_document=data.get('reference_document') or '', notes=data.get('notes') or '',
+        ), details))
+    if errors:
+        raise BulkMovementError(errors)
+    return built
+
+
+@transaction.atomic
+def create_movements(movements, user):
+    """Valida y guarda el lote completo: un INSERT de movimientos y uno (por lotes) de detalles"""
+    built = build_movements(movements, user)
+    created = InventoryMovement.objects.bulk_create([movement for movement, _ in built])
+    details = []
+    for movement, (_, movement_details) in zip(created, built):
+        for detail in movement_details:
+            detail.movement = movement
+            details.append(detail)
+    InventoryMovementDetail.objects.bulk_create(details, batch_size=1000)
+    return created
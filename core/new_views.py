@@ -3,7 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
-from .models import CustomerProductDiscount, PurchaseOrderPayment, Sale, SalePayment, Product
+from .conditional import ConditionalRequestMixin
+from .models import Customer, CustomerProductDiscount, PurchaseOrderPayment, Sale, SalePayment, Product
 from .new_serializers import (
     CustomerProductDiscountSerializer, 
     PurchaseOrderPaymentSerializer,
@@ -12,7 +13,8 @@ from .new_serializers import (
 )
 
 
-class CustomerProductDiscountViewSet(viewsets.ModelViewSet):
+class CustomerProductDiscountViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (Customer, Product)
     queryset = CustomerProductDiscount.objects.all()
     serializer_class = CustomerProductDiscountSerializer
     permission_classes = [IsAuthenticated]
@@ -0,0 +1,142 @@
+"""
+Paginación por llave (keyset) y respuestas NDJSON/CSV en streaming para catálogos completos.
+"""
+import base64
+import csv
+import json
+from collections import OrderedDict
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_CHUNK_SIZE = 500
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator de Django con el total ya calculado (evita repetir el COUNT)"""
+
+    def __init__(self, *args, count, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__dict__['count'] = count  # count es cached_property
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor sobre una llave compuesta única (por defecto name, id).
+    Solo se activa si llegan `page_size` o `cursor`; sin ellos paginate_queryset
+    devuelve None y la vista conserva su respuesta de lista completa.
+    """
+    ordering = ('name', 'id')
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def encode_cursor(self, obj):
+        # Instancias de modelo o filas de values()
+        values = [obj[field] if isinstance(obj, dict) else getattr(obj, field) for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values, cls=JSONEncoder).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            values = None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValidationError({self.cursor_query_param: 'Cursor inválido'})
+        return values
+
+    def keyset_filter(self, values):
+        """(a > x) OR (a = x AND b > y) OR ... para la llave compuesta"""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            equal = {prev: values[i] for i, prev in enumerate(self.ordering[:index])}
+            condition |= Q(**equal, **{f'{field}__gt': values[index]})
+        return condition
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if not value:
+            return self.page_size
+        try:
+            return max(1, min(int(value), self.max_page_size))
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'Debe ser un número entero'})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor and not request.query_params.get(self.page_size_query_param):
+            return None
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(self.decode_cursor(cursor)))
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        query = self.request.query_params.copy()
+        query[self.cursor_query_param] = self.next_cursor
+        return self.request.build_absolute_uri(f"{self.request.path}?{query.urlencode()}")
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('next_cursor', self.next_cursor),
+            ('results', data),
+        ]))
+
+
+def wants_ndjson(request):
+    """El cliente pidió streaming NDJSON (?stream=ndjson)"""
+    return request.query_params.get('stream') == 'ndjson'
+
+
+def ndjson_response(queryset, to_row, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Respuesta en streaming: una línea JSON por fila, leyendo el queryset con
+    .iterator(chunk_size) para mantener memoria constante.
+    """
+    def rows():
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            yield json.dumps(to_row(obj), cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+    response = StreamingHttpResponse(rows(), content_type='application/x-ndjson; charset=utf-8')
+    response['X-Accel-Buffering'] = 'no'  # que el proxy no acumule la respuesta
+    return response
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de escribirla"""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(queryset, header, to_row, filename, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Descarga CSV en streaming (una línea por fila con .iterator(chunk_size)); con BOM
+    para que Excel respete los acentos.
+    """
+    writer = csv.writer(_Echo())
+
+    def rows():
+        yield '\ufeff' + writer.writerow(header)
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            yield writer.writerow(to_row(obj))
+
+    response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
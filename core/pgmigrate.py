@@ -0,0 +1,285 @@
+"""
+Migración de una base SQLite a PostgreSQL con COPY FROM STDIN.
+
+- La base SQLite se registra como una conexión más de Django (SOURCE_ALIAS), así las filas
+  se leen con los mismos convertidores del ORM que en PostgreSQL (booleanos, fechas con
+  zona, decimales, JSON) y las columnas salen de los modelos, no de cada script.
+- Las tablas se ordenan por niveles de llaves foráneas (core.backup.dependency_levels).
+  Las tablas de un nivel se cargan en paralelo, una por proceso, cada una en su propia
+  transacción; un nivel empieza cuando el anterior ya hizo commit. Un nivel con ciclo se
+  carga completo en una sola transacción (las FK de Django son DEFERRABLE).
+- Cada tabla se lee con .iterator() ordenada por llave primaria y se escribe en formato
+  texto de COPY bajo demanda (CopyStream): nunca se arma la tabla en memoria.
+- Los permisos los crea migrate en cada base con ids propios: las columnas que los
+  referencian se traducen del id de origen al de destino por llave natural.
+- Al terminar se reinician las secuencias y se compara, tabla por tabla, el número de filas
+  y la suma sha256 de las filas leídas de SQLite contra las leídas de PostgreSQL.
+"""
+import hashlib
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.migrations.recorder import MigrationRecorder
+
+from .backup import (
+    BackupError, BackupJSONEncoder, backup_models, dependency_levels, is_cyclic, model_label, natural_key_fields,
+    natural_keys, reset_sequences, translate_columns,
+)
+
+SOURCE_ALIAS = 'sqlite_source'
+COPY_BLOCK_SIZE = 1024 * 1024
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+
+class MigrationError(Exception):
+    pass
+
+
+def register_source(path, alias=SOURCE_ALIAS):
+    """Agrega la base SQLite de origen a las conexiones de Django"""
+    databases = connections.settings
+    databases[alias] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path)}
+    connections.configure_settings(databases)
+    return alias
+
+
+def pending_migrations(source, target=DEFAULT_DB_ALIAS):
+    """Migraciones aplicadas en una base y no en la otra: (sólo origen, sólo destino)"""
+    applied_source = set(MigrationRecorder(connections[source]).applied_migrations())
+    applied_target = set(MigrationRecorder(connections[target]).applied_migrations())
+    return sorted(applied_source - applied_target), sorted(applied_target - applied_source)
+
+
+# ============================================================================
+# Formato de COPY
+# ============================================================================
+
+def _encode_duration(value):
+    return f'{value.days} days {value.seconds} seconds {value.microseconds} microseconds'
+
+
+def copy_encoders(model):
+    """Una función por columna que convierte el valor de Python al texto de entrada de PostgreSQL"""
+    encoders = []
+    for field in model._meta.concrete_fields:
+        if isinstance(field, models.JSONField):
+            encoders.append(lambda value, encoder=field.encoder: json.dumps(value, cls=encoder))
+        elif isinstance(field, models.BooleanField):
+            encoders.append(lambda value: 't' if value else 'f')
+        elif isinstance(field, models.DurationField):
+            encoders.append(_encode_duration)
+        elif isinstance(field, models.BinaryField):
+            encoders.append(lambda value: '\\x' + bytes(value).hex())
+        elif isinstance(field, (models.DateTimeField, models.DateField, models.TimeField)):
+            encoders.append(lambda value: value.isoformat())
+        elif isinstance(field, models.FloatField):
+            encoders.append(repr)
+        else:
+            encoders.append(str)
+    return encoders
+
+
+def copy_line(row, encoders):
+    """Una línea en formato texto de COPY (tabuladores, \\N para NULL)"""
+    return '\t'.join(
+        '\\N' if value is None else encode(value).translate(_COPY_ESCAPES)
+        for value, encode in zip(row, encoders)
+    ) + '\n'
+
+
+def row_digest(row):
+    """Representación canónica de una fila para la suma (igual en SQLite y PostgreSQL)"""
+    return json.dumps(row, cls=BackupJSONEncoder, sort_keys=True, ensure_ascii=False).encode()
+
+
+class CopyStream:
+    """Archivo de sólo lectura para COPY: codifica filas bajo demanda y acumula filas y suma"""
+
+    def __init__(self, rows, encoders):
+        self.rows = iter(rows)
+        self.encoders = encoders
+        self.digest = hashlib.sha256()
+        self.count = 0
+        self.buffer = ''
+
+    def read(self, size=-1):
+        pieces = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.count += 1
+            self.digest.update(row_digest(row))
+            line = copy_line(row, self.encoders)
+            pieces.append(line)
+            length += len(line)
+        data = ''.join(pieces)
+        if size < 0:
+            size = len(data)
+        self.buffer = data[size:]
+        return data[:size]
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
+
+
+def copy_from(cursor, sql, stream):
+    """COPY ... FROM STDIN con psycopg2 (copy_expert), psycopg 3 (cursor.copy) o pg8000 (stream=)"""
+    raw = cursor.cursor
+    blocks = iter(lambda: stream.read(COPY_BLOCK_SIZE), '')
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, stream, size=COPY_BLOCK_SIZE)
+    elif hasattr(raw, 'copy'):
+        with raw.copy(sql) as copy:
+            for block in blocks:
+                copy.write(block)
+    else:
+        raw.execute(sql, stream=blocks)
+
+
+def _ordered_rows(model, alias, chunk_size):
+    columns = [field.attname for field in model._meta.concrete_fields]
+    return model._base_manager.using(alias).order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def natural_key_mappings(model, source, target=DEFAULT_DB_ALIAS):
+    """{columna: {id en origen: id en destino}} de las columnas que referencian modelos excluidos"""
+    mappings = {}
+    for column, related in natural_key_fields(model).items():
+        target_pks = {key: pk for pk, key in natural_keys(related, target).items()}
+        mappings[column] = {
+            pk: target_pks[key] for pk, key in natural_keys(related, source).items() if key in target_pks
+        }
+    return mappings
+
+
+def copy_table(model, source, chunk_size=2000):
+    """Copia un modelo de `source` a la base por defecto; devuelve (filas, sha256 de las filas copiadas)"""
+    connection = connections[DEFAULT_DB_ALIAS]
+    quote = connection.ops.quote_name
+    columns = [field.attname for field in model._meta.concrete_fields]
+    rows = translate_columns(_ordered_rows(model, source, chunk_size), columns, natural_key_mappings(model, source))
+    stream = CopyStream(rows, copy_encoders(model))
+    names = ', '.join(quote(field.column) for field in model._meta.concrete_fields)
+    try:
+        with connection.cursor() as cursor:
+            copy_from(cursor, f'COPY {quote(model._meta.db_table)} ({names}) FROM STDIN', stream)
+    except BackupError as exc:
+        raise MigrationError(f'{model_label(model)}: {exc}') from None
+    return stream.count, stream.hexdigest()
+
+
+def table_checksum(model, alias, chunk_size=2000):
+    """(filas, sha256) de un modelo en una base, con la misma forma canónica que CopyStream"""
+    digest = hashlib.sha256()
+    count = 0
+    for row in _ordered_rows(model, alias, chunk_size):
+        digest.update(row_digest(row))
+        count += 1
+    return count, digest.hexdigest()
+
+
+# ============================================================================
+# Procesos de trabajo
+# ============================================================================
+# Se ejecutan en procesos creados con fork: heredan la configuración de Django y el alias
+# de origen, y abren sus propias conexiones (el proceso principal cierra las suyas antes).
+
+def _load_group(labels, source, chunk_size):
+    """Carga un grupo de tablas en una transacción; devuelve {modelo: (filas, suma, segundos)}"""
+    results = {}
+    try:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            for label in labels:
+                started = time.perf_counter()
+                rows, checksum = copy_table(apps.get_model(label), source, chunk_size)
+                results[label] = (rows, checksum, time.perf_counter() - started)
+    finally:
+        connections.close_all()
+    return results
+
+
+def _checksum_table(label, chunk_size):
+    try:
+        return label, table_checksum(apps.get_model(label), DEFAULT_DB_ALIAS, chunk_size)
+    finally:
+        connections.close_all()
+
+
+# ============================================================================
+# Migración completa
+# ============================================================================
+
+def check_target(model_list, truncate=False):
+    """El destino debe ser PostgreSQL con las tablas vacías (o se vacían con truncate)"""
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor != 'postgresql':
+        raise MigrationError(f'La base destino debe ser PostgreSQL (configurada: {connection.vendor})')
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if truncate:
+            tables = ', '.join(quote(model._meta.db_table) for model in model_list)
+            cursor.execute(f'TRUNCATE {tables} RESTART IDENTITY CASCADE')
+            return
+        busy = []
+        for model in model_list:
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {quote(model._meta.db_table)})')
+            if cursor.fetchone()[0]:
+                busy.append(model._meta.db_table)
+    if busy:
+        raise MigrationError(f"Tablas con datos en el destino: {', '.join(busy)} (use truncate para vaciarlas)")
+
+
+def migrate_database(source_path, workers=4, truncate=False, chunk_size=2000, verify=True, log=None):
+    """
+    Copia todas las tablas de la base SQLite `source_path` a la base por defecto (PostgreSQL).
+    Devuelve {modelo: {'rows', 'checksum', 'target_rows', 'target_checksum'}}; las dos
+    últimas son None si verify=False.
+    """
+    log = log or (lambda message: None)
+    source = register_source(source_path)
+    only_source, only_target = pending_migrations(source)
+    if only_source or only_target:
+        missing = ', '.join(f'{app}.{name}' for app, name in only_source + only_target)
+        raise MigrationError(f'Las bases no tienen las mismas migraciones aplicadas: {missing}')
+
+    model_list = backup_models()
+    check_target(model_list, truncate=truncate)
+    levels = dependency_levels(model_list)
+    log(f'{len(model_list)} tablas en {len(levels)} niveles, {workers} proceso(s)')
+
+    results = {}
+    connections.close_all()  # los procesos hijos no deben heredar conexiones abiertas
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=context) as executor:
+        for level in levels:
+            labels = [model_label(model) for model in level]
+            groups = [labels] if is_cyclic(level) else [[label] for label in labels]
+            futures = [executor.submit(_load_group, group, source, chunk_size) for group in groups]
+            for future in futures:
+                for label, (rows, checksum, seconds) in future.result().items():
+                    results[label] = {'rows': rows, 'checksum': checksum, 'target_rows': None, 'target_checksum': None}
+                    log(f'{label}: {rows} filas ({seconds:.1f}s)')
+
+        reset_sequences(model_list)
+        connections.close_all()
+        if verify:
+            futures = [executor.submit(_checksum_table, label, chunk_size) for label in results]
+            for future in futures:
+                label, (rows, checksum) = future.result()
+                results[label].update(target_rows=rows, target_checksum=checksum)
+    return results
+
+
+def mismatches(results):
+    """Tablas cuyo número de filas o suma en el destino no coincide con el origen"""
+    return sorted(
+        label for label, result in results.items()
+        if result['target_rows'] is not None
+        and (result['rows'], result['checksum']) != (result['target_rows'], result['target_checksum'])
+    )
@@ -0,0 +1,144 @@
+"""
+Secciones del Product Center: lo que muestra la página de un producto, una función por pestaña.
+
+- Cada sección es síncrona: consulta y serializa. Los serializadores recorren relaciones
+  de forma perezosa (precio, stock, items de órdenes), algo que el ORM no permite desde
+  código asíncrono; las vistas asíncronas de core/views.py las ejecutan con sync_to_async.
+- product_overview reúne todas las secciones en una sola respuesta, para que la página
+  haga una petición en lugar de ocho.
+- Con PRODUCT_OVERVIEW_CONCURRENT (por defecto, si hay DATABASE_POOL) las secciones corren
+  a la vez: cada una en un hilo del pool del event loop (sync_to_async con
+  thread_sensitive=False) y con su propia conexión, que vuelve al pool al terminar. Sus
+  consultas se suman a las métricas de la petición (core/middleware.py). Sin pool cada
+  sección pagaría una conexión nueva, así que corren en serie en el hilo de la petición.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import Http404
+
+from .kardex import DEFAULT_PAGE_SIZE, kardex_from_request, kardex_response_data
+from .models import AuditLog, Product, ProductVariant, ProductWarehouseStock, PurchaseOrder, Quotation, SalesOrder, Supplier
+from .middleware import QueryRecorder, record_queries
+from .search import search_products
+from .serializers import (
+    AuditLogSerializer, ProductSerializer, ProductVariantSerializer, ProductWarehouseStockSerializer,
+    PurchaseOrderSerializer, QuotationSerializer, SalesOrderSerializer, SupplierSerializer,
+)
+
+SEARCH_LIMIT = 50
+
+
+async def aget_product(pk):
+    try:
+        return await Product.objects.aget(pk=pk)
+    except Product.DoesNotExist:
+        raise Http404('No Product matches the given query.')
+
+
+# ============================================================================
+# Secciones (síncronas)
+# ============================================================================
+
+def search_results(query):
+    products = search_products(Product.objects.select_related('category', 'brand'), query)[:SEARCH_LIMIT]
+    return [
+        {
+            'id': p.id,
+            'name': p.name,
+            'sku': p.sku,
+            'category': p.category.name if p.category else '',
+            'brand': p.brand.name if p.brand else '',
+            'image_url': p.image_url,
+            'is_active': p.is_active,
+            'status': p.status,
+        } for p in products
+    ]
+
+
+def product_detail(product):
+    return ProductSerializer(product).data
+
+
+def product_variants(pk):
+    variants = ProductVariant.objects.filter(product_id=pk).select_related('product').prefetch_related('productwarehousestock_set')
+    return ProductVariantSerializer(variants, many=True).data
+
+
+def product_kardex(request, pk):
+    # Filtros: warehouse, date_from, date_to; paginación opcional: page_size, cursor
+    return kardex_response_data(request, kardex_from_request(request, pk))
+
+
+def product_kardex_page(request, pk):
+    """Primera página del kardex (mismos filtros); las siguientes se piden a /kardex/?cursor="""
+    page = kardex_from_request(request, pk, default_page_size=DEFAULT_PAGE_SIZE)
+    return {'next_cursor': page.next_cursor, 'results': page.entries}
+
+
+def product_stock(pk):
+    stocks = ProductWarehouseStock.objects.filter(product_variant__product_id=pk).select_related(
+        'warehouse', 'product_variant__product__category', 'product_variant__product__brand',
+    ).prefetch_related('product_variant__productwarehousestock_set')
+    return ProductWarehouseStockSerializer(stocks, many=True).data
+
+
+def product_suppliers(pk):
+    suppliers = Supplier.objects.filter(supplierproduct__product_variant__product_id=pk).distinct()
+    return SupplierSerializer(suppliers, many=True).data
+
+
+def product_orders(pk):
+    purchase_orders = PurchaseOrder.objects.filter(purchaseorderitem__product_variant__product_id=pk).distinct()
+    sales_orders = SalesOrder.objects.filter(items__product_variant__product_id=pk).distinct()
+    quotations = Quotation.objects.filter(details__product__id=pk).distinct()
+    return {
+        'purchase_orders': PurchaseOrderSerializer(purchase_orders, many=True).data,
+        'sales_orders': SalesOrderSerializer(sales_orders, many=True).data,
+        'quotations': QuotationSerializer(quotations, many=True).data,
+    }
+
+
+def product_auditlog(pk):
+    logs = AuditLog.objects.filter(object_id=str(pk), model='Product').select_related('user').order_by('-timestamp')
+    return AuditLogSerializer(logs, many=True).data
+
+
+# ============================================================================
+# Resumen
+# ============================================================================
+
+def _run_section(function, *args):
+    """Ejecuta una sección en un hilo del pool; devuelve (datos, consultas) y cierra sus conexiones"""
+    recorder = QueryRecorder()
+    try:
+        with record_queries(recorder):
+            return function(*args), recorder
+    finally:
+        connections.close_all()
+
+
+async def product_overview(request, pk):
+    """Todas las secciones de un producto en un solo diccionario (404 si no existe)"""
+    product = await aget_product(pk)
+    sections = {
+        'product': (product_detail, product),
+        'variants': (product_variants, pk),
+        'kardex': (product_kardex_page, request, pk),
+        'stock': (product_stock, pk),
+        'suppliers': (product_suppliers, pk),
+        'orders': (product_orders, pk),
+        'auditlog': (product_auditlog, pk),
+    }
+    if not settings.PRODUCT_OVERVIEW_CONCURRENT:
+        return {name: await sync_to_async(function)(*args) for name, (function, *args) in sections.items()}
+    results = await asyncio.gather(*(
+        sync_to_async(_run_section, thread_sensitive=False)(*section) for section in sections.values()
+    ))
+    request_recorder = getattr(request, '_metrics_recorder', None)
+    if request_recorder is not None:
+        for _, recorder in results:
+            request_recorder.merge(recorder)
+    return {name: data for name, (data, _) in zip(sections, results)}
@@ -0,0 +1,133 @@
+"""
+Búsqueda de productos.
+
+Cada Product guarda un `search_document` desnormalizado (nombre, SKU, código de
+barras, categoría, marca y descripción) en minúsculas y sin acentos. En PostgreSQL
+se consulta con índices GIN de pg_trgm (LIKE por término) y de tsvector (ranking);
+en otros motores (SQLite en desarrollo y pruebas) el filtrado es el mismo LIKE y el
+ranking se calcula en Python. Todas las vistas de búsqueda usan `search_products`.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, F, Func, IntegerField, Value, When
+
+SEARCH_CONFIG = 'simple'
+SEARCH_SOURCE_FIELDS = ('name', 'sku', 'barcode', 'description', 'category', 'category_id', 'brand', 'brand_id')
+# Máximo de candidatos que el ranking en Python evalúa en motores sin pg_trgm
+FALLBACK_CANDIDATE_LIMIT = 5000
+
+
+def normalize_search_text(value):
+    """Minúsculas, sin acentos y con espacios colapsados"""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', value.lower()).strip()
+
+
+def search_terms(query):
+    return normalize_search_text(query).split()
+
+
+def build_search_document(product):
+    """Documento de búsqueda del producto (usa las relaciones ya cargadas si existen)"""
+    parts = [
+        product.name,
+        product.sku,
+        product.barcode,
+        product.category.name if product.category_id else '',
+        product.brand.name if product.brand_id else '',
+        product.description,
+    ]
+    return normalize_search_text(' '.join(part for part in parts if part))
+
+
+def refresh_search_documents(queryset, batch_size=1000):
+    """Recalcula search_document para los productos del queryset; devuelve cuántos cambiaron"""
+    from .models import Product
+    changed = []
+    for product in queryset.select_related('category', 'brand').iterator(chunk_size=batch_size):
+        document = build_search_document(product)
+        if document != product.search_document:
+            product.search_document = document
+            changed.append(product)
+    Product.objects.bulk_update(changed, ['search_document'], batch_size=batch_size)
+    return len(changed)
+
+
+def use_postgres_search():
+    return connection.vendor == 'postgresql'
+
+
+def _filter_terms(queryset, terms):
+    # Cada término debe aparecer en el documento; en PostgreSQL lo resuelve el índice trigram
+    for term in terms:
+        queryset = queryset.filter(search_document__contains=term)
+    return queryset
+
+
+def _postgres_rank(queryset, query):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramSimilarity
+    # Misma expresión que el índice GIN de la migración 0022
+    vector = Func(
+        F('search_document'), function='to_tsvector',
+        template=f"%(function)s('{SEARCH_CONFIG}'::regconfig, %(expressions)s)",
+        output_field=SearchVectorField(),
+    )
+    rank = SearchRank(
+        vector,
+        SearchQuery(query, config=SEARCH_CONFIG),
+    ) + TrigramSimilarity('search_document', query)
+    return queryset.annotate(search_rank=rank).order_by('-search_rank', 'name', 'id')
+
+
+def score_document(query, terms, name, sku, barcode, document):
+    """Puntaje del ranking en Python: coincidencia exacta de código > prefijo del nombre > palabra completa > subcadena"""
+    score = 0.0
+    if query in (normalize_search_text(sku), normalize_search_text(barcode)):
+        score += 10
+    name = normalize_search_text(name)
+    if name.startswith(query):
+        score += 5
+    words = document.split()
+    for term in terms:
+        if term in words:
+            score += 2
+        elif any(word.startswith(term) for word in words):
+            score += 1
+        else:
+            score += 0.5
+    return score
+
+
+def _python_rank(queryset, query, terms):
+    candidates = queryset.values_list('id', 'name', 'sku', 'barcode', 'search_document')[:FALLBACK_CANDIDATE_LIMIT]
+    scored = sorted(
+        ((-score_document(query, terms, name, sku, barcode, document), normalize_search_text(name), pk)
+         for pk, name, sku, barcode, document in candidates),
+    )
+    ranking = [pk for _, _, pk in scored]
+    if not ranking:
+        return queryset.none()
+    return queryset.filter(id__in=ranking).annotate(search_rank=Case(
+        *[When(id=pk, then=Value(position)) for position, pk in enumerate(ranking)],
+        output_field=IntegerField(),
+    )).order_by('search_rank')
+
+
+def search_products(queryset, query):
+    """
+    Filtra y ordena `queryset` (de Product) por relevancia para `query`.
+    Sin términos devuelve el queryset ordenado por nombre.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.order_by('name', 'id')
+    queryset = _filter_terms(queryset, terms)
+    normalized = ' '.join(terms)
+    if use_postgres_search():
+        return _postgres_rank(queryset, normalized)
+    return _python_rank(queryset, normalized, terms)
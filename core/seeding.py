@@ -0,0 +1,267 @@
+"""
+Datos sintéticos en volumen para benchmarks y planes de consulta.
+
+Todo se inserta con bulk_create en lotes (sin señales ni save()), con fechas repartidas
+hacia atrás en el tiempo para que los índices por fecha tengan una distribución real.
+Los nombres llevan el prefijo BENCH para poder distinguirlos de datos reales.
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .search import build_search_document
+
+BATCH_SIZE = 2000
+SEED_PREFIX = 'BENCH'
+MOVEMENT_TYPES = ('IN', 'OUT', 'ENTRADA', 'SALIDA', 'ADJUSTMENT')
+WORDS = (
+    'paracetamol', 'ibuprofeno', 'amoxicilina', 'omeprazol', 'loratadina', 'metformina',
+    'naproxeno', 'diclofenaco', 'clonazepam', 'losartan', 'tabletas', 'capsulas', 'jarabe',
+    'suspension', 'gotas', 'crema', 'infantil', 'forte', 'plus', 'retard',
+)
+DOSES = ('5 MG', '10 MG', '50 MG', '100 MG', '250 MG', '500 MG', '1 G', '120 ML')
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Desactiva auto_now/auto_now_add mientras se insertan fechas sintéticas"""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _batched_create(model, objects, batch_size=BATCH_SIZE):
+    """bulk_create por lotes desde un generador; devuelve los objetos creados"""
+    created, batch = [], []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            created.extend(model.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        created.extend(model.objects.bulk_create(batch))
+    return created
+
+
+def _batched_insert(model, objects, batch_size=BATCH_SIZE):
+    """Como _batched_create pero sin conservar los objetos (para tablas de millones de filas)"""
+    total, batch = 0, []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+class DatasetSeeder:
+    """
+    Genera un catálogo con movimientos, clientes y ventas.
+    `counts` admite: products, movements, details_per_movement, customers, audit_logs,
+    payments, sales, discounts, quotations, items_per_quotation y days.
+    Con la misma `seed` los datos son idénticos.
+    """
+    defaults = {
+        'products': 2000,
+        'movements': 5000,
+        'details_per_movement': 5,
+        'customers': 500,
+        'audit_logs': 20000,
+        'payments': 5000,
+        'sales': 5000,
+        'discounts': 2000,
+        'quotations': 1000,
+        'items_per_quotation': 4,
+        'days': 365,
+    }
+
+    def __init__(self, seed=42, log=None, **counts):
+        self.random = random.Random(seed)
+        self.counts = {**self.defaults, **{k: v for k, v in counts.items() if v is not None}}
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.stats = {}
+
+    def _past(self):
+        return self.now - timedelta(seconds=self.random.randint(0, self.counts['days'] * 86400))
+
+    @transaction.atomic
+    def run(self):
+        from .models import Business, User
+        self.business, _ = Business.objects.get_or_create(
+            code=f'{SEED_PREFIX}-EMP', defaults={'name': f'{SEED_PREFIX} Empresa'}
+        )
+        self.user = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        self.seed_catalog()
+        self.seed_movements()
+        self.seed_customers()
+        self.seed_quotations()
+        self.seed_audit_logs()
+        return self.stats
+
+    def seed_catalog(self):
+        from .models import Brand, Category, Product, ProductVariant, Unit, Warehouse
+        business = self.business
+        self.categories = Category.objects.bulk_create([
+            Category(business=business, name=f'{SEED_PREFIX} Categoría {i}', code=f'{SEED_PREFIX}C{i}') for i in range(40)
+        ])
+        self.brands = Brand.objects.bulk_create([
+            Brand(business=business, name=f'{SEED_PREFIX} Marca {i}', code=f'{SEED_PREFIX}B{i}') for i in range(120)
+        ])
+        self.unit = Unit.objects.create(name=f'{SEED_PREFIX} Pieza', symbol='PZA', unit_type='pieza')
+        self.warehouses = Warehouse.objects.bulk_create([
+            Warehouse(business=business, name=f'{SEED_PREFIX} Almacén {i}', code=f'{SEED_PREFIX}W{i}') for i in range(5)
+        ])
+        start = Product.objects.count()
+
+        def products():
+            for i in range(self.counts['products']):
+                name = ' '.join(self.random.sample(WORDS, 2)).upper() + f' {self.random.choice(DOSES)} {SEED_PREFIX}{start + i}'
+                product = Product(
+                    business=business, category=self.random.choice(self.categories),
+                    brand=self.random.choice(self.brands), base_unit=self.unit,
+                    name=name, sku=f'{SEED_PREFIX}-{start + i:07d}', barcode=f'75{start + i:011d}',
+                )
+                product.created_at = product.updated_at = self._past()
+                product.search_document = build_search_document(product)
+                yield product
+
+        with manual_timestamps(Product):
+            self.products = _batched_create(Product, products())
+
+        def variants():
+            for product in self.products:
+                price = Decimal(self.random.randint(500, 50000)) / 100
+                yield ProductVariant(
+                    product=product, sku=product.sku, name=product.name, unit=self.unit,
+                    cost_price=price * Decimal('0.7'), sale_price=price, purchase_price=price * Decimal('0.7'),
+                )
+        self.variant_ids = [variant.id for variant in _batched_create(ProductVariant, variants())]
+        self.stats.update(products=len(self.products), variants=len(self.variant_ids))
+        self.log(f"📦 {len(self.products)} productos y variantes")
+
+    def seed_movements(self):
+        from .models import InventoryMovement, InventoryMovementDetail
+        per_movement = self.counts['details_per_movement']
+        movements_total = details_total = 0
+        # Se crean por bloques para no tener un millón de detalles en memoria
+        block = max(1, BATCH_SIZE // max(per_movement, 1))
+        remaining = self.counts['movements']
+        while remaining > 0:
+            size = min(block, remaining)
+            remaining -= size
+            with manual_timestamps(InventoryMovement):
+                movements = InventoryMovement.objects.bulk_create([
+                    InventoryMovement(
+                        warehouse=self.random.choice(self.warehouses), user=self.user,
+                        movement_type=self.random.choice(MOVEMENT_TYPES), reference_document=f'{SEED_PREFIX}-{movements_total + i}',
+                        authorized=self.random.random() < 0.9, created_at=self._past(),
+                    ) for i in range(size)
+                ])
+            details = (
+                InventoryMovementDetail(
+                    movement=movement, product_variant_id=self.random.choice(self.variant_ids),
+                    quantity=self.random.randint(1, 50), price=Decimal(self.random.randint(100, 10000)) / 100,
+                ) for movement in movements for _ in range(per_movement)
+            )
+            details_total += _batched_insert(InventoryMovementDetail, details)
+            movements_total += size
+        self.stats.update(movements=movements_total, details=details_total)
+        self.log(f"🚚 {movements_total} movimientos con {details_total} detalles")
+
+    def seed_customers(self):
+        from .models import Customer, CustomerPayment, CustomerProductDiscount, CustomerType, Sale
+        customer_type = CustomerType.objects.order_by('level').first() or CustomerType.objects.create(
+            level=1, discount_percentage=0
+        )
+        start = Customer.objects.count()
+        customers = _batched_create(Customer, (
+            Customer(
+                business=self.business, customer_type=customer_type, name=f'{SEED_PREFIX} Cliente {start + i}',
+                code=f'{SEED_PREFIX}-CL{start + i:07d}', email=f'bench{start + i}@example.com',
+            ) for i in range(self.counts['customers'])
+        ))
+        customer_ids = [customer.id for customer in customers]
+
+        with manual_timestamps(CustomerPayment):
+            payments = _batched_insert(CustomerPayment, (
+                CustomerPayment(
+                    customer_id=self.random.choice(customer_ids), amount=Decimal(self.random.randint(100, 100000)) / 100,
+                    payment_date=self._past(), created_by=self.user,
+                ) for _ in range(self.counts['payments'])
+            ))
+
+        def sales():
+            for i in range(self.counts['sales']):
+                total = Decimal(self.random.randint(1000, 500000)) / 100
+                paid = total if self.random.random() < 0.7 else total / 2
+                yield Sale(
+                    customer_id=self.random.choice(customer_ids), sale_number=f'{SEED_PREFIX}-{start}-{i:07d}',
+                    total_amount=total, paid_amount=paid, remaining_balance=total - paid,
+                    status=self.random.choice(('DRAFT', 'CONFIRMED', 'PAID', 'CANCELLED')),
+                    is_paid=paid >= total, sale_date=self._past(), created_by=self.user,
+                )
+        with manual_timestamps(Sale):
+            sales_total = _batched_insert(Sale, sales())
+
+        pairs = set()
+        limit = min(self.counts['discounts'], len(customer_ids) * len(self.products))
+        while len(pairs) < limit:
+            pairs.add((self.random.choice(customer_ids), self.random.choice(self.products).id))
+        discounts = _batched_insert(CustomerProductDiscount, (
+            CustomerProductDiscount(
+                customer_id=customer_id, product_id=product_id, created_by=self.user,
+                discount_percentage=Decimal(self.random.randint(1, 30)), is_active=self.random.random() < 0.8,
+            ) for customer_id, product_id in sorted(pairs)
+        ))
+        self.stats.update(customers=len(customer_ids), payments=payments, sales=sales_total, discounts=discounts)
+        self.log(f"👥 {len(customer_ids)} clientes, {payments} pagos, {sales_total} ventas, {discounts} descuentos")
+
+    def seed_quotations(self):
+        from .models import Quotation, QuotationItem
+        per_quotation = self.counts['items_per_quotation']
+        with manual_timestamps(Quotation):
+            quotations = _batched_create(Quotation, (
+                Quotation(
+                    business=self.business, customer_id=f'{SEED_PREFIX} Cliente {i}', quote_date=self._past(),
+                    status=self.random.choice(('DRAFT', 'SENT', 'APPROVED')), created_at=self._past(), updated_at=self.now,
+                ) for i in range(self.counts['quotations'])
+            ))
+        items = _batched_insert(QuotationItem, (
+            QuotationItem(
+                quotation=quotation, product=self.random.choice(self.products),
+                quantity=self.random.randint(1, 20), price=Decimal(self.random.randint(100, 50000)) / 100,
+            ) for quotation in quotations for _ in range(per_quotation)
+        ))
+        self.stats.update(quotations=len(quotations), quotation_items=items)
+        self.log(f"🧾 {len(quotations)} cotizaciones con {items} renglones")
+
+    def seed_audit_logs(self):
+        from .models import AuditLog
+        product_ids = [product.id for product in self.products]
+        with manual_timestamps(AuditLog):
+            total = _batched_insert(AuditLog, (
+                AuditLog(
+                    user=self.user, action=self.random.choice(('create', 'update', 'import')),
+                    model=self.random.choice(('Product', 'Product', 'Customer', 'InventoryMovement')),
+                    object_id=str(self.random.choice(product_ids)), timestamp=self._past(),
+                ) for _ in range(self.counts['audit_logs'])
+            ))
+        self.stats['audit_logs'] = total
+        self.log(f"📝 {total} registros de bitácora")
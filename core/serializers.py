@@ -1,14 +1,29 @@
 from .models import AuditLog
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import (
     User, Business, Category, Brand, Unit, Product, ProductVariant, Warehouse, ProductWarehouseStock,
     Supplier, SupplierProduct, PurchaseOrder, PurchaseOrderItem, PurchaseOrderReceipt, PurchaseOrderReceiptItem,
     InventoryMovement, ExchangeRate, CustomerType, Customer, SalesOrder, SalesOrderItem, Quotation, QuotationItem,
-    Role, MenuOption, InventoryMovementDetail, CustomerProductDiscount, PurchaseOrderPayment, Sale, SalePayment
+    Role, MenuOption, InventoryMovementDetail, CustomerProductDiscount, PurchaseOrderPayment, Sale, SalePayment,
+    ImportJob, StockAlert
 )
 
 
+def product_variants_prefetch():
+    """Prefetch de variantes (ordenadas por id) con su stock por almacén"""
+    return Prefetch(
+        'productvariant_set',
+        queryset=ProductVariant.objects.prefetch_related('productwarehousestock_set').order_by('id')
+    )
+
+
+def variant_stock(variant):
+    """Stock total de una variante sumando sus registros por almacén (usa el prefetch si existe)"""
+    return sum(float(stock.quantity or 0) for stock in variant.productwarehousestock_set.all())
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
@@ -110,17 +125,29 @@ class ProductSerializer(serializers.ModelSerializer):
         except Exception:
             return ''
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Precarga categoría, marca, variantes y su stock para serializar sin consultas por fila"""
+        return queryset.select_related('category', 'brand').prefetch_related(product_variants_prefetch())
+
+    def _get_variants(self, obj):
+        # Lee siempre desde el caché de prefetch; si el producto no viene precargado
+        # (p. ej. vista de detalle) se llena una sola vez y se reutiliza en los demás campos
+        if 'productvariant_set' not in getattr(obj, '_prefetched_objects_cache', {}):
+            prefetch_related_objects([obj], product_variants_prefetch())
+        return obj.productvariant_set.all()
+
     def get_variants(self, obj):
         try:
-            variants = ProductVariant.objects.filter(product=obj)
-            return ProductVariantSerializer(variants, many=True).data
+            return ProductVariantSerializer(self._get_variants(obj), many=True).data
         except Exception:
             return []
 
     def get_price(self, obj):
         try:
-            product_variant = ProductVariant.objects.filter(product=obj).first()
-            if product_variant and hasattr(product_variant, 'sale_price') and product_variant.sale_price is not None:
+            variants = self._get_variants(obj)
+            product_variant = variants[0] if variants else None
+            if product_variant and product_variant.sale_price is not None:
                 return float(product_variant.sale_price)
             return 0.0
         except Exception:
@@ -128,12 +155,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
     def get_current_stock(self, obj):
         try:
-            from django.db.models import Sum
-            product_variants = ProductVariant.objects.filter(product=obj)
-            total_stock = 0
-            for variant in product_variants:
-                if hasattr(variant, 'stock') and variant.stock is not None:
-                    total_stock += float(variant.stock)
+            total_stock = sum(variant_stock(variant) for variant in self._get_variants(obj))
             return max(0, total_stock)
         except Exception:
             return 0
@@ -142,10 +164,15 @@ class ProductVariantSerializer(serializers.ModelSerializer):
     product_id = serializers.IntegerField(source='product.id', read_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_sku = serializers.CharField(source='product.sku', read_only=True)
+    price = serializers.DecimalField(source='sale_price', max_digits=12, decimal_places=2, read_only=True)
+    stock = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
         model = ProductVariant
-        fields = ['id', 'name', 'sku', 'is_main', 'price', 'stock', 'product_id', 'product_name', 'product_sku']
+        fields = ['id', 'name', 'sku', 'price', 'stock', 'product_id', 'product_name', 'product_sku']
+
+    def get_stock(self, obj):
+        return variant_stock(obj)
 
 class WarehouseSerializer(serializers.ModelSerializer):
     business = serializers.PrimaryKeyRelatedField(queryset=Business.objects.all(), required=False, allow_null=True)
@@ -857,3 +884,32 @@ class RoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Role
         fields = ['id', 'name', 'menu_options']
+
+
+# Trabajos de importación CSV (solo lectura: se crean desde los importadores)
+class ImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'status', 'business', 'user', 'original_name', 'total_rows', 'processed_rows',
+            'progress', 'created_count', 'duplicate_count', 'error_count', 'errors', 'message',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+
+# Alertas de existencia baja (solo lectura: las genera core/alerts.py)
+class StockAlertSerializer(serializers.ModelSerializer):
+    sku = serializers.CharField(source='product_variant.sku', read_only=True)
+    variant_name = serializers.CharField(source='product_variant.name', read_only=True)
+    warehouse_name = serializers.CharField(source='warehouse.name', read_only=True)
+
+    class Meta:
+        model = StockAlert
+        fields = [
+            'id', 'product_variant', 'sku', 'variant_name', 'warehouse', 'warehouse_name', 'level', 'status',
+            'quantity', 'threshold', 'created_at', 'resolved_at', 'notified_at',
+        ]
+        read_only_fields = fields
@@ -23,20 +23,22 @@ class ProductWithMainVariantSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['search_document']  # columna interna de búsqueda (core/search.py)
+
+    def _get_variants(self, obj):
+        # Usa el prefetch de productvariant_set si el queryset lo trae
+        return list(obj.productvariant_set.all())
 
     def get_product_variant_id(self, obj):
         try:
-            variant = ProductVariant.objects.filter(product=obj).first()
-            return variant.id if variant else None
+            variants = self._get_variants(obj)
+            return variants[0].id if variants else None
         except Exception as e:
             logger.error(f"Error obteniendo product_variant_id para producto {getattr(obj, 'id', None)}: {e}")
             return None
 
     def get_variants(self, obj):
         try:
-            variants = ProductVariant.objects.filter(product=obj)
-            print(f'[DEBUG ProductSearch] Producto {obj.id} tiene {variants.count()} variantes')
             return [
                 {
                     'id': v.id,
@@ -44,7 +46,7 @@ class ProductWithMainVariantSerializer(serializers.ModelSerializer):
                     'sku': v.sku,
                     'price': v.sale_price,
                 }
-                for v in variants
+                for v in self._get_variants(obj)
             ]
         except Exception as e:
             logger.error(f"Error obteniendo variantes para producto {getattr(obj, 'id', None)}: {e}")
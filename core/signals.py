@@ -1,6 +1,11 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Product, ProductVariant
+from .autocomplete import product_index
+from .cache import register_cached_model
+from .dashboard import DASHBOARD_MODELS
+from .models import Brand, Category, CustomerType, ExchangeRate, Product, ProductVariant, Unit, Warehouse
+from .search import refresh_search_documents
 import random
 import string
 
@@ -27,6 +32,38 @@ def create_product_variant(sender, instance, created, **kwargs):
                 is_active=instance.is_active
             )
 
+# El nombre de categoría y marca forma parte del search_document de sus productos
+@receiver(post_save, sender=Category)
+def refresh_category_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(Product.objects.filter(category=instance))
+
+@receiver(post_save, sender=Brand)
+def refresh_brand_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(Product.objects.filter(brand=instance))
+
+# Índice de autocompletado del worker: se refresca solo el producto afectado al confirmar la transacción
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def refresh_product_autocomplete(sender, instance, **kwargs):
+    product_id = instance.pk  # delete() deja el pk en None antes del commit
+    transaction.on_commit(lambda: product_index.refresh_products([product_id]))
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def refresh_variant_autocomplete(sender, instance, **kwargs):
+    product_id = instance.product_id
+    transaction.on_commit(lambda: product_index.refresh_products([product_id]))
+
+# Catálogos de referencia en caché: cualquier alta/cambio/baja incrementa su versión
+for cached_model in (Category, Brand, Unit, Warehouse, CustomerType, ExchangeRate):
+    register_cached_model(cached_model)
+
+# Secciones del tablero: el cambio de existencias, movimientos o pagos invalida sólo las suyas
+for cached_model in DASHBOARD_MODELS:
+    register_cached_model(cached_model)
+
 # Crear variantes para productos existentes sin variante al cargar el módulo
 def create_missing_variants_for_existing_products():
     for product in Product.objects.filter(is_active=True):
@@ -0,0 +1,161 @@
+"""
+Motor de stock incremental.
+
+ProductWarehouseStock es el libro materializado de existencias por (variante, almacén).
+Cada movimiento autorizado aplica deltas con signo a esas filas dentro de la misma
+transacción; las cancelaciones generan un movimiento inverso autorizado que se aplica
+igual. rebuild_stock() recalcula la tabla completa desde InventoryMovementDetail.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Q, Sum, When
+from django.db.models.functions import Abs, Greatest, Upper
+from django.utils import timezone
+
+from .models import InventoryMovementDetail, ProductWarehouseStock
+
+# Tipos de movimiento que suman existencias (se comparan en mayúsculas)
+INBOUND_MOVEMENT_TYPES = ('IN', 'INGRESO', 'ENTRADA', 'PURCHASE', 'COMPRA')
+ADJUSTMENT_MOVEMENT_TYPE = 'ADJUSTMENT'
+# Prefijo de los movimientos inversos que crea InventoryMovement.cancel_movement
+REVERSAL_PREFIX = 'CANCELACION_'
+# Mínimo vigente de una fila de ProductWarehouseStock: el mayor entre el del almacén,
+# el umbral de la variante y el mínimo del producto
+STOCK_THRESHOLD = Greatest(
+    'min_stock', 'product_variant__low_stock_threshold', 'product_variant__product__minimum_stock',
+    output_field=FloatField(),
+)
+# Existencia baja: cantidad <= mínimo vigente
+LOW_STOCK = Q(quantity__lte=STOCK_THRESHOLD)
+
+
+def is_inbound(movement_type, quantity):
+    """Indica si un detalle suma existencias según el tipo de su movimiento"""
+    movement_type = (movement_type or '').upper()
+    if movement_type.startswith(REVERSAL_PREFIX):
+        return not is_inbound(movement_type[len(REVERSAL_PREFIX):], quantity)
+    if movement_type == ADJUSTMENT_MOVEMENT_TYPE:
+        return (quantity or 0) > 0
+    return movement_type in INBOUND_MOVEMENT_TYPES
+
+
+def signed_quantity(movement_type, quantity):
+    """Cantidad con signo (+ entrada / - salida) de un detalle"""
+    quantity = quantity or 0
+    return abs(quantity) if is_inbound(movement_type, quantity) else -abs(quantity)
+
+
+def annotate_signed_quantity(queryset, movement_type_field='movement__movement_type'):
+    """
+    Anota `signed_quantity` (equivalente SQL de signed_quantity()) sobre un queryset
+    de InventoryMovementDetail, para agregaciones y funciones de ventana.
+    """
+    reversal_inbound = [REVERSAL_PREFIX + t for t in INBOUND_MOVEMENT_TYPES]
+    reversal_adjustment = REVERSAL_PREFIX + ADJUSTMENT_MOVEMENT_TYPE
+    inbound = (
+        Q(movement_type_upper__in=INBOUND_MOVEMENT_TYPES)
+        | Q(movement_type_upper=ADJUSTMENT_MOVEMENT_TYPE, quantity__gt=0)
+        | Q(movement_type_upper=reversal_adjustment, quantity__lte=0)
+        | (
+            Q(movement_type_upper__startswith=REVERSAL_PREFIX)
+            & ~Q(movement_type_upper__in=reversal_inbound)
+            & ~Q(movement_type_upper=reversal_adjustment)
+        )
+    )
+    return queryset.annotate(movement_type_upper=Upper(movement_type_field)).annotate(
+        signed_quantity=Case(
+            When(inbound, then=Abs(F('quantity'))),
+            default=-Abs(F('quantity')),
+            output_field=FloatField(),
+        )
+    )
+
+
+def movement_deltas(movement):
+    """Deltas de stock {(variant_id, warehouse_id): cantidad} que produce un movimiento"""
+    deltas = defaultdict(float)
+    for variant_id, quantity in movement.details.values_list('product_variant_id', 'quantity'):
+        deltas[(variant_id, movement.warehouse_id)] += signed_quantity(movement.movement_type, quantity)
+    return deltas
+
+
+def apply_stock_deltas(deltas):
+    """
+    Aplica deltas a ProductWarehouseStock bloqueando las filas afectadas.
+    Debe llamarse dentro de la transacción que autoriza/cancela el movimiento.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        variant_ids = {variant_id for variant_id, _ in deltas}
+        warehouse_ids = {warehouse_id for _, warehouse_id in deltas}
+        locked = ProductWarehouseStock.objects.select_for_update().filter(
+            product_variant_id__in=variant_ids, warehouse_id__in=warehouse_ids
+        ).order_by('id')
+        rows = {(row.product_variant_id, row.warehouse_id): row for row in locked}
+        for key, delta in deltas.items():
+            row = rows.get(key)
+            if row is None:
+                variant_id, warehouse_id = key
+                row, _ = ProductWarehouseStock.objects.select_for_update().get_or_create(
+                    product_variant_id=variant_id, warehouse_id=warehouse_id
+                )
+            row.quantity = (row.quantity or 0) + delta
+            row.save(update_fields=['quantity', 'updated_at'])
+
+
+def apply_movement(movement):
+    """Aplica al stock un movimiento recién autorizado (incluye movimientos inversos)"""
+    apply_stock_deltas(movement_deltas(movement))
+
+
+def stock_totals_from_history():
+    """
+    Existencias por (variante, almacén) calculadas desde el historial de movimientos
+    autorizados, en una sola consulta agregada.
+    """
+    details = annotate_signed_quantity(
+        InventoryMovementDetail.objects.filter(movement__authorized=True)
+    )
+    return details.values('product_variant_id', 'movement__warehouse_id').annotate(
+        total=Sum('signed_quantity')
+    ).order_by()
+
+
+@transaction.atomic
+def rebuild_stock():
+    """
+    Recalcula ProductWarehouseStock desde InventoryMovementDetail.
+    Conserva las filas existentes (min_stock, location) y pone en cero las que ya no
+    tienen movimientos. Devuelve (actualizadas, creadas, puestas_en_cero).
+    """
+    totals = {
+        (row['product_variant_id'], row['movement__warehouse_id']): row['total'] or 0
+        for row in stock_totals_from_history()
+    }
+    existing = {
+        (row.product_variant_id, row.warehouse_id): row
+        for row in ProductWarehouseStock.objects.select_for_update().order_by('id')
+    }
+    to_update, to_create, zeroed = [], [], 0
+    for key, row in existing.items():
+        quantity = totals.pop(key, 0)
+        if quantity == 0 and row.quantity:
+            zeroed += 1
+        if row.quantity != quantity:
+            row.quantity = quantity
+            row.updated_at = timezone.now()
+            to_update.append(row)
+    for (variant_id, warehouse_id), quantity in totals.items():
+        to_create.append(ProductWarehouseStock(
+            product_variant_id=variant_id, warehouse_id=warehouse_id, quantity=quantity
+        ))
+    ProductWarehouseStock.objects.bulk_update(to_update, ['quantity', 'updated_at'], batch_size=1000)
+    ProductWarehouseStock.objects.bulk_create(to_create, batch_size=1000)
+    if to_update or to_create:
+        # bulk_update/bulk_create no disparan señales: invalidar ETags que dependen del stock
+        from .cache import bump_version
+        bump_version(ProductWarehouseStock)
+    return len(to_update), len(to_create), zeroed
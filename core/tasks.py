@@ -1,17 +1,53 @@
 from celery import shared_task
-from django.core.management import call_command
-from datetime import datetime
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 
 @shared_task
-def backup_database():
-    # Ejecuta el comando de respaldo de Django
-    now = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f'backup_{now}.json'
-    call_command('dumpdata', output=filename)
-    return filename
+def backup_database(incremental=False):
+    """
+    Respaldo por tabla en JSONL comprimido dentro de BACKUP_DIR (ver core/backup.py).
+    Devuelve la ruta del respaldo; se restaura con `manage.py restore_backup <ruta>`.
+    """
+    from .backup import create_backup
+    from .db import without_statement_timeout
+
+    with without_statement_timeout():
+        return str(create_backup(incremental=incremental))
 
 @shared_task
 def send_low_stock_report():
-    # Aquí iría la lógica para enviar el reporte de bajo stock
-    # Por ejemplo, consultar productos y enviar correo
-    return 'Reporte enviado'
+    """
+    Escanea existencias contra sus mínimos y notifica sólo las alertas que cambiaron
+    de estado (ver core/alerts.py). Devuelve {'opened': n, 'resolved': m}.
+    """
+    from .alerts import scan_stock_alerts
+
+    return scan_stock_alerts()
+
+@shared_task
+def create_stock_snapshots(period_end=None):
+    """
+    Genera los snapshots de cierre mensual pendientes hasta `period_end` (YYYY-MM-DD).
+    Por defecto cierra el mes anterior; si faltan meses los genera en orden.
+    Con una fecha explícita de un mes ya cerrado lo regenera (los posteriores deben regenerarse después).
+    """
+    from .kardex import create_stock_snapshot, month_end, pending_snapshot_periods
+
+    if period_end:
+        period = month_end(parse_date(period_end))
+        return {str(period): create_stock_snapshot(period)}
+    last_month_end = timezone.localdate().replace(day=1) - timedelta(days=1)
+    return {str(period): create_stock_snapshot(period) for period in pending_snapshot_periods(last_month_end)}
+
+@shared_task
+def process_import_job(job_id):
+    """Procesa en segundo plano un ImportJob (productos o marcas) por bloques"""
+    from .importers import run_import_job
+    from .models import ImportJob
+
+    job = ImportJob.objects.get(pk=job_id)
+    if job.status != 'PENDING':
+        return job.status  # reintento o entrega duplicada de la tarea
+    run_import_job(job)
+    return job.status
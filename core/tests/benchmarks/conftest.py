@@ -0,0 +1,35 @@
+"""
+Benchmarks de la API sobre datos sintéticos en volumen (ver core/seeding.py).
+
+Sólo corren con BENCHMARK_SCALE=small|full y pytest-benchmark instalado:
+
+    pip install pytest-benchmark
+    BENCHMARK_SCALE=small python -m pytest core/tests/benchmarks --benchmark-only \
+        --benchmark-autosave --benchmark-compare
+
+Los datos se generan una vez por sesión en la base de pruebas; con --reuse-db se
+conservan entre corridas. Cada caso registra en extra_info el número de consultas,
+la memoria pico y el tamaño de la respuesta, y falla si se excede su presupuesto de consultas.
+"""
+import os
+
+import pytest
+
+BENCHMARK_SCALE = os.getenv('BENCHMARK_SCALE')
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from core.models import Product
+    from core.seeding import SEED_PREFIX
+
+    with django_db_blocker.unblock():
+        if not Product.objects.filter(sku__startswith=f'{SEED_PREFIX}-').exists():
+            call_command('seed_benchmark_data', scale=BENCHMARK_SCALE)
+        # Fuera de la transacción de cada prueba: el resumen del Product Center lee desde otros hilos
+        if not get_user_model().objects.filter(is_superuser=True).exists():
+            get_user_model().objects.create_superuser(
+                email='bench@test.com', password='bench123', first_name='Bench', last_name='User'
+            )
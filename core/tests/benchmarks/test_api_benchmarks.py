@@ -0,0 +1,94 @@
+import os
+import tracemalloc
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .conftest import BENCHMARK_SCALE
+
+pytest.importorskip('pytest_benchmark')
+pytestmark = [
+    pytest.mark.skipif(not BENCHMARK_SCALE, reason='Defina BENCHMARK_SCALE=small|full para correr los benchmarks'),
+    pytest.mark.django_db,
+]
+
+ROUNDS = int(os.getenv('BENCHMARK_ROUNDS', '5'))
+
+
+@pytest.fixture
+def client():
+    from django.contrib.auth import get_user_model
+    user = get_user_model().objects.filter(is_superuser=True).first()  # creado en conftest.django_db_setup
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_product_id():
+    from django.db.models import Count
+    from core.models import Product
+    # Producto con más historial: el peor caso de kardex
+    return Product.objects.annotate(rows=Count('productvariant__inventorymovementdetail')).order_by('-rows').values_list('id', flat=True).first()
+
+
+def run_benchmark(benchmark, client, url, max_queries, **params):
+    """Tiempo con pytest-benchmark; consultas y memoria pico en una corrida aparte"""
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    query_count = len(queries.captured_queries)  # leerlo ya: el registro de consultas es circular
+    if 'Server-Timing' in response:
+        # RequestMetricsMiddleware también cuenta las consultas hechas en otros hilos (resumen del Product Center)
+        timing = response['Server-Timing']
+        query_count = max(query_count, int(timing.split('desc="')[1].split(' queries')[0]))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert response.status_code == 200
+    benchmark.extra_info.update(
+        scale=BENCHMARK_SCALE, queries=query_count,
+        peak_memory_kb=peak // 1024, response_kb=len(response.content) // 1024,
+    )
+    benchmark.pedantic(client.get, args=(url, params), rounds=ROUNDS, iterations=1, warmup_rounds=1)
+    assert query_count <= max_queries, f'{query_count} consultas en {url}'
+    return response
+
+
+def test_products_list(benchmark, client):
+    run_benchmark(benchmark, client, reverse('product-list'), max_queries=6)
+
+
+def test_products_search(benchmark, client):
+    run_benchmark(benchmark, client, reverse('product-list'), max_queries=7, search='paracetamol 500')
+
+
+def test_products_keyset_page(benchmark, client):
+    run_benchmark(benchmark, client, reverse('product-search-all'), max_queries=4, page_size=200)
+
+
+def test_kardex(benchmark, client, sample_product_id):
+    run_benchmark(benchmark, client, reverse('product-kardex', args=[sample_product_id]), max_queries=6)
+
+
+def test_current_inventory(benchmark, client):
+    run_benchmark(benchmark, client, reverse('current-inventory'), max_queries=3)
+
+
+def test_current_inventory_page(benchmark, client):
+    run_benchmark(benchmark, client, reverse('current-inventory'), max_queries=3, page_size=200, low_stock='true')
+
+
+def test_movements_list(benchmark, client):
+    run_benchmark(benchmark, client, reverse('inventorymovement-list'), max_queries=8)
+
+
+def test_quotations_list(benchmark, client):
+    run_benchmark(benchmark, client, reverse('quotation-list'), max_queries=4)
+
+
+def test_pc_product_overview(benchmark, client, sample_product_id):
+    # Las siete secciones de la página de producto en una petición (vista asíncrona)
+    run_benchmark(benchmark, client, reverse('pc_product_overview', args=[sample_product_id]), max_queries=20)
@@ -0,0 +1,66 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from core.autocomplete import product_index
+from core.models import Business, Category, Brand, Unit, Product, ProductVariant
+
+
+class ProductAutocompleteTests(APITestCase):
+    def setUp(self):
+        product_index.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Categoria', business=self.business, code='CAT1')
+        self.brand = Brand.objects.create(name='Marca', business=self.business, code='BR1')
+        self.unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        for name, sku, barcode in [
+            ('Martillo de uña', 'MAR-01', '750100'),
+            ('Clavo para martillo', 'CLA-01', ''),
+            ('Desarmador plano', 'MART', ''),
+        ]:
+            self.create_product(name, sku, barcode)
+
+    def tearDown(self):
+        product_index.clear()
+
+    def create_product(self, name, sku, barcode=''):
+        return Product.objects.create(
+            business=self.business, category=self.category, brand=self.brand,
+            name=name, sku=sku, barcode=barcode, base_unit=self.unit
+        )
+
+    def names(self, q, **params):
+        response = self.client.get(reverse('product-autocomplete'), {'q': q, **params})
+        return [row['name'] for row in response.json()]
+
+    def test_prefix_infix_and_code_ranking(self):
+        # SKU exacto, luego prefijo del nombre, luego prefijo de palabra
+        self.assertEqual(self.names('mart'), ['Desarmador plano', 'Martillo de uña', 'Clavo para martillo'])
+        self.assertEqual(self.names('UNA mar'), ['Martillo de uña'])
+        self.assertEqual(self.names('armad'), ['Desarmador plano'])
+        self.assertEqual(self.names('7501'), ['Martillo de uña'])
+        self.assertEqual(self.names('mart', limit=1), ['Desarmador plano'])
+        self.assertEqual(self.names(''), [])
+
+    def test_queries_do_not_hit_database_once_built(self):
+        self.names('mart')
+        with self.assertNumQueries(0):
+            product_index.search('clavo')
+
+    def test_signals_refresh_index_incrementally(self):
+        self.names('mart')
+        with self.captureOnCommitCallbacks(execute=True):
+            product = self.create_product('Pinzas de presión', 'PIN-01')
+        self.assertEqual(self.names('pinz'), ['Pinzas de presión'])
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductVariant.objects.create(
+                product=product, name='Pinzas 10"', sku='PIN-10', cost_price=0, sale_price=0, purchase_price=0
+            )
+        self.assertEqual(self.names('pin-10'), ['Pinzas de presión'])
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertEqual(self.names('pinz'), [])
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import (
+    Business, Category, Brand, Unit, Product, ProductVariant, Warehouse, InventoryMovement, InventoryMovementDetail
+)
+
+
+class BulkMovementTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        business = Business.objects.create(name='Empresa', code='EMP001')
+        category = Category.objects.create(name='Categoria', business=business, code='CAT1')
+        brand = Brand.objects.create(name='Marca', business=business, code='BR1')
+        unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.warehouse = Warehouse.objects.create(name='Principal', code='ALM1', business=business)
+        self.products = [
+            Product.objects.create(business=business, category=category, brand=brand, name=f'Prod {i}', sku=f'SKU{i}', base_unit=unit)
+            for i in range(30)
+        ]
+        self.variants = {v.product_id: v for v in ProductVariant.objects.all()}
+
+    def invoice(self, lines, reference='FAC-1'):
+        return {
+            'warehouse_id': self.warehouse.id, 'type': 'IN', 'reference_document': reference,
+            'details': [{'product_id': p.id, 'quantity': 2, 'price': '10.50'} for p in self.products[:lines]],
+        }
+
+    def test_create_uses_constant_queries(self):
+        url = reverse('inventorymovement-list')
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(url, self.invoice(3), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(url, self.invoice(30, 'FAC-2'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['details']), 30)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        detail = InventoryMovementDetail.objects.filter(movement_id=response.data['id']).first()
+        self.assertEqual(detail.total, 21)
+
+    def test_bulk_creates_many_movements(self):
+        payload = {'movements': [self.invoice(5, f'FAC-{i}') for i in range(4)]}
+        payload['movements'][1]['details'] = [{'product_variant_id': self.variants[self.products[0].id].id, 'quantity': 1}]
+        response = self.client.post(reverse('inventorymovement-bulk'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual(InventoryMovementDetail.objects.count(), 16)
+        self.assertEqual([m['reference_document'] for m in response.data['movements']], ['FAC-3', 'FAC-2', 'FAC-1', 'FAC-0'])
+
+    def test_bulk_is_all_or_nothing(self):
+        bad = self.invoice(2, 'FAC-X')
+        bad['details'].append({'product_variant_id': 999999, 'quantity': 'x'})
+        response = self.client.post(reverse('inventorymovement-bulk'), [self.invoice(2), bad], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        error = response.data['errors'][0]
+        self.assertEqual((error['movement_index'], error['detail_index']), (1, 2))
+        self.assertEqual(set(error['errors']), {'product_variant_id', 'quantity'})
+        self.assertFalse(InventoryMovement.objects.exists())
+
+    def test_create_reports_detail_errors(self):
+        data = self.invoice(1)
+        data['details'].append({'quantity': 1})
+        response = self.client.post(reverse('inventorymovement-list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail_index'], 1)
+        self.assertFalse(InventoryMovement.objects.exists())
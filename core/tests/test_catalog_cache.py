@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from core.models import Business, Category, Warehouse
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Herramientas', business=self.business, code='CAT1')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_served_from_cache_without_queries(self):
+        url = reverse('category-list')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_save_and_delete_invalidate(self):
+        url = reverse('category-list')
+        self.client.get(url)
+        self.category.name = 'Ferretería'
+        self.category.save()
+        self.assertEqual([row['name'] for row in self.client.get(url).json()], ['Ferretería'])
+        self.category.delete()
+        self.assertEqual(self.client.get(url).json(), [])
+
+    def test_retrieve_is_cached_per_object(self):
+        other = Category.objects.create(name='Pinturas', business=self.business, code='CAT2')
+        self.assertEqual(self.client.get(reverse('category-detail', args=[self.category.id])).json()['name'], 'Herramientas')
+        self.assertEqual(self.client.get(reverse('category-detail', args=[other.id])).json()['name'], 'Pinturas')
+        self.assertEqual(self.client.get(reverse('category-detail', args=[9999])).status_code, 404)
+
+    def test_if_none_match_returns_304(self):
+        url = reverse('warehouses-list')
+        Warehouse.objects.create(name='Central', business=self.business, code='ALM1')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(response.json()[0]['name'], 'Central')
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        Warehouse.objects.create(name='Sucursal', business=self.business, code='ALM2')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_business_filter_uses_business_version(self):
+        url = reverse('category-list')
+        other = Business.objects.create(name='Otra', code='EMP002')
+        Category.objects.create(name='Ajena', business=other, code='CAT9')
+        first = self.client.get(url, {'business': self.business.id})
+        self.assertEqual([row['name'] for row in first.json()], ['Herramientas'])
+        Category.objects.create(name='Otra ajena', business=other, code='CAT8')
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, {'business': self.business.id})
+        self.assertEqual(cached['ETag'], first['ETag'])
+        self.category.name = 'Ferretería'
+        self.category.save()
+        self.assertEqual([row['name'] for row in self.client.get(url, {'business': self.business.id}).json()], ['Ferretería'])
+        self.assertEqual(len(self.client.get(url).json()), 3)
+        self.assertEqual(self.client.get(url, {'business': 'abc'}).status_code, 400)
+
+    def test_moving_to_another_business_invalidates_both(self):
+        url = reverse('category-list')
+        other = Business.objects.create(name='Otra', code='EMP002')
+        self.client.get(url, {'business': self.business.id})
+        self.category.business = other
+        self.category.save()
+        self.assertEqual(self.client.get(url, {'business': self.business.id}).json(), [])
+        self.assertEqual([row['name'] for row in self.client.get(url, {'business': other.id}).json()], ['Herramientas'])
@@ -0,0 +1,56 @@
+import json
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import Business, Category, Brand, Unit, Product
+
+
+class CatalogPaginationTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        business = Business.objects.create(name='Empresa', code='EMP001')
+        category = Category.objects.create(name='Categoria', business=business, code='CAT1')
+        brand = Brand.objects.create(name='Marca', business=business, code='BR1')
+        unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        # Nombres repetidos para comprobar el desempate por id
+        for i, name in enumerate(['Beta', 'Alfa', 'Beta', 'Gamma', 'Alfa']):
+            Product.objects.create(business=business, category=category, brand=brand, name=name, sku=f'SKU{i}', base_unit=unit)
+        self.expected = list(Product.objects.order_by('name', 'id').values_list('id', flat=True))
+
+    def walk_pages(self, name):
+        url = reverse(name)
+        page = self.client.get(url, {'page_size': 2}).json()
+        ids = [row['id'] for row in page['results']]
+        while page['next_cursor']:
+            page = self.client.get(url, {'page_size': 2, 'cursor': page['next_cursor']}).json()
+            ids += [row['id'] for row in page['results']]
+        return ids
+
+    def test_keyset_pages_cover_catalog_once(self):
+        for name in ('product-search-all', 'product-show-all', 'product-simple-list'):
+            self.assertEqual(self.walk_pages(name), self.expected, name)
+
+    def test_without_params_returns_plain_list(self):
+        response = self.client.get(reverse('product-search-all'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.json()], self.expected)
+        self.assertNotIn('search_document', response.json()[0])
+
+    def test_ndjson_stream(self):
+        response = self.client.get(reverse('product-simple-list'), {'stream': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['id'] for row in rows], self.expected)
+        self.assertEqual(len(rows[0]['variants']), 1)
+        self.assertNotIn('search_document', rows[0])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('product-search-all'), {'cursor': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from core.models import (
+    Business, Category, Brand, Unit, Product, ProductVariant, ProductWarehouseStock, Warehouse,
+    Customer, CustomerType, MenuOption, Role,
+)
+
+
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Categoria', business=self.business, code='CAT1')
+        self.brand = Brand.objects.create(name='Marca', business=self.business, code='BR1')
+        self.unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.warehouse = Warehouse.objects.create(name='Central', business=self.business, code='ALM1')
+        self.products = [
+            Product.objects.create(
+                business=self.business, category=self.category, brand=self.brand,
+                name=f'Producto {i}', sku=f'SKU{i}', base_unit=self.unit
+            ) for i in range(3)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_list_returns_304_until_something_changes(self):
+        url = reverse('product-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.revalidate(url, etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)  # sólo el agregado Max + Count
+
+        self.products[0].name = 'Renombrado'
+        self.products[0].save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.products[1].delete()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_related_changes_invalidate_list(self):
+        url = reverse('product-list')
+        etag = self.client.get(url)['ETag']
+        variant = ProductVariant.objects.filter(product=self.products[0]).first()
+        ProductWarehouseStock.objects.create(product_variant=variant, warehouse=self.warehouse, quantity=7)
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_etag_depends_on_query_string(self):
+        url = reverse('product-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, {'search': 'Producto 1'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_etag_and_if_modified_since(self):
+        product = self.products[0]
+        url = reverse('product-detail', args=[product.id])
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response['ETag']).status_code, 304)
+
+        url = reverse('warehouse-detail', args=[self.warehouse.id])
+        response = self.client.get(url)
+        since = response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 304)
+        Warehouse.objects.filter(pk=self.warehouse.pk).update(updated_at=self.warehouse.updated_at + timedelta(hours=1))
+        self.warehouse.refresh_from_db()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Last-Modified'], http_date(self.warehouse.updated_at.timestamp()))
+
+    def test_models_without_updated_at_use_version(self):
+        customer_type = CustomerType.objects.create(level=1, discount_percentage=0)
+        customer = Customer.objects.create(
+            business=self.business, name='Cliente', code='C1', email='c1@test.com', customer_type=customer_type
+        )
+        url = reverse('customer-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+        customer.name = 'Cliente SA'
+        customer.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['name'], 'Cliente SA')
+
+    def test_user_list_follows_nested_role(self):
+        role = Role.objects.create(name='Ventas', business=self.business)
+        self.user.role = role
+        self.user.save()
+        url = reverse('user-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        role.name = 'Ventas y caja'
+        role.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        option = MenuOption.objects.create(name='ventas', label='Ventas', business=self.business)
+        etag = self.client.get(url)['ETag']
+        option.roles.add(role)  # m2m: no pasa por post_save
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['role']['menu_options'][0]['name'], 'ventas')
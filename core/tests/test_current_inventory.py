@@ -0,0 +1,89 @@
+import csv
+import io
+
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from core.models import Business, Category, Brand, Unit, Product, ProductVariant, ProductWarehouseStock, Warehouse
+
+
+class CurrentInventoryViewTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Analgésicos', business=self.business, code='CAT1')
+        self.other_category = Category.objects.create(name='Vitaminas', business=self.business, code='CAT2')
+        self.brand = Brand.objects.create(name='Marca', business=self.business, code='BR1')
+        self.unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.main = Warehouse.objects.create(name='Central', business=self.business, code='ALM1')
+        self.branch = Warehouse.objects.create(name='Sucursal', business=self.business, code='ALM2')
+        self.variants = {}
+        for name, category, brand in (
+            ('Paracetamol', self.category, self.brand),
+            ('Ibuprofeno', self.category, None),
+            ('Complejo B', self.other_category, self.brand),
+        ):
+            product = Product.objects.create(
+                business=self.business, category=category, brand=brand, name=name, sku=f'SKU-{name[:4]}', base_unit=self.unit
+            )
+            self.variants[name] = ProductVariant.objects.get(product=product)
+        ProductWarehouseStock.objects.create(product_variant=self.variants['Paracetamol'], warehouse=self.main, quantity=50, min_stock=10)
+        ProductWarehouseStock.objects.create(product_variant=self.variants['Paracetamol'], warehouse=self.branch, quantity=3, min_stock=10)
+        ProductWarehouseStock.objects.create(product_variant=self.variants['Ibuprofeno'], warehouse=self.main, quantity=0)
+        ProductWarehouseStock.objects.create(product_variant=self.variants['Complejo B'], warehouse=self.main, quantity=20)
+        self.url = reverse('current-inventory')
+
+    def names(self, rows):
+        return [(row['product_variant']['product']['name'], row['warehouse']['name']) for row in rows]
+
+    def test_full_list_keeps_shape_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()
+        self.assertEqual(len(rows), 4)
+        ibuprofeno = next(row for row in rows if row['product_variant']['product']['name'] == 'Ibuprofeno')
+        self.assertEqual(ibuprofeno['product_variant']['product']['category'], 'Analgésicos')
+        self.assertEqual(ibuprofeno['product_variant']['product']['brand'], '')
+        self.assertEqual(ibuprofeno['warehouse'], {'id': self.main.id, 'name': 'Central'})
+        self.assertEqual(ibuprofeno['product_variant']['id'], self.variants['Ibuprofeno'].id)
+        self.assertEqual(self.names(rows)[0][0], 'Complejo B')  # ordenado por producto
+
+    def test_filters(self):
+        def fetch(**params):
+            return self.names(self.client.get(self.url, params).json())
+
+        self.assertEqual(fetch(warehouse=self.branch.id), [('Paracetamol', 'Sucursal')])
+        self.assertEqual(len(fetch(category=self.category.id)), 3)
+        self.assertEqual({name for name, _ in fetch(brand=self.brand.id)}, {'Paracetamol', 'Complejo B'})
+        self.assertEqual(fetch(search='ibupro'), [('Ibuprofeno', 'Central')])
+        self.assertEqual(sorted(fetch(low_stock='true')), [('Ibuprofeno', 'Central'), ('Paracetamol', 'Sucursal')])
+        self.assertEqual(self.client.get(self.url, {'warehouse': 'abc'}).status_code, 400)
+
+    def test_keyset_pages(self):
+        seen = []
+        params = {'page_size': 3}
+        while True:
+            data = self.client.get(self.url, params).json()
+            seen.extend(data['results'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(len({row['id'] for row in seen}), 4)
+        self.assertEqual(self.names(seen), self.names(self.client.get(self.url).json()))
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, {'export': 'csv', 'warehouse': self.main.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][0], 'id')
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row[3] for row in rows[1:]], ['Complejo B', 'Ibuprofeno', 'Paracetamol'])
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from core.models import (
+    Business, Category, Brand, Unit, Product, ProductVariant, ProductWarehouseStock, Warehouse,
+    InventoryMovement, Customer, CustomerType, CustomerPayment, Sale, Supplier,
+)
+
+
+class DashboardSummaryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Analgésicos', business=self.business, code='CAT1')
+        self.brand = Brand.objects.create(name='Marca', business=self.business, code='BR1')
+        self.unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.main = Warehouse.objects.create(name='Central', business=self.business, code='ALM1')
+        self.branch = Warehouse.objects.create(name='Sucursal', business=self.business, code='ALM2')
+        self.variants = []
+        for index, cost in enumerate((10, 2)):
+            product = Product.objects.create(
+                business=self.business, category=self.category, brand=self.brand if index == 0 else None,
+                name=f'Producto {index}', sku=f'SKU{index}', base_unit=self.unit
+            )
+            variant = ProductVariant.objects.get(product=product)
+            variant.cost_price = cost
+            variant.save()
+            self.variants.append(variant)
+        ProductWarehouseStock.objects.create(product_variant=self.variants[0], warehouse=self.main, quantity=5, min_stock=2)
+        ProductWarehouseStock.objects.create(product_variant=self.variants[0], warehouse=self.branch, quantity=1, min_stock=2)
+        ProductWarehouseStock.objects.create(product_variant=self.variants[1], warehouse=self.main, quantity=-4)
+        InventoryMovement.objects.create(warehouse=self.main, user=self.user, movement_type='IN')
+        InventoryMovement.objects.create(warehouse=self.main, user=self.user, movement_type='IN', authorized=True)
+        customer_type = CustomerType.objects.create(level=1, discount_percentage=0)
+        self.customer = Customer.objects.create(
+            business=self.business, name='Cliente', code='C1', email='c1@test.com',
+            customer_type=customer_type, current_balance=Decimal('300.00'),
+        )
+        Sale.objects.create(customer=self.customer, total_amount=Decimal('120.00'), paid_amount=Decimal('20.00'))
+        Supplier.objects.create(business=self.business, name='Proveedor', current_balance=Decimal('80.50'))
+        self.url = reverse('dashboard-summary')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_summary_sections(self):
+        data = self.client.get(self.url).json()
+        stock = data['stock_value']
+        self.assertEqual(stock['total'], 60.0)  # negativos no suman valor
+        self.assertEqual(
+            {row['name']: row['value'] for row in stock['by_warehouse']}, {'Central': 50.0, 'Sucursal': 10.0}
+        )
+        self.assertEqual(stock['by_category'], [{'id': self.category.id, 'name': 'Analgésicos', 'value': 60.0, 'units': 6.0}])
+        self.assertEqual([row['name'] for row in stock['by_brand']], ['Marca'])
+        self.assertEqual(data['stock_alerts'], {'low_stock': 2, 'out_of_stock': 1, 'negative': 1})
+        self.assertEqual(data['pending_authorizations']['movements'], 1)
+        self.assertEqual(data['receivables']['customer_balance'], 300.0)
+        self.assertEqual(data['receivables']['unpaid_sales'], 1)
+        self.assertEqual(data['receivables']['unpaid_sales_balance'], 100.0)
+        self.assertEqual(data['payables'], {'supplier_balance': 80.5, 'suppliers_with_balance': 1})
+
+    def test_cached_sections_refresh_only_what_changed(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        CustomerPayment.objects.create(customer=self.customer, amount=Decimal('100.00'), created_by=self.user)
+        with self.assertNumQueries(2):  # sólo la sección de cuentas por cobrar
+            data = self.client.get(self.url).json()
+        self.assertEqual(data['receivables']['customer_balance'], 200.0)
+
+        stock = ProductWarehouseStock.objects.get(product_variant=self.variants[0], warehouse=self.branch)
+        stock.quantity = 10
+        stock.save()
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['stock_value']['total'], 150.0)
+        self.assertEqual(data['stock_alerts']['low_stock'], 1)
@@ -0,0 +1,51 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from core.db import without_statement_timeout
+from core.models import Product
+
+
+class BenchmarkConnectionsTests(TransactionTestCase):
+    # Cada ciclo cierra o conserva la conexión como al final de una petición: sin transacción envolvente
+    def test_command_compares_modes_and_restores_settings(self):
+        configured = connection.settings_dict
+        out = StringIO()
+        call_command('benchmark_connections', requests=5, stdout=out)
+        output = out.getvalue()
+        self.assertIn('Conexión nueva por petición', output)
+        self.assertIn('Configuración actual', output)
+        self.assertIn('Costo de conexión evitado', output)
+        self.assertIs(connection.settings_dict, configured)
+        self.assertEqual(connection.settings_dict['CONN_HEALTH_CHECKS'], configured['CONN_HEALTH_CHECKS'])
+
+    def test_refuses_to_run_inside_a_transaction(self):
+        with transaction.atomic(), self.assertRaises(CommandError):
+            call_command('benchmark_connections', requests=5, stdout=StringIO())
+
+
+class WithoutStatementTimeoutTests(TransactionTestCase):
+    def show_statement_timeout(self, target=connection):
+        with target.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            return cursor.fetchone()[0]
+
+    @skipUnless(connection.vendor == 'postgresql', 'statement_timeout es de PostgreSQL')
+    def test_disables_and_restores_timeout(self):
+        configured = self.show_statement_timeout()
+        with without_statement_timeout():
+            self.assertEqual(self.show_statement_timeout(), '0')
+            # Las conexiones nuevas dentro del bloque (hilos, procesos hijos) tampoco tienen límite
+            other = connection.copy()
+            try:
+                self.assertEqual(self.show_statement_timeout(other), '0')
+            finally:
+                other.close()
+        self.assertEqual(self.show_statement_timeout(), configured)
+
+    def test_noop_on_other_databases(self):
+        with without_statement_timeout():
+            self.assertTrue(Product.objects.count() >= 0)
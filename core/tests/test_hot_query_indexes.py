@@ -0,0 +1,50 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from core.management.commands.explain_hot_queries import HOT_INDEX_NAMES
+from core.models import AuditLog, InventoryMovementDetail, Product, Sale
+from core.seeding import DatasetSeeder
+
+
+def index_names(*tables):
+    with connection.cursor() as cursor:
+        return {
+            name for table in tables
+            for name in connection.introspection.get_constraints(cursor, table)
+        }
+
+
+class HotQueryIndexTests(TestCase):
+    def setUp(self):
+        DatasetSeeder(
+            products=30, movements=20, details_per_movement=3, customers=10,
+            audit_logs=50, payments=40, sales=40, discounts=20,
+        ).run()
+
+    def test_seeder_generates_requested_volumes(self):
+        self.assertEqual(Product.objects.count(), 30)
+        self.assertEqual(InventoryMovementDetail.objects.count(), 60)
+        self.assertEqual(AuditLog.objects.count(), 50)
+        self.assertEqual(Sale.objects.count(), 40)
+
+    def test_explain_compares_plans_and_restores_indexes(self):
+        tables = ['core_auditlog', 'core_inventorymovement', 'core_product', 'core_customerpayment',
+                  'core_supplierpayment', 'core_sale', 'core_customerproductdiscount']
+        self.assertTrue(HOT_INDEX_NAMES <= index_names(*tables))
+        out = StringIO()
+        call_command('explain_hot_queries', '--repeat', '1', '--i-know-this-locks-tables', stdout=out)
+        output = out.getvalue()
+        self.assertIn(f'Índices comparados: {len(HOT_INDEX_NAMES)}', output)
+        self.assertIn('Bitácora de un producto', output)
+        self.assertIn('Kardex de un producto', output)
+        # La comparación se revierte: índices y datos siguen en su lugar
+        self.assertTrue(HOT_INDEX_NAMES <= index_names(*tables))
+        self.assertEqual(Product.objects.count(), 30)
+
+    def test_explain_requires_benchmark_flag(self):
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, '--i-know-this-locks-tables'):
+            call_command('explain_hot_queries', '--repeat', '1', stdout=out)
+        self.assertEqual(out.getvalue(), '')
@@ -0,0 +1,75 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import Business, Brand, ImportJob, Product
+from core.tasks import process_import_job
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(IMPORT_JOBS_EAGER=False, MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImportJobTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa Test', code='EMPTEST')
+
+    def upload(self, name, data):
+        file = io.BytesIO(data.encode('utf-8'))
+        file.name = 'archivo.csv'
+        # La tarea se encola al confirmar la transacción; aquí se ejecuta en el mismo proceso
+        with mock.patch('core.tasks.process_import_job.delay', side_effect=process_import_job), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse(name), {'file': file, 'business': self.business.id}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'PENDING')
+        return self.client.get(reverse('importjob-detail', args=[response.data['id']])).data
+
+    def test_product_job_reports_progress_and_errors(self):
+        rows = "\n".join(f"SKU{i:03d},Producto {i},Categoria,Marca" for i in range(5))
+        job = self.upload('import-products', f"sku,name,category,brand\n{rows}\nSKU999,,Categoria,Marca")
+        self.assertEqual(job['status'], 'COMPLETED')
+        self.assertEqual((job['total_rows'], job['processed_rows'], job['progress']), (6, 6, 100))
+        self.assertEqual((job['created_count'], job['error_count']), (5, 1))
+        self.assertEqual(job['errors'][0]['row'], 7)
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertFalse(ImportJob.objects.get(pk=job['id']).file)
+
+    def test_brand_job_skips_duplicates(self):
+        Brand.objects.create(name='Marca 1', business=self.business, code='BR1')
+        job = self.upload('import-brands', "name,code,country\nMarca 1,BR1,MX\nMarca 2,BR2,MX\nMarca 2,BR2,MX")
+        self.assertEqual((job['created_count'], job['duplicate_count']), (1, 2))
+        self.assertEqual(Brand.objects.get(name='Marca 2').country, 'MX')
+
+    def test_invalid_file_fails_job_and_keeps_upload(self):
+        file = io.BytesIO('sku,name\n\xff\xfe'.encode('latin-1'))
+        file.name = 'archivo.csv'
+        with mock.patch('core.tasks.process_import_job.delay', side_effect=process_import_job), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('import-products'), {'file': file, 'business': self.business.id}, format='multipart')
+        job = ImportJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, 'FAILED')
+        self.assertTrue(job.file)
+
+    def test_importer_without_import_chunk_cannot_be_created(self):
+        from core.importers import CsvImporter
+
+        class IncompleteImporter(CsvImporter):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteImporter(self.business.id)
@@ -0,0 +1,108 @@
+from datetime import date, datetime, timezone as dt_timezone
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import (
+    Business, Category, Brand, Unit, Product, ProductVariant, Warehouse, InventoryMovement, InventoryMovementDetail,
+    StockSnapshot
+)
+from core.kardex import create_stock_snapshot, pending_snapshot_periods
+from core.tasks import create_stock_snapshots
+
+
+class KardexTestBase(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        business = Business.objects.create(name='Empresa', code='EMP001')
+        category = Category.objects.create(name='Categoria', business=business, code='CAT1')
+        brand = Brand.objects.create(name='Marca', business=business, code='BR1')
+        unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.product = Product.objects.create(business=business, category=category, brand=brand, name='Prod', sku='SKU1', base_unit=unit)
+        self.variant = ProductVariant.objects.get(product=self.product)
+        self.main = Warehouse.objects.create(name='Principal', code='ALM1', business=business)
+        self.other = Warehouse.objects.create(name='Sucursal', code='ALM2', business=business)
+        # (fecha, almacén, tipo, cantidad)
+        for day, warehouse, movement_type, quantity in [
+            (1, self.main, 'IN', 10),
+            (2, self.main, 'OUT', 3),
+            (3, self.other, 'IN', 5),
+            (4, self.main, 'IN', 2),
+            (5, self.main, 'CANCELACION_IN', 2),
+        ]:
+            movement = InventoryMovement.objects.create(warehouse=warehouse, user=self.user, movement_type=movement_type)
+            InventoryMovement.objects.filter(pk=movement.pk).update(created_at=datetime(2025, 1, day, 12, tzinfo=dt_timezone.utc))
+            InventoryMovementDetail.objects.create(movement=movement, product_variant=self.variant, quantity=quantity, price=4)
+
+    def get(self, name, **params):
+        response = self.client.get(reverse(name, args=[self.product.id]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+
+class KardexTests(KardexTestBase):
+    def test_running_balance(self):
+        for name in ('product-kardex', 'pc_product_kardex'):
+            rows = self.get(name)
+            self.assertEqual([row['balance'] for row in rows], [10, 7, 12, 14, 12])
+            self.assertEqual(rows[1]['quantity_out'], 3)
+            self.assertEqual(rows[0]['total_value'], 40)
+
+    def test_warehouse_and_date_filters_keep_opening_balance(self):
+        rows = self.get('pc_product_kardex', warehouse=self.main.id, date_from='2025-01-02', date_to='2025-01-04')
+        self.assertEqual([row['balance'] for row in rows], [7, 9])
+
+    def test_cursor_pagination(self):
+        page = self.get('pc_product_kardex', page_size=2)
+        balances = [row['balance'] for row in page['results']]
+        while page['next_cursor']:
+            page = self.get('pc_product_kardex', page_size=2, cursor=page['next_cursor'])
+            balances += [row['balance'] for row in page['results']]
+        self.assertEqual(balances, [10, 7, 12, 14, 12])
+
+    def test_kardex_uses_constant_queries(self):
+        with self.assertNumQueries(2):  # producto + detalles
+            self.get('pc_product_kardex')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('pc_product_kardex', args=[self.product.id]), {'cursor': 'xx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_warehouse(self):
+        for name in ('product-kardex', 'pc_product_kardex'):
+            response = self.client.get(reverse(name, args=[self.product.id]), {'warehouse': 'abc'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('warehouse', response.json())
+
+
+class StockSnapshotTests(KardexTestBase):
+    def setUp(self):
+        super().setUp()
+        movement = InventoryMovement.objects.create(warehouse=self.main, user=self.user, movement_type='OUT')
+        InventoryMovement.objects.filter(pk=movement.pk).update(created_at=datetime(2025, 2, 10, 12, tzinfo=dt_timezone.utc))
+        InventoryMovementDetail.objects.create(movement=movement, product_variant=self.variant, quantity=1)
+        self.variant.cost_price = 4
+        self.variant.save()
+
+    def test_task_closes_pending_months(self):
+        result = create_stock_snapshots('2025-01-31')
+        self.assertEqual(result, {'2025-01-31': 2})
+        main = StockSnapshot.objects.get(warehouse=self.main, period_end=date(2025, 1, 31))
+        self.assertEqual(main.quantity, 7)
+        self.assertEqual(main.total_value, 28)
+        self.assertEqual(pending_snapshot_periods(date(2025, 3, 31)), [date(2025, 2, 28), date(2025, 3, 31)])
+        create_stock_snapshot(date(2025, 2, 28))
+        self.assertEqual(StockSnapshot.objects.get(warehouse=self.main, period_end=date(2025, 2, 28)).quantity, 6)
+
+    def test_kardex_starts_from_snapshot(self):
+        create_stock_snapshots('2025-01-31')
+        # Alterar el snapshot demuestra que el saldo inicial sale de él y no del historial
+        StockSnapshot.objects.filter(warehouse=self.main).update(quantity=100)
+        rows = self.get('pc_product_kardex', warehouse=self.main.id, date_from='2025-02-01')
+        self.assertEqual([row['balance'] for row in rows], [99])
+        rows = self.get('product-kardex', date_from='2025-02-01')
+        self.assertEqual([row['balance'] for row in rows], [104])
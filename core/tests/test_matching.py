@@ -0,0 +1,58 @@
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from core.matching import ParsedName, ProductMatcher
+from core.models import Business, Category, Brand, Product
+
+CATALOG = [
+    (1, 'ACXION 30MG C/30 TABS FENTERMINA (IFA)'),
+    (2, 'ACXION AP 30MG C/30 TABS FENTERMINA (IFA)'),
+    (3, 'ADIOLOL 100MG C/50 + 50 DUO CAPS TRAMADOL (SBL)'),
+    (4, 'ADIOLOL 100MG C/60 + 60 DUO CAPS TRAMADOL (SBL)'),
+    (5, 'BEDOYECTA TRI C/5 AMP (GROSSMAN)'),
+    (6, 'BEDOYECTA TRI C/5 AMP (GROSSMAN) (SIN EMPAQUE)'),
+    (7, 'DOLO-NEUROBION FORTE C/30 TABS (MERCK)'),
+]
+
+
+class ProductMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = ProductMatcher(CATALOG)
+
+    def test_parsed_name_features(self):
+        parsed = ParsedName('Acxión 30 MG C / 30 tabs Fentermina (IFA) (SIN EMPAQUE)')
+        self.assertEqual(parsed.lab, 'ifa')
+        self.assertEqual(parsed.extras, {'sin empaque'})
+        self.assertEqual(parsed.doses, {'30mg', 'c/30'})
+        self.assertEqual(parsed.base, 'acxion 30mg c/30 tabs fentermina')
+
+    def test_exact_after_normalization(self):
+        result = self.matcher.match('acxion 30 mg c/30 tabs fentermina (ifa)')
+        self.assertEqual((result.product_id, result.score), (1, 1.0))
+
+    def test_dosage_and_packaging_disambiguate(self):
+        self.assertEqual(self.matcher.match('ADIOLOL 100MG C/60 DUO CAPS TRAMADOL (SBL)').product_id, 4)
+        self.assertEqual(self.matcher.match('BEDOYECTA TRI C/5 AMP (GROSSMAN) SIN EMPAQUE', threshold=0.5).product_id, 5)
+        self.assertEqual(self.matcher.match('DOLO NEUROBION FORTE C/30 TABS').product_id, 7)
+
+    def test_no_match_below_threshold(self):
+        self.assertIsNone(self.matcher.match('PARACETAMOL 500MG C/10 (GENERICO)'))
+        self.assertIsNone(self.matcher.match('-'))
+
+
+class MatchProductsCommandTests(TestCase):
+    def test_command_reports_matches(self):
+        business = Business.objects.create(name='Empresa', code='EMP001')
+        category = Category.objects.create(name='Categoria', business=business, code='CAT1')
+        brand = Brand.objects.create(name='Marca', business=business, code='BR1')
+        for product_id, name in CATALOG:
+            Product.objects.create(business=business, category=category, brand=brand, name=name, sku=f'SKU{product_id}')
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as handle:
+            handle.write('Producto|Precio|Cantidad\nACXION 30 MG C/30 TABS FENTERMINA (IFA)|0|10\nNADA PARECIDO|0|1\n')
+        self.addCleanup(os.remove, handle.name)
+        out = StringIO()
+        call_command('match_products_csv', handle.name, stdout=out)
+        self.assertIn('Renglones con coincidencia: 1/2', out.getvalue())
+        self.assertIn('Sin coincidencia: NADA PARECIDO', out.getvalue())
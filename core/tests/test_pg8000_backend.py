@@ -0,0 +1,208 @@
+import time
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+
+from core.models import Unit
+from core.pgmigrate import CopyStream, copy_from
+
+try:
+    import pg8000  # noqa: F401
+except ImportError:
+    pg8000 = None
+else:
+    from maestro_inventario_backend.pg8000_backend.base import DatabaseOperations, DatabaseWrapper, StatementCache
+    from maestro_inventario_backend.pg8000_backend.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self._in_transaction = False
+        self.autocommit = False
+        self.rolled_back = False
+        self.prepared = []
+
+    def rollback(self):
+        self.rolled_back = True
+        self._in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+    def prepare_statement(self, statement, oids):
+        self.prepared.append(statement)
+        return (f'stmt_{len(self.prepared)}', None, None)
+
+    def close_prepared_statement(self, name):
+        pass
+
+
+def fake_pool(**kwargs):
+    created = []
+
+    def connect():
+        created.append(FakeConnection(len(created)))
+        return created[-1]
+
+    return ConnectionPool(connect, **kwargs), created
+
+
+@skipUnless(pg8000, 'pg8000 no está instalado')
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuses_last_returned_connection(self):
+        pool, created = fake_pool(min_size=0, max_size=3)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+        self.assertIs(pool.getconn(), second)
+        self.assertEqual((len(created), pool.size, pool.idle), (2, 2, 1))
+
+    def test_open_prefills_min_size(self):
+        pool, created = fake_pool(min_size=2, max_size=4)
+        pool.open()
+        self.assertEqual((len(created), pool.idle), (2, 2))
+
+    def test_timeout_when_exhausted(self):
+        pool, _ = fake_pool(min_size=0, max_size=1, timeout=0.05)
+        pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+
+    def test_returned_transaction_is_rolled_back(self):
+        pool, _ = fake_pool(min_size=0, max_size=1)
+        connection = pool.getconn()
+        connection._in_transaction = True
+        pool.putconn(connection)
+        self.assertTrue(connection.rolled_back)
+        self.assertTrue(connection.autocommit)
+        self.assertIs(pool.getconn(), connection)
+
+    def test_broken_connections_are_replaced(self):
+        pool, created = fake_pool(min_size=0, max_size=1, check=lambda connection: connection.number > 0)
+        broken = pool.getconn()
+        pool.putconn(broken)
+        replacement = pool.getconn()
+        self.assertTrue(broken.closed)
+        self.assertIsNot(replacement, broken)
+        self.assertEqual((len(created), pool.size), (2, 1))
+
+    def test_expired_connections_are_closed(self):
+        pool, _ = fake_pool(min_size=0, max_size=2, max_lifetime=0.01)
+        connection = pool.getconn()
+        time.sleep(0.02)
+        pool.putconn(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual((pool.size, pool.idle), (0, 0))
+
+    def test_closed_pool_refuses_connections(self):
+        pool, _ = fake_pool(min_size=1, max_size=1)
+        pool.open()
+        pool.close()
+        with self.assertRaises(pg8000.OperationalError):
+            pool.getconn()
+
+
+@skipUnless(pg8000, 'pg8000 no está instalado')
+class BackendHelpersTests(SimpleTestCase):
+    def test_statement_cache_prepares_at_threshold(self):
+        connection = FakeConnection(0)
+        cache = StatementCache(connection, threshold=3, size=1)
+        results = [cache.lookup('SELECT 1') for _ in range(4)]
+        self.assertEqual(results[:2], [None, None])
+        self.assertEqual(results[2], results[3])
+        self.assertEqual(connection.prepared, ['SELECT 1'])
+        for _ in range(3):
+            cache.lookup('SELECT 2')
+        self.assertEqual(list(cache.prepared), ['SELECT 2'])  # LRU de tamaño 1
+
+    def test_statement_cache_disabled(self):
+        cache = StatementCache(FakeConnection(0), threshold=None)
+        self.assertIsNone(cache.lookup('SELECT 1'))
+
+    def test_parse_server_version(self):
+        self.assertEqual(DatabaseWrapper.parse_server_version('16.2 (Debian 16.2-1.pgdg120+2)'), 160002)
+        self.assertEqual(DatabaseWrapper.parse_server_version('17beta1'), 170000)
+
+    def test_compose_sql_quotes_literals(self):
+        sql = DatabaseOperations.compose_sql(None, 'SELECT %s, %s, %s', ["O'Brien", 5, None])
+        self.assertEqual(sql, "SELECT 'O''Brien', 5, NULL")
+
+
+# ============================================================================
+# Contra PostgreSQL (DATABASE_ENGINE=maestro_inventario_backend.pg8000_backend)
+# ============================================================================
+
+@skipUnless(
+    pg8000 and settings.DATABASES['default']['ENGINE'] == 'maestro_inventario_backend.pg8000_backend',
+    'requiere PostgreSQL con el backend pg8000',
+)
+class LiveBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.units = [Unit.objects.create(name=f'Unidad {index}', symbol=f'U{index}', unit_type='pieza') for index in range(5)]
+
+    def setUp(self):
+        connection.ensure_connection()
+        self.cache = connection.connection.statement_cache
+        threshold = self.cache.threshold
+        self.cache.threshold = 2
+        self.addCleanup(setattr, self.cache, 'threshold', threshold)
+
+    def prepared_for(self, sql):
+        """Nombres de las sentencias preparadas en la conexión para una consulta con %s"""
+        statement = sql.replace('%s', '$%d') % tuple(range(1, sql.count('%s') + 1))
+        return [name for text, (name, _, _) in self.cache.prepared.items() if text == statement]
+
+    def scalar(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone()[0]
+
+    def test_iterator_declares_cursor_and_fetches_by_blocks(self):
+        names = []
+        open_cursors = []
+        for unit in Unit.objects.order_by('id').iterator(chunk_size=2):
+            names.append(unit.name)
+            open_cursors.append(self.scalar('SELECT count(*) FROM pg_cursors WHERE name LIKE %s', ['_django_curs_%']))
+        self.assertEqual(names, [unit.name for unit in self.units])
+        self.assertEqual(set(open_cursors), {1})
+        self.assertEqual(self.scalar('SELECT count(*) FROM pg_cursors'), 0)
+
+    def test_repeated_query_runs_as_prepared_statement(self):
+        sql = 'SELECT name, %s::numeric FROM core_unit WHERE id = %s'
+        rows = []
+        with connection.cursor() as cursor:
+            for unit in self.units:
+                cursor.execute(sql, ['1.50', unit.id])
+                rows.append(cursor.fetchone())
+        self.assertEqual([row[0] for row in rows], [unit.name for unit in self.units])
+        self.assertEqual({str(row[1]) for row in rows}, {'1.50'})
+        [name] = self.prepared_for(sql)
+        name = name.rstrip(b'\x00').decode()  # pg8000 guarda el nombre como lo envía: bytes terminados en NUL
+        self.assertEqual(self.scalar('SELECT count(*) FROM pg_prepared_statements WHERE name = %s', [name]), 1)
+
+    def test_stale_prepared_statement_is_discarded(self):
+        sql = 'SELECT name FROM core_unit WHERE id = %s'
+        unit = self.units[0]
+        for _ in range(2):
+            self.scalar(sql, [unit.id])
+        self.assertEqual(len(self.prepared_for(sql)), 1)
+        with connection.cursor() as cursor:
+            cursor.execute('DEALLOCATE ALL')
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            self.scalar(sql, [unit.id])
+        self.assertEqual(self.prepared_for(sql), [])
+        self.assertEqual([self.scalar(sql, [unit.id]) for _ in range(3)], [unit.name] * 3)  # se vuelve a preparar
+        self.assertEqual(len(self.prepared_for(sql)), 1)
+
+    def test_copy_from_stream(self):
+        rows = [(index, f'fila\t{index}', None) for index in range(5000)]
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE copy_target (id integer, name text, note text) ON COMMIT DROP')
+            copy_from(cursor, 'COPY copy_target (id, name, note) FROM STDIN', CopyStream(rows, [str, str, str]))
+            cursor.execute('SELECT count(*), max(id), min(name), count(note) FROM copy_target')
+            self.assertEqual(list(cursor.fetchone()), [5000, 4999, 'fila\t0', 0])
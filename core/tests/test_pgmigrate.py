@@ -0,0 +1,75 @@
+import datetime
+import decimal
+import hashlib
+from io import StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from core.backup import backup_models
+from core.models import Business, Category, Unit, Product, ProductVariant, User
+from core.pgmigrate import (
+    CopyStream, MigrationError, check_target, copy_encoders, copy_line, natural_key_mappings, row_digest, table_checksum,
+)
+
+
+class CopyFormatTests(TestCase):
+    def test_copy_line_escapes_and_nulls(self):
+        encoders = [str, lambda value: 't' if value else 'f', str]
+        line = copy_line(['a\tb\\c\nd', True, None], encoders)
+        self.assertEqual(line, 'a\\tb\\\\c\\nd\tt\t\\N\n')
+
+    def test_encoders_follow_field_types(self):
+        fields = {field.attname: index for index, field in enumerate(Product._meta.concrete_fields)}
+        encoders = copy_encoders(Product)
+        moment = datetime.datetime(2026, 1, 2, 3, 4, 5, 6000, tzinfo=datetime.timezone.utc)
+        self.assertEqual(encoders[fields['is_active']](False), 'f')
+        self.assertEqual(encoders[fields['created_at']](moment), '2026-01-02T03:04:05.006000+00:00')
+
+    def test_stream_reads_in_blocks_and_hashes_rows(self):
+        rows = [(index, f'fila {index}') for index in range(100)]
+        stream = CopyStream(rows, [str, str])
+        blocks = list(iter(lambda: stream.read(64), ''))
+        self.assertTrue(all(len(block) <= 64 for block in blocks))
+        self.assertEqual(''.join(blocks), ''.join(copy_line(row, [str, str]) for row in rows))
+        self.assertEqual(stream.count, 100)
+        expected = hashlib.sha256(b''.join(row_digest(row) for row in rows)).hexdigest()
+        self.assertEqual(stream.hexdigest(), expected)
+
+    def test_row_digest_ignores_json_key_order(self):
+        self.assertEqual(row_digest([1, {'a': 1, 'b': 2}]), row_digest([1, {'b': 2, 'a': 1}]))
+        self.assertNotEqual(row_digest([1, decimal.Decimal('1.50')]), row_digest([1, decimal.Decimal('1.5')]))
+
+
+class MigrateToPostgresTests(TestCase):
+    def setUp(self):
+        business = Business.objects.create(name='Empresa', code='EMP001')
+        category = Category.objects.create(name='Categoria', business=business, code='CAT1')
+        unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        for index in range(3):
+            Product.objects.create(business=business, category=category, name=f'Producto {index}', sku=f'SKU{index}', base_unit=unit)
+
+    def test_checksum_matches_stream_of_same_rows(self):
+        count, checksum = table_checksum(ProductVariant, 'default')
+        columns = [field.attname for field in ProductVariant._meta.concrete_fields]
+        rows = ProductVariant.objects.order_by('pk').values_list(*columns)
+        stream = CopyStream(rows, copy_encoders(ProductVariant))
+        stream.read()
+        self.assertEqual((stream.count, stream.hexdigest()), (count, checksum))
+        self.assertEqual(count, 3)
+
+    def test_permission_ids_are_mapped_by_natural_key(self):
+        UserPermissions = User.user_permissions.through
+        mappings = natural_key_mappings(UserPermissions, 'default')
+        permission = Permission.objects.get(codename='view_product')
+        self.assertEqual(list(mappings), ['permission_id'])
+        self.assertEqual(mappings['permission_id'][permission.pk], permission.pk)
+        self.assertEqual(natural_key_mappings(Product, 'default'), {})
+
+    def test_rejects_non_postgresql_target(self):
+        with self.assertRaises(MigrationError):
+            check_target(backup_models())
+
+    def test_command_errors(self):
+        with self.assertRaises(CommandError):
+            call_command('migrate_to_postgres', source='/no/existe.sqlite3', stdout=StringIO())
@@ -1,6 +1,9 @@
+import threading
+
 import pytest
 from django.urls import reverse
 from rest_framework.test import APIClient
+from core import product_center
 from core.models import Product, ProductVariant, Supplier, PurchaseOrder, SalesOrder, Quotation, AuditLog, Business, Category, Brand, Unit, User
 
 @pytest.mark.django_db
@@ -132,3 +135,67 @@ def test_pc_product_auditlog_view():
     resp = client.get(url)
     assert resp.status_code == 200
     assert isinstance(resp.json(), list)
+
+# En paralelo las secciones leen en otros hilos, con su propia conexión: los datos deben estar confirmados
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_pc_product_overview_view(settings, concurrent):
+    settings.PRODUCT_OVERVIEW_CONCURRENT = concurrent
+    client = APIClient()
+    business = Business.objects.create(name='TestBiz', code='BIZ123')
+    category = Category.objects.create(name='Cat1', code='CAT1', business=business)
+    brand = Brand.objects.create(name='Brand1', code='BR1', business=business)
+    unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza', conversion_factor=1)
+    user = User.objects.create_user(email='testuser@example.com', password='testpass', first_name='Test', last_name='User', business=business)
+    p = Product.objects.create(name='TestProd', sku='TST123', business=business, category=category, brand=brand, base_unit=unit)
+    ProductVariant.objects.create(product=p, sku='VAR1', name='Variante1', cost_price=1, sale_price=2, purchase_price=1, unit=unit)
+    client.force_authenticate(user=user)
+    resp = client.get(reverse('pc_product_overview', args=[p.id]))
+    assert resp.status_code == 200
+    data = resp.json()
+    assert set(data) == {'product', 'variants', 'kardex', 'stock', 'suppliers', 'orders', 'auditlog'}
+    assert data['product']['name'] == 'TestProd'
+    assert data['product'] == client.get(reverse('pc_product_detail', args=[p.id])).json()
+    assert any(var['sku'] == 'VAR1' for var in data['variants'])
+    assert data['kardex'] == {'next_cursor': None, 'results': []}
+    assert 'purchase_orders' in data['orders']
+    # las consultas de las secciones cuentan en las métricas de la petición
+    queries = int(resp['Server-Timing'].split('desc="')[1].split(' queries')[0])
+    assert queries >= len(data)
+
+@pytest.mark.django_db
+def test_pc_product_overview_requires_existing_product_and_auth():
+    client = APIClient()
+    business = Business.objects.create(name='TestBiz', code='BIZ123')
+    user = User.objects.create_user(email='testuser@example.com', password='testpass', first_name='Test', last_name='User', business=business)
+    url = reverse('pc_product_overview', args=[999999])
+    assert client.get(url).status_code == 401
+    client.force_authenticate(user=user)
+    assert client.get(url).status_code == 404
+
+@pytest.mark.django_db(transaction=True)
+def test_pc_product_overview_runs_sections_concurrently(monkeypatch, settings):
+    settings.PRODUCT_OVERVIEW_CONCURRENT = True
+    business = Business.objects.create(name='TestBiz', code='BIZ123')
+    category = Category.objects.create(name='Cat1', code='CAT1', business=business)
+    unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza', conversion_factor=1)
+    user = User.objects.create_user(email='testuser@example.com', password='testpass', first_name='Test', last_name='User', business=business)
+    p = Product.objects.create(name='TestProd', sku='TST123', business=business, category=category, base_unit=unit)
+    # Dos secciones se esperan entre sí: en serie la barrera vencería y la petición fallaría
+    barrier = threading.Barrier(2, timeout=5)
+    threads = set()
+
+    def waiting(section):
+        def run(pk):
+            threads.add(threading.get_ident())
+            barrier.wait()
+            return section(pk)
+        return run
+
+    monkeypatch.setattr(product_center, 'product_variants', waiting(product_center.product_variants))
+    monkeypatch.setattr(product_center, 'product_stock', waiting(product_center.product_stock))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    resp = client.get(reverse('pc_product_overview', args=[p.id]))
+    assert resp.status_code == 200
+    assert len(threads) == 2
@@ -2,10 +2,22 @@ from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.test import override_settings
 from core.models import Product, Category, Brand
 import io
+import shutil
+import tempfile
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(IMPORT_JOBS_EAGER=True, MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class ProductImportTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_superuser(
@@ -45,3 +57,48 @@ class ProductImportTests(APITestCase):
         response = self.client.post(reverse('import-products'), {'file': file, 'business': self.business.id}, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(len(response.data['errors']), 1)
+
+    def post_csv(self, data):
+        file = io.BytesIO(data.encode('utf-8'))
+        file.name = 'productos.csv'
+        return self.client.post(reverse('import-products'), {'file': file, 'business': self.business.id}, format='multipart')
+
+    def test_import_creates_default_variants_and_reports_rows(self):
+        from core.models import ProductVariant, Unit
+        data = (
+            "sku,name,category,brand,base_unit,minimum_stock\n"
+            "SKU010,Producto 10,Categoria 1,Marca 1,Pieza,5\n"
+            "SKU011,Producto 11,Categoria 1,Marca 1,Pieza,x\n"
+            "SKU010,Producto 10 bis,Categoria 1,Marca 1,Pieza,1\n"
+            "SKU012,Producto 12,Categoria 2,Marca 1,,\n"
+        )
+        response = self.post_csv(data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([row['sku'] for row in response.data['created']], ['SKU010', 'SKU012'])
+        self.assertEqual(response.data['errors'], [{'row': 3, 'sku': 'SKU011', 'error': 'minimum_stock debe ser numérico.'}])
+        self.assertEqual([row['row'] for row in response.data['duplicates']], [4])
+        product = Product.objects.get(sku='SKU010')
+        self.assertEqual(product.minimum_stock, 5)
+        self.assertEqual(product.base_unit, Unit.objects.get(name='Pieza'))
+        self.assertIn('categoria 1', product.search_document)
+        self.assertEqual(ProductVariant.objects.get(product=product).sku, 'SKU010')
+
+    def test_import_queries_do_not_grow_with_rows(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.importers import import_products
+        rows = "\n".join(f"BULK{i:04d},Producto {i},Categoria {i % 3},Marca {i % 2},Pieza" for i in range(300))
+        file = io.BytesIO(f"sku,name,category,brand,base_unit\n{rows}".encode('utf-8'))
+        with CaptureQueriesContext(connection) as ctx:
+            result = import_products(file, self.business.id)
+        self.assertEqual(len(result['created']), 300)
+        # Unas pocas consultas por bloque (SQLite parte los INSERT por su límite de parámetros), no por fila
+        self.assertLess(len(ctx.captured_queries), 40)
+
+    def test_invalid_bytes_after_first_chunk_import_nothing(self):
+        from core.importers import ImportFileError, import_products
+        rows = "\n".join(f"SKU{i:03d},Producto {i},Categoria,Marca" for i in range(10))
+        file = io.BytesIO(f"sku,name,category,brand\n{rows}\n".encode('utf-8') + b'SKU999,\xff\xfe,Categoria,Marca\n')
+        with self.assertRaises(ImportFileError):
+            import_products(file, self.business.id, chunk_size=2)
+        self.assertFalse(Product.objects.exists())
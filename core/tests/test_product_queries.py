@@ -0,0 +1,68 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import Business, Category, Brand, Unit, Product, ProductVariant, Warehouse, ProductWarehouseStock
+from core.serializers import ProductSerializer
+
+# Consultas máximas para una página de /api/products/: count + productos + variantes + stock
+PRODUCT_LIST_QUERY_BUDGET = 4
+
+
+class ProductListQueryBudgetTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Categoria', business=self.business, code='CAT1')
+        self.brand = Brand.objects.create(name='Marca', business=self.business, code='BR1')
+        self.unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.warehouse = Warehouse.objects.create(name='Principal', code='ALM1', business=self.business)
+
+    def create_products(self, count, offset=0):
+        for i in range(offset, offset + count):
+            product = Product.objects.create(
+                business=self.business, category=self.category, brand=self.brand,
+                name=f'Producto {i:03d}', sku=f'SKU{i:03d}', base_unit=self.unit
+            )
+            variant = ProductVariant.objects.filter(product=product).first()
+            variant.sale_price = 10 + i
+            variant.save()
+            ProductWarehouseStock.objects.create(product_variant=variant, warehouse=self.warehouse, quantity=5)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('product-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_product_list_query_count_is_constant(self):
+        self.create_products(3)
+        small, _ = self.count_list_queries()
+        self.create_products(20, offset=3)
+        large, response = self.count_list_queries()
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, PRODUCT_LIST_QUERY_BUDGET)
+        self.assertEqual(len(response.data['results']), 23)
+
+    def test_product_list_reads_variants_from_prefetch(self):
+        self.create_products(1)
+        _, response = self.count_list_queries()
+        row = response.data['results'][0]
+        self.assertEqual(row['price'], 10.0)
+        self.assertEqual(row['current_stock'], 5.0)
+        self.assertEqual(len(row['variants']), 1)
+        self.assertEqual(row['variants'][0]['stock'], 5.0)
+
+    def test_detail_serialization_loads_variants_once(self):
+        self.create_products(1)
+        product = Product.objects.select_related('category', 'brand').get()
+        # Sin prefetch previo: una consulta de variantes y una de stock, compartidas por todos los campos
+        with self.assertNumQueries(2):
+            data = ProductSerializer(product).data
+        self.assertEqual(data['current_stock'], 5.0)
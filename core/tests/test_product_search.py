@@ -0,0 +1,52 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import Business, Category, Brand, Unit, Product
+from core.search import normalize_search_text, search_products
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Ferretería', business=business, code='CAT1')
+        brand = Brand.objects.create(name='Truper', business=business, code='BR1')
+        unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        for name, sku in [('Martillo de uña', 'MAR-01'), ('Clavo para martillo', 'CLA-01'), ('Pinzas', 'MART')]:
+            Product.objects.create(business=business, category=self.category, brand=brand, name=name, sku=sku, base_unit=unit)
+
+    def names(self, query):
+        return [p.name for p in search_products(Product.objects.all(), query)]
+
+    def test_document_is_normalized(self):
+        product = Product.objects.get(sku='MAR-01')
+        self.assertEqual(product.search_document, 'martillo de una mar-01 ferreteria truper')
+        self.assertEqual(normalize_search_text('  ÁRBOL   Niño '), 'arbol nino')
+
+    def test_ranked_and_accent_insensitive(self):
+        self.assertEqual(self.names('MARTILLO'), ['Martillo de uña', 'Clavo para martillo'])
+        self.assertEqual(self.names('mart'), ['Pinzas', 'Martillo de uña', 'Clavo para martillo'])
+        self.assertEqual(len(self.names('ferreteria truper')), 3)
+        self.assertEqual(self.names('uña clavo'), [])
+        self.assertEqual(self.names(''), ['Clavo para martillo', 'Martillo de uña', 'Pinzas'])
+
+    def test_category_rename_updates_documents(self):
+        self.category.name = 'Herramientas'
+        self.category.save()
+        self.assertEqual(len(self.names('herramientas')), 3)
+        self.assertEqual(self.names('ferreteria'), [])
+
+    def test_endpoints_share_search(self):
+        expected = ['Martillo de uña', 'Clavo para martillo']
+        response = self.client.get(reverse('pc_product_search'), {'q': 'martillo'})
+        self.assertEqual([row['name'] for row in response.json()], expected)
+        response = self.client.get(reverse('products-search'), {'search': 'martillo'})
+        self.assertEqual([row['name'] for row in response.json()], expected)
+        response = self.client.get(reverse('product-list'), {'search': 'martillo'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['name'] for row in response.json()['results']], expected)
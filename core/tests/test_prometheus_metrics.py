@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from core.models import (
+    Business, Category, Unit, Product, ProductVariant, ProductWarehouseStock, Warehouse, InventoryMovement,
+)
+from core.tasks import send_low_stock_report
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_TOKEN='secreto')
+class PrometheusMetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Categoria', business=self.business, code='CAT1')
+        self.unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.warehouse = Warehouse.objects.create(name='Central', business=self.business, code='ALM1')
+
+    def tearDown(self):
+        cache.clear()
+
+    def scrape(self, authorization='Bearer secreto'):
+        headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+        return APIClient().get(reverse('prometheus-metrics'), **headers)
+
+    def test_requests_are_counted_per_route(self):
+        before = sample('http_requests_total', method='GET', view='product-list', status='200')
+        latency_before = sample('http_request_duration_seconds_count', method='GET', view='product-list')
+        self.client.get(reverse('product-list'))
+        self.client.get(reverse('product-list'))
+        self.assertEqual(sample('http_requests_total', method='GET', view='product-list', status='200'), before + 2)
+        self.assertEqual(sample('http_request_duration_seconds_count', method='GET', view='product-list'), latency_before + 2)
+        self.assertGreater(sample('http_request_db_queries_sum', view='product-list'), 0)
+
+        response = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{method="GET",status="200",view="product-list"}', body)
+        self.assertIn('http_request_duration_seconds_bucket', body)
+
+    def test_unmatched_paths_share_one_label(self):
+        before = sample('http_requests_total', method='GET', view='unmatched', status='404')
+        self.client.get('/no-existe/123/')
+        self.assertEqual(sample('http_requests_total', method='GET', view='unmatched', status='404'), before + 1)
+
+    def test_catalog_cache_hits_and_misses(self):
+        hits = sample('cache_requests_total', cache='catalog', result='hit')
+        misses = sample('cache_requests_total', cache='catalog', result='miss')
+        self.client.get(reverse('category-list'))
+        self.client.get(reverse('category-list'))
+        self.assertEqual(sample('cache_requests_total', cache='catalog', result='miss'), misses + 1)
+        self.assertEqual(sample('cache_requests_total', cache='catalog', result='hit'), hits + 1)
+
+    def test_conditional_revalidations_count_as_hits(self):
+        hits = sample('cache_requests_total', cache='conditional', result='hit')
+        etag = self.client.get(reverse('warehouse-list'))['ETag']
+        self.assertEqual(self.client.get(reverse('warehouse-list'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(sample('cache_requests_total', cache='conditional', result='hit'), hits + 1)
+
+    def test_celery_task_duration(self):
+        task = send_low_stock_report.name
+        before = sample('celery_task_duration_seconds_count', task=task, state='SUCCESS')
+        send_low_stock_report.apply()
+        self.assertEqual(sample('celery_task_duration_seconds_count', task=task, state='SUCCESS'), before + 1)
+
+    def test_domain_gauges(self):
+        product = Product.objects.create(
+            business=self.business, category=self.category, name='Producto', sku='SKU1', base_unit=self.unit
+        )
+        variant = ProductVariant.objects.get(product=product)
+        other = Warehouse.objects.create(name='Sucursal', business=self.business, code='ALM2')
+        ProductWarehouseStock.objects.create(product_variant=variant, warehouse=self.warehouse, quantity=-3)
+        ProductWarehouseStock.objects.create(product_variant=variant, warehouse=other, quantity=-1)
+        InventoryMovement.objects.create(warehouse=self.warehouse, user=self.user, movement_type='IN')
+        InventoryMovement.objects.create(warehouse=self.warehouse, user=self.user, movement_type='IN', authorized=True)
+        InventoryMovement.objects.create(warehouse=self.warehouse, user=self.user, movement_type='IN', is_cancelled=True)
+
+        body = self.scrape().content.decode()
+        self.assertIn('inventory_movements_pending_authorization 1.0', body)
+        self.assertIn('inventory_negative_stock_variants 1.0', body)
+
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.scrape(authorization=None).status_code, 401)
+        self.assertEqual(self.scrape('Bearer otro').status_code, 401)
+        self.assertEqual(self.scrape('Bearer secreto').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_disabled_without_token_outside_debug(self):
+        self.assertEqual(self.scrape(authorization=None).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_open_without_token_in_debug(self):
+        self.assertEqual(self.scrape(authorization=None).status_code, 200)
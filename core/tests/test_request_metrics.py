@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from core.middleware import RequestMetricsMiddleware
+from core.models import Product
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+
+    def client_for(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        return client
+
+    def log_entries(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('core.requests', level='INFO') as logs:
+            response = self.client_for().get(reverse('product-list'))
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'render;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        entry = self.log_entries(logs)[-1]
+        self.assertEqual(entry['view'], 'product-list')
+        self.assertEqual(entry['status'], 200)
+        self.assertGreater(entry['queries'], 0)
+        self.assertEqual(entry['bytes'], len(response.content))
+        self.assertEqual(entry['over_budget'], [])
+
+    @override_settings(REQUEST_METRICS={'QUERY_BUDGET': 0, 'TIMING_ALLOW_ORIGIN': '*'})
+    def test_over_budget_requests_are_warnings(self):
+        with self.assertLogs('core.requests', level='WARNING') as logs:
+            response = self.client_for().get(reverse('product-list'))
+        self.assertEqual(logs.records[-1].levelname, 'WARNING')
+        self.assertIn('queries', self.log_entries(logs)[-1]['over_budget'])
+        self.assertEqual(response['Timing-Allow-Origin'], '*')
+
+    def test_repeated_statements_are_counted(self):
+        def view(request):
+            for pk in range(3):
+                list(Product.objects.filter(pk=pk))
+            return HttpResponse('ok')
+
+        with self.assertLogs('core.requests', level='INFO') as logs:
+            response = RequestMetricsMiddleware(view)(RequestFactory().get('/n-mas-uno/'))
+        entry = self.log_entries(logs)[-1]
+        self.assertEqual(entry['queries'], 3)
+        self.assertEqual(entry['duplicate_queries'], 2)
+        self.assertIn('desc="3 queries, 2 repeated"', response['Server-Timing'])
+
+    async def test_async_views_are_measured_without_a_thread(self):
+        def count(pk):
+            return Product.objects.filter(pk=pk).count()
+
+        async def view(request):
+            await asyncio.gather(*(sync_to_async(count)(pk) for pk in range(3)))
+            return HttpResponse('ok')
+
+        middleware = RequestMetricsMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        with self.assertLogs('core.requests', level='INFO') as logs:
+            response = await middleware(RequestFactory().get('/resumen/'))
+        self.assertEqual(self.log_entries(logs)[-1]['queries'], 3)
+        self.assertIn('desc="3 queries, 2 repeated"', response['Server-Timing'])
+
+    @override_settings(REQUEST_METRICS={'ENABLED': False})
+    def test_can_be_disabled(self):
+        response = self.client_for().get(reverse('product-list'))
+        self.assertNotIn('Server-Timing', response)
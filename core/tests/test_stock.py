@@ -0,0 +1,86 @@
+from io import StringIO
+from django.test import SimpleTestCase
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from core.models import (
+    Business, Category, Brand, Unit, Product, ProductVariant, Warehouse, ProductWarehouseStock,
+    InventoryMovement, InventoryMovementDetail
+)
+from core.stock import is_inbound, signed_quantity, rebuild_stock
+
+
+class SignedQuantityTests(SimpleTestCase):
+    def test_inbound_and_outbound_types(self):
+        self.assertTrue(is_inbound('IN', 5))
+        self.assertTrue(is_inbound('Entrada', 5))
+        self.assertFalse(is_inbound('OUT', 5))
+        self.assertFalse(is_inbound('EGRESO', 5))
+        self.assertEqual(signed_quantity('ADJUSTMENT', -3), -3)
+        self.assertEqual(signed_quantity('ADJUSTMENT', 3), 3)
+
+    def test_reversal_inverts_direction(self):
+        self.assertEqual(signed_quantity('CANCELACION_IN', 4), -4)
+        self.assertEqual(signed_quantity('CANCELACION_OUT', 4), 4)
+        self.assertEqual(signed_quantity('CANCELACION_ADJUSTMENT', 4), -4)
+
+
+class StockLedgerTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.creator = User.objects.create_user(email='creador@test.com', password='x', first_name='C', last_name='U')
+        self.authorizer = User.objects.create_superuser(email='admin@test.com', password='x', first_name='A', last_name='U')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.authorizer)
+        business = Business.objects.create(name='Empresa', code='EMP001')
+        category = Category.objects.create(name='Categoria', business=business, code='CAT1')
+        brand = Brand.objects.create(name='Marca', business=business, code='BR1')
+        unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        product = Product.objects.create(business=business, category=category, brand=brand, name='Prod', sku='SKU1', base_unit=unit)
+        self.variant = ProductVariant.objects.get(product=product)
+        self.warehouse = Warehouse.objects.create(name='Principal', code='ALM1', business=business)
+
+    def create_movement(self, movement_type, quantity):
+        movement = InventoryMovement.objects.create(warehouse=self.warehouse, user=self.creator, movement_type=movement_type)
+        InventoryMovementDetail.objects.create(movement=movement, product_variant=self.variant, quantity=quantity)
+        return movement
+
+    def stock(self):
+        return ProductWarehouseStock.objects.get(product_variant=self.variant, warehouse=self.warehouse).quantity
+
+    def authorize(self, movement):
+        url = reverse('inventorymovement-authorize', args=[movement.id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_authorize_applies_deltas(self):
+        self.authorize(self.create_movement('IN', 10))
+        self.assertEqual(self.stock(), 10)
+        self.authorize(self.create_movement('OUT', 4))
+        self.assertEqual(self.stock(), 6)
+
+    def test_unauthorized_movement_does_not_touch_stock(self):
+        self.create_movement('IN', 10)
+        self.assertFalse(ProductWarehouseStock.objects.exists())
+
+    def test_cancel_reverts_stock(self):
+        movement = self.create_movement('IN', 10)
+        self.authorize(movement)
+        url = reverse('inventorymovement-cancel-movement', args=[movement.id])
+        response = self.client.post(url, {'reason': 'Error de captura'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.stock(), 0)
+        reverse_movement = InventoryMovement.objects.get(original_movement=movement)
+        self.assertEqual(reverse_movement.details.count(), 1)
+
+    def test_rebuild_matches_incremental_stock(self):
+        self.authorize(self.create_movement('IN', 10))
+        self.authorize(self.create_movement('OUT', 3))
+        self.create_movement('IN', 100)  # sin autorizar
+        ProductWarehouseStock.objects.update(quantity=999)
+        out = StringIO()
+        call_command('rebuild_stock', stdout=out)
+        self.assertEqual(self.stock(), 7)
+        self.assertEqual(rebuild_stock(), (0, 0, 0))
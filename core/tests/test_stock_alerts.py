@@ -0,0 +1,116 @@
+import json
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from core.alerts import EmailChannel, WebhookChannel, scan_stock_alerts
+from core.models import Business, Category, Unit, Product, ProductVariant, ProductWarehouseStock, Warehouse, StockAlert
+from core.tasks import send_low_stock_report
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.batches = []
+
+    def send(self, events):
+        self.batches.append([(event.kind, event.alert.level, event.alert.product_variant.sku) for event in events])
+
+
+class FailingChannel:
+    def send(self, events):
+        raise ConnectionError('sin red')
+
+
+class StockAlertEngineTests(TestCase):
+    def setUp(self):
+        self.business = Business.objects.create(name='Empresa', code='EMP001')
+        self.category = Category.objects.create(name='Categoria', business=self.business, code='CAT1')
+        self.unit = Unit.objects.create(name='Unidad', symbol='U', unit_type='pieza')
+        self.warehouse = Warehouse.objects.create(name='Central', business=self.business, code='ALM1')
+        self.variants = []
+        for index in range(3):
+            product = Product.objects.create(
+                business=self.business, category=self.category, name=f'Producto {index}', sku=f'SKU{index}',
+                base_unit=self.unit, minimum_stock=5 if index == 2 else 0,
+            )
+            self.variants.append(ProductVariant.objects.get(product=product))
+        self.variants[0].low_stock_threshold = 10
+        self.variants[0].save()
+        self.stocks = [
+            ProductWarehouseStock.objects.create(product_variant=self.variants[0], warehouse=self.warehouse, quantity=8),
+            ProductWarehouseStock.objects.create(product_variant=self.variants[1], warehouse=self.warehouse, quantity=7, min_stock=3),
+            ProductWarehouseStock.objects.create(product_variant=self.variants[2], warehouse=self.warehouse, quantity=0),
+        ]
+        self.channel = RecordingChannel()
+
+    def scan(self):
+        return scan_stock_alerts(channels=[self.channel])
+
+    def set_quantity(self, index, quantity):
+        self.stocks[index].quantity = quantity
+        self.stocks[index].save()
+
+    def test_opens_alerts_against_every_threshold(self):
+        self.assertEqual(self.scan(), {'opened': 2, 'resolved': 0})
+        active = dict(StockAlert.objects.filter(status='ACTIVE').values_list('product_variant__sku', 'level'))
+        self.assertEqual(active, {self.variants[0].sku: 'LOW', self.variants[2].sku: 'OUT'})
+        alert = StockAlert.objects.get(product_variant=self.variants[0])
+        self.assertEqual((alert.quantity, alert.threshold), (8, 10))
+        self.assertIsNotNone(alert.notified_at)
+
+    def test_only_transitions_are_written_and_notified(self):
+        self.scan()
+        with self.assertNumQueries(5):  # almacenes, niveles y alertas activas (+ SAVEPOINT/RELEASE)
+            self.assertEqual(self.scan(), {'opened': 0, 'resolved': 0})
+        self.assertEqual(len(self.channel.batches), 1)
+
+        self.set_quantity(0, 0)   # LOW -> OUT
+        self.set_quantity(1, 2)   # normal -> LOW (mínimo del almacén)
+        self.set_quantity(2, 20)  # OUT -> normal
+        self.assertEqual(self.scan(), {'opened': 2, 'resolved': 2})
+        self.assertEqual(sorted(self.channel.batches[-1]), sorted([
+            ('resolved', 'LOW', self.variants[0].sku),
+            ('resolved', 'OUT', self.variants[2].sku),
+            ('opened', 'OUT', self.variants[0].sku),
+            ('opened', 'LOW', self.variants[1].sku),
+        ]))
+        self.assertEqual(StockAlert.objects.filter(status='ACTIVE').count(), 2)
+        self.assertEqual(StockAlert.objects.filter(status='RESOLVED').exclude(resolved_at=None).count(), 2)
+
+    def test_failed_channel_keeps_alerts_unnotified(self):
+        with self.assertLogs('core.alerts', level='ERROR'):
+            result = scan_stock_alerts(channels=[FailingChannel(), self.channel])
+        self.assertEqual(result['opened'], 2)
+        self.assertEqual(len(self.channel.batches), 1)
+        self.assertFalse(StockAlert.objects.exclude(notified_at=None).exists())
+
+    @override_settings(STOCK_ALERT_EMAILS=['compras@test.com'])
+    def test_email_channel(self):
+        scan_stock_alerts(channels=[EmailChannel()])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Alertas de stock: 2 nuevas, 0 resueltas')
+        self.assertIn(self.variants[2].sku, mail.outbox[0].body)
+
+    @override_settings(STOCK_ALERT_WEBHOOK_URL='https://hooks.test/stock')
+    def test_webhook_channel(self):
+        with mock.patch('core.alerts.urllib.request.urlopen') as urlopen:
+            scan_stock_alerts(channels=[WebhookChannel()])
+        request = urlopen.call_args.args[0]
+        self.assertEqual(request.full_url, 'https://hooks.test/stock')
+        events = json.loads(request.data)['events']
+        self.assertEqual({event['level'] for event in events}, {'LOW', 'OUT'})
+
+    @override_settings(STOCK_ALERT_CHANNELS=['core.alerts.DatabaseChannel'])
+    def test_task_and_api(self):
+        self.assertEqual(send_low_stock_report.apply().get(), {'opened': 2, 'resolved': 0})
+        user = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='admin123', first_name='Admin', last_name='User'
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        data = client.get(reverse('stockalert-list'), {'level': 'out'}).json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['sku'], self.variants[2].sku)
@@ -13,6 +13,7 @@ from .views import (
     PCProductSuppliersView,
     PCProductOrdersView,
     PCProductAuditLogView,
+    PCProductOverviewView,
 )
 
 from .views import (
@@ -22,8 +23,8 @@ from .views import (
     PurchaseOrderItemViewSet, PurchaseOrderReceiptViewSet, PurchaseOrderReceiptItemViewSet,
     ExchangeRateViewSet, CustomerTypeViewSet, CustomerViewSet, SalesOrderViewSet, SalesOrderItemViewSet,
     QuotationViewSet, QuotationItemViewSet, RoleViewSet, MenuOptionViewSet,
-    ProductImportView, BrandImportView,
-    AuditLogViewSet, CurrentInventoryView, user_menu_options,
+    ProductImportView, BrandImportView, ImportJobViewSet,
+    AuditLogViewSet, CurrentInventoryView, DashboardSummaryView, StockAlertViewSet, user_menu_options,
     WarehouseListView, InventoryMovementViewSet, InventoryMovementDetailViewSet, CustomerPaymentViewSet, SupplierPaymentViewSet,
     UserProfileView
 )
@@ -74,6 +75,8 @@ router.register(r'sales', SaleViewSet)
 router.register(r'sale-payments', SalePaymentViewSet)
 router.register(r'customer-payments', CustomerPaymentViewSet)
 router.register(r'supplier-payments', SupplierPaymentViewSet)
+router.register(r'import-jobs', ImportJobViewSet, basename='importjob')
+router.register(r'stock-alerts', StockAlertViewSet, basename='stockalert')
 
 urlpatterns = [
     # Endpoints nuevos para Product Center
@@ -85,6 +88,7 @@ urlpatterns = [
     path('pc/products/<int:pk>/suppliers/', PCProductSuppliersView.as_view(), name='pc_product_suppliers'),
     path('pc/products/<int:pk>/orders/', PCProductOrdersView.as_view(), name='pc_product_orders'),
     path('pc/products/<int:pk>/auditlog/', PCProductAuditLogView.as_view(), name='pc_product_auditlog'),
+    path('pc/products/<int:pk>/overview/', PCProductOverviewView.as_view(), name='pc_product_overview'),
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('test-token/', lambda request: JsonResponse({'message': 'Token endpoint test working'}), name='test_token'),
@@ -103,6 +107,7 @@ urlpatterns = [
     # path('authorize-inventory-movement/', AuthorizeInventoryMovementView.as_view(), name='authorize-inventory-movement'),
     # path('cancel-movement/<int:movement_id>/', CancelMovementView.as_view(), name='cancel-movement'),
     path('current-inventory/', CurrentInventoryView.as_view(), name='current-inventory'),
+    path('dashboard/summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
     path('user-menu-options/', user_menu_options, name='user-menu-options'),
     path('products/<int:pk>/kardex/', ProductKardexView.as_view(), name='product-kardex'),
     # Endpoint de perfil de usuario
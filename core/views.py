@@ -5,6 +5,14 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
+from .kardex import kardex_from_request, kardex_response_data
+from .search import search_products
+from .product_center import (
+    aget_product, product_auditlog, product_detail, product_kardex, product_orders, product_overview,
+    product_stock, product_suppliers, product_variants, search_results,
+)
 
 # Vista para el perfil de usuario
 class UserProfileView(APIView):
@@ -21,120 +29,62 @@ class UserProfileView(APIView):
         }
         return Response(data)
 
+# Product Center: vistas asíncronas (ver core/product_center.py)
 # 1. Búsqueda avanzada de productos
-class PCProductSearchView(APIView):
+class PCProductSearchView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request):
-        q = request.GET.get('q', '')
-        products = Product.objects.filter(
-            Q(name__icontains=q) |
-            Q(sku__icontains=q) |
-            Q(barcode__icontains=q) |
-            Q(category__name__icontains=q) |
-            Q(brand__name__icontains=q) |
-            Q(description__icontains=q)
-        ).order_by('name')[:50]
-        data = [
-            {
-                'id': p.id,
-                'name': p.name,
-                'sku': p.sku,
-                'category': p.category.name if p.category else '',
-                'brand': p.brand.name if p.brand else '',
-                'image_url': p.image_url,
-                'is_active': p.is_active,
-                'status': p.status,
-            } for p in products
-        ]
-        return Response(data)
+    async def get(self, request):
+        return Response(await sync_to_async(search_results)(request.GET.get('q', '')))
 
 # 2. Detalles completos del producto
-class PCProductDetailView(APIView):
+class PCProductDetailView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request, pk):
-        product = get_object_or_404(Product, pk=pk)
-        serializer = ProductSerializer(product)
-        return Response(serializer.data)
+    async def get(self, request, pk):
+        product = await aget_product(pk)
+        return Response(await sync_to_async(product_detail)(product))
 
 # 3. Variantes del producto
-class PCProductVariantsView(APIView):
+class PCProductVariantsView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request, pk):
-        variants = ProductVariant.objects.filter(product_id=pk)
-        serializer = ProductVariantSerializer(variants, many=True)
-        return Response(serializer.data)
+    async def get(self, request, pk):
+        return Response(await sync_to_async(product_variants)(pk))
 
 # 4. Kardex y movimientos
-class PCProductKardexView(APIView):
+class PCProductKardexView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request, pk):
-        product = get_object_or_404(Product, pk=pk)
-        variants = ProductVariant.objects.filter(product=product)
-        variant_ids = list(variants.values_list('id', flat=True))
-        movements = InventoryMovement.objects.filter(details__product_variant__product_id=product.id).distinct().order_by('created_at')
-        balance = 0
-        kardex = []
-        for mov in movements:
-            details = mov.details.filter(product_variant__product_id=product.id)
-            for detail in details:
-                quantity = detail.quantity or 0
-                movement_type = mov.movement_type
-                is_inbound = movement_type in ['IN', 'PURCHASE'] or (movement_type == 'ADJUSTMENT' and quantity > 0)
-                if is_inbound:
-                    balance += abs(quantity)
-                else:
-                    balance -= abs(quantity)
-                kardex.append({
-                    'date': str(mov.created_at),
-                    'movement_type': movement_type,
-                    'quantity_in': abs(quantity) if is_inbound else None,
-                    'quantity_out': abs(quantity) if not is_inbound else None,
-                    'balance': balance,
-                    'unit_cost': detail.unit_cost if hasattr(detail, 'unit_cost') else 0,
-                    'total_value': balance * (detail.unit_cost if hasattr(detail, 'unit_cost') else 0),
-                    'reference': mov.reference_document or mov.id,
-                    'warehouse': mov.warehouse.name if hasattr(mov, 'warehouse') and mov.warehouse else None,
-                    'user': mov.user.email if hasattr(mov, 'user') and mov.user else None,
-                    'notes': getattr(mov, 'notes', None)
-                })
-        return Response(kardex)
+    async def get(self, request, pk):
+        product = await aget_product(pk)
+        return Response(await sync_to_async(product_kardex)(request, product.id))
 
 # 5. Stock en almacenes
-class PCProductStockView(APIView):
+class PCProductStockView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request, pk):
-        stocks = ProductWarehouseStock.objects.filter(product_variant__product_id=pk)
-        serializer = ProductWarehouseStockSerializer(stocks, many=True)
-        return Response(serializer.data)
+    async def get(self, request, pk):
+        return Response(await sync_to_async(product_stock)(pk))
 
 # 6. Proveedores relacionados
-class PCProductSuppliersView(APIView):
+class PCProductSuppliersView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request, pk):
-        suppliers = Supplier.objects.filter(supplierproduct__product_variant__product_id=pk).distinct()
-        serializer = SupplierSerializer(suppliers, many=True)
-        return Response(serializer.data)
+    async def get(self, request, pk):
+        return Response(await sync_to_async(product_suppliers)(pk))
 
 # 7. Órdenes de compra/venta/cotizaciones
-class PCProductOrdersView(APIView):
+class PCProductOrdersView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request, pk):
-        purchase_orders = PurchaseOrder.objects.filter(purchaseorderitem__product_variant__product_id=pk).distinct()
-        sales_orders = SalesOrder.objects.filter(items__product_variant__product_id=pk).distinct()
-        quotations = Quotation.objects.filter(details__product__id=pk).distinct()
-        return Response({
-            'purchase_orders': PurchaseOrderSerializer(purchase_orders, many=True).data,
-            'sales_orders': SalesOrderSerializer(sales_orders, many=True).data,
-            'quotations': QuotationSerializer(quotations, many=True).data,
-        })
+    async def get(self, request, pk):
+        return Response(await sync_to_async(product_orders)(pk))
 
 # 8. Auditoría y log
-class PCProductAuditLogView(APIView):
+class PCProductAuditLogView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request, pk):
-        logs = AuditLog.objects.filter(object_id=str(pk), model='Product').order_by('-timestamp')
-        serializer = AuditLogSerializer(logs, many=True)
-        return Response(serializer.data)
+    async def get(self, request, pk):
+        return Response(await sync_to_async(product_auditlog)(pk))
+
+# 9. Resumen: todas las secciones anteriores (salvo la búsqueda) en una sola petición
+class PCProductOverviewView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    async def get(self, request, pk):
+        return Response(await product_overview(request, pk))
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import CustomTokenObtainPairSerializer
 
@@ -185,53 +135,42 @@ class IsStaffOrReadOnly(IsAuthenticated):
             return super().has_permission(request, view)
         return super().has_permission(request, view) and (request.user.is_staff or request.user.is_superuser)
 
+def start_import_job(request, kind):
+    """
+    Guarda el archivo como ImportJob. Con IMPORT_JOBS_EAGER (por defecto) lo procesa en la
+    misma petición y responde 201 con el resultado; si no, lo encola en Celery (202 con el trabajo).
+    """
+    from django.conf import settings
+    from .importers import run_import_job
+    from .models import Business, ImportJob
+    from .serializers import ImportJobSerializer
+    from .tasks import process_import_job
+    file = request.FILES.get('file')
+    if not file:
+        return Response({'error': 'No se recibió archivo.'}, status=status.HTTP_400_BAD_REQUEST)
+    business_id = request.data.get('business') or request.user.business_id
+    if not business_id:
+        return Response({'error': 'No se especificó empresa (business).'}, status=status.HTTP_400_BAD_REQUEST)
+    if not Business.objects.filter(id=business_id).exists():
+        return Response({'error': 'La empresa (business) no existe.'}, status=status.HTTP_400_BAD_REQUEST)
+    job = ImportJob.objects.create(
+        kind=kind, business_id=business_id, user=request.user, file=file, original_name=file.name
+    )
+    if settings.IMPORT_JOBS_EAGER:
+        result = run_import_job(job)
+        if result is None:
+            return Response({'error': job.message, 'job': ImportJobSerializer(job).data}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**result, 'job': ImportJobSerializer(job).data}, status=status.HTTP_201_CREATED)
+    transaction.on_commit(lambda: process_import_job.delay(job.id))
+    return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
 # --- Importador de Productos ---
-# CSV: sku,name,category,brand,base_unit,description,minimum_stock,maximum_stock,image_url
+# CSV: sku,name,category,brand[,base_unit,description,minimum_stock,maximum_stock,image_url,barcode]
 class ProductImportView(APIView):
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [IsStaffOrReadOnly]
     def post(self, request):
-        file = request.FILES.get('file')
-        if not file:
-            return Response({'error': 'No se recibió archivo.'}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            decoded = file.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(decoded)
-        except Exception:
-            return Response({'error': 'Archivo inválido o formato incorrecto.'}, status=status.HTTP_400_BAD_REQUEST)
-        created, errors, duplicates = [], [], []
-        business_id = request.data.get('business') or request.user.business_id
-        if not business_id:
-            return Response({'error': 'No se especificó empresa (business).'}, status=status.HTTP_400_BAD_REQUEST)
-        with transaction.atomic():
-            for row in reader:
-                sku = row.get('sku')
-                name = row.get('name')
-                category_name = row.get('category')
-                brand_name = row.get('brand')
-                base_unit_name = row.get('base_unit')
-                description = row.get('description', '')
-                minimum_stock = row.get('minimum_stock', 0)
-                maximum_stock = row.get('maximum_stock', 0)
-                image_url = row.get('image_url', '')
-                if not (sku and name and category_name and brand_name and base_unit_name):
-                    errors.append({'sku': sku, 'error': 'Faltan campos requeridos.'})
-                    continue
-                if Product.objects.filter(sku=sku).exists():
-                    duplicates.append({'sku': sku, 'error': 'SKU duplicado.'})
-                    continue
-                from .models import Category, Brand, Unit, Business, Product
-                category, _ = Category.objects.get_or_create(name=category_name, business_id=business_id)
-                brand, _ = Brand.objects.get_or_create(name=brand_name, business_id=business_id)
-                base_unit, _ = Unit.objects.get_or_create(name=base_unit_name, business_id=business_id)
-                business = Business.objects.get(id=business_id)
-                product = Product.objects.create(
-                    sku=sku, name=name, category=category, brand=brand, base_unit=base_unit,
-                    description=description, minimum_stock=minimum_stock, maximum_stock=maximum_stock,
-                    image_url=image_url, business=business
-                )
-                created.append({'sku': sku, 'name': name, 'id': product.id})
-        return Response({'created': created, 'errors': errors, 'duplicates': duplicates}, status=status.HTTP_201_CREATED)
+        return start_import_job(request, 'PRODUCTS')
 
 # --- Importador de Marcas ---
 # CSV: name,code,description,country
@@ -239,35 +178,23 @@ class BrandImportView(APIView):
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [IsStaffOrReadOnly]
     def post(self, request):
-        file = request.FILES.get('file')
-        if not file:
-            return Response({'error': 'No se recibió archivo.'}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            decoded = file.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(decoded)
-        except Exception:
-            return Response({'error': 'Archivo inválido o formato incorrecto.'}, status=status.HTTP_400_BAD_REQUEST)
-        created, errors, duplicates = [], [], []
-        business_id = request.data.get('business') or request.user.business_id
-        if not business_id:
-            return Response({'error': 'No se especificó empresa (business).'}, status=status.HTTP_400_BAD_REQUEST)
-        from .models import Brand, Business
-        with transaction.atomic():
-            for row in reader:
-                name = row.get('name')
-                code = row.get('code', '')
-                country = row.get('country', '')
-                description = row.get('description', '')
-                if not name:
-                    errors.append({'name': name, 'error': 'Falta nombre.'})
-                    continue
-                if Brand.objects.filter(name=name, business_id=business_id).exists():
-                    duplicates.append({'name': name, 'error': 'Marca duplicada.'})
-                    continue
-                business = Business.objects.get(id=business_id)
-                brand = Brand.objects.create(name=name, description=description, business=business)
-                created.append({'name': name, 'id': brand.id})
-        return Response({'created': created, 'errors': errors, 'duplicates': duplicates}, status=status.HTTP_201_CREATED)
+        return start_import_job(request, 'BRANDS')
+
+# --- Avance de importaciones ---
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """GET /api/import-jobs/<id>/ para consultar avance, contadores y errores"""
+    permission_classes = [IsAuthenticated]
+
+    def get_serializer_class(self):
+        from .serializers import ImportJobSerializer
+        return ImportJobSerializer
+
+    def get_queryset(self):
+        from .models import ImportJob
+        queryset = ImportJob.objects.all()
+        if not (self.request.user.is_staff or self.request.user.is_superuser):
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
 
 # Resto del archivo se mantiene igual...
 # Aquí iría el resto de las vistas que NO están relacionadas con InventoryMovement
@@ -292,56 +219,9 @@ from rest_framework.views import APIView
 class ProductKardexView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, pk):
-        try:
-            product = get_object_or_404(Product, pk=pk)
-            variants = ProductVariant.objects.filter(product=product)
-            variant_ids = list(variants.values_list('id', flat=True))
-
-            # Obtener movimientos ligados al producto y variantes
-            movements = InventoryMovement.objects.filter(details__product_id=product.id).distinct()
-            if variant_ids:
-                movements = movements | InventoryMovement.objects.filter(details__product_variant_id__in=variant_ids).distinct()
-            movements = movements.order_by('created_at')
-
-            balance = 0
-            kardex = []
-            for mov in movements:
-                # Buscar el detalle correcto
-                detail = mov.details.filter(product_variant__product_id=product.id).first()
-                quantity = None
-                if detail:
-                    quantity = detail.quantity
-                else:
-                    # Si no hay detalle, usar el primer detalle disponible
-                    detail = mov.details.first()
-                    quantity = detail.quantity if detail else 0
-
-                # Si no hay cantidad, poner 0
-                if quantity is None:
-                    quantity = 0
-
-                movement_type = getattr(mov, 'movement_type', 'UNKNOWN')
-                is_inbound = movement_type in ['IN', 'PURCHASE'] or (movement_type == 'ADJUSTMENT' and quantity > 0)
-                if is_inbound:
-                    balance += abs(quantity)
-                else:
-                    balance -= abs(quantity)
-                kardex.append({
-                    'date': str(mov.created_at),
-                    'description': movement_type,
-                    'movement_type': movement_type,
-                    'quantity_in': abs(quantity) if is_inbound else None,
-                    'quantity_out': abs(quantity) if not is_inbound else None,
-                    'balance': balance,
-                    'unit_cost': getattr(detail, 'unit_cost', 0) if detail else 0,
-                    'total_value': balance * (getattr(detail, 'unit_cost', 0) if detail else 0),
-                    'reference': getattr(mov, 'reference', None) or mov.id
-                })
-            return Response(kardex)
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return Response({'error': 'Error interno en el kardex', 'detail': str(e)}, status=500)
+        product = get_object_or_404(Product, pk=pk)
+        page = kardex_from_request(request, product.id)
+        return Response(kardex_response_data(request, page))
 
 # Permiso para importadores y vistas de edición
 class IsStaffOrReadOnly(IsAuthenticated):
@@ -361,58 +241,78 @@ class MenuOptionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsStaffOrReadOnly]
 
 # ViewSets principales
-class UserViewSet(viewsets.ModelViewSet):
+from .cache import CachedCatalogMixin, cached_response
+from .conditional import ConditionalRequestMixin
+
+class UserViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (Role, MenuOption)  # el rol y sus opciones de menú van anidados
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
-class BusinessViewSet(viewsets.ModelViewSet):
+class BusinessViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     queryset = Business.objects.all()
     serializer_class = BusinessSerializer
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
-class BrandViewSet(viewsets.ModelViewSet):
+class BrandViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
 
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     queryset = Unit.objects.all()
     serializer_class = UnitSerializer
 
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
+from django.db.models import Prefetch, Q
+from .pagination import KeysetPagination, csv_response, ndjson_response, wants_ndjson
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 200
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (ProductVariant, ProductWarehouseStock, Category, Brand)
+    def _catalog_response(self, request, queryset, to_row):
+        """
+        Catálogo completo en tres modos: NDJSON en streaming (?stream=ndjson),
+        páginas keyset por (name, id) (?page_size= / ?cursor=) o la lista completa de siempre.
+        """
+        if wants_ndjson(request):
+            return ndjson_response(queryset.order_by('name', 'id'), to_row)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response([to_row(p) for p in page])
+        return Response([to_row(p) for p in queryset.order_by('name', 'id')])
+
     @action(detail=False, methods=['get'])
     def show_all(self, request):
         """
-        Endpoint para devolver todos los productos con filtros y variantes, sin paginación.
-        Filtros: name, sku, category, brand
+        Endpoint para devolver todos los productos con filtros y variantes.
+        Filtros: name, sku, category, brand. Admite paginación keyset y stream=ndjson.
         """
         name = request.query_params.get('name', '').strip()
         sku = request.query_params.get('sku', '').strip()
         category = request.query_params.get('category', '').strip()
         brand = request.query_params.get('brand', '').strip()
-        queryset = Product.objects.select_related('category', 'brand').all()
+        queryset = Product.objects.select_related('category', 'brand').prefetch_related(
+            Prefetch('productvariant_set', queryset=ProductVariant.objects.order_by('id'))
+        )
         if name:
             queryset = queryset.filter(name__icontains=name)
         if sku:
-            queryset = queryset.filter(Q(sku__icontains=sku) | Q(barcode__icontains=sku) | Q(code__icontains=sku))
+            queryset = queryset.filter(Q(sku__icontains=sku) | Q(barcode__icontains=sku))
         if category:
             queryset = queryset.filter(category_id=category)
         if brand:
             queryset = queryset.filter(brand_id=brand)
-        queryset = queryset.order_by('name')
         from .serializers_product_search import ProductWithMainVariantSerializer
-        serializer = ProductWithMainVariantSerializer(queryset, many=True)
-        return Response(serializer.data)
+        serializer = ProductWithMainVariantSerializer(context=self.get_serializer_context())
+        return self._catalog_response(request, queryset, serializer.to_representation)
     queryset = Product.objects.select_related('category', 'brand').all()
     serializer_class = ProductSerializer
     pagination_class = CustomPageNumberPagination
@@ -420,66 +320,77 @@ class ProductViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = super().get_queryset()
         search = self.request.query_params.get('search', None)
-        # Solo aplicar filtro si search no es None y no está vacío o solo espacios
-        if search and search.strip():
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(sku__icontains=search) |
-                Q(code__icontains=search) |
-                Q(brand__name__icontains=search)
-            ).distinct()
-        return queryset.order_by('name')
-    
+        # Con búsqueda se ordena por relevancia; sin ella, por nombre
+        queryset = search_products(queryset, search or '')
+        # Variantes y stock se precargan una sola vez para toda la página
+        return ProductSerializer.setup_eager_loading(queryset)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Autocompletado por prefijo/n-grama desde el índice en memoria del worker (sin consultas por tecla).
+        Parámetros: q, limit (por defecto 10, máximo 50).
+        """
+        from .autocomplete import DEFAULT_LIMIT, MAX_LIMIT, product_index
+        try:
+            limit = min(int(request.query_params.get('limit') or DEFAULT_LIMIT), MAX_LIMIT)
+        except ValueError:
+            return Response({'limit': 'Debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(product_index.search(request.query_params.get('q', ''), max(limit, 1)))
+
     @action(detail=False, methods=['get'])
     def search_all(self, request):
         """
-        Endpoint para búsqueda sin paginación - devuelve TODOS los productos ordenados por nombre
+        Endpoint para búsqueda sin paginación - devuelve TODOS los productos ordenados por nombre.
+        Admite paginación keyset (page_size, cursor) y stream=ndjson.
         """
-        queryset = Product.objects.select_related('category', 'brand').all().order_by('name')
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = ProductSerializer.setup_eager_loading(Product.objects.all())
+        serializer = self.get_serializer()
+        return self._catalog_response(request, queryset, serializer.to_representation)
 
     @action(detail=False, methods=['get'])
     def simple_list(self, request):
         """
-        Endpoint simple: devuelve id, nombre, categoria, marca y estado de todos los productos sin paginación ni filtros
+        Endpoint simple: devuelve id, nombre, categoria, marca, estado y variantes de todos los productos.
+        Admite paginación keyset (page_size, cursor) y stream=ndjson.
         """
-        products = Product.objects.select_related('category', 'brand').all().order_by('name')
-        from .serializers import ProductVariantSerializer
-        data = [
-                {
-                    'id': p.id,
-                    'name': p.name,
-                    'category': p.category.name if p.category else None,
-                    'brand': p.brand.name if p.brand else None,
-                    'status': p.status,
-                    'variants': ProductVariantSerializer(p.productvariant_set.all(), many=True).data
-                }
-                for p in products
-            ]
-        return Response(data)
+        products = ProductSerializer.setup_eager_loading(Product.objects.all())
+        variant_serializer = ProductVariantSerializer()
+        def to_row(p):
+            return {
+                'id': p.id,
+                'name': p.name,
+                'category': p.category.name if p.category else None,
+                'brand': p.brand.name if p.brand else None,
+                'status': p.status,
+                'variants': [variant_serializer.to_representation(v) for v in p.productvariant_set.all()]
+            }
+        return self._catalog_response(request, products, to_row)
 
-class ProductVariantViewSet(viewsets.ModelViewSet):
+class ProductVariantViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (Product, ProductWarehouseStock)
     queryset = ProductVariant.objects.all()
     serializer_class = ProductVariantSerializer
 
-class WarehouseViewSet(viewsets.ModelViewSet):
+class WarehouseViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     queryset = Warehouse.objects.all()
     serializer_class = WarehouseSerializer
 
-class ProductWarehouseStockViewSet(viewsets.ModelViewSet):
+class ProductWarehouseStockViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (ProductVariant, Product, Category, Brand, Warehouse)
     queryset = ProductWarehouseStock.objects.all()
     serializer_class = ProductWarehouseStockSerializer
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
 
-class SupplierProductViewSet(viewsets.ModelViewSet):
+class SupplierProductViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     queryset = SupplierProduct.objects.all()
     serializer_class = SupplierProductSerializer
 
-class PurchaseOrderViewSet(viewsets.ModelViewSet):
+class PurchaseOrderViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (PurchaseOrderItem, Supplier, ProductVariant, Product)
     queryset = PurchaseOrder.objects.all()
     serializer_class = PurchaseOrderSerializer
 
@@ -495,19 +406,20 @@ class PurchaseOrderReceiptItemViewSet(viewsets.ModelViewSet):
     queryset = PurchaseOrderReceiptItem.objects.all()
     serializer_class = PurchaseOrderReceiptItemSerializer
 
-class ExchangeRateViewSet(viewsets.ModelViewSet):
+class ExchangeRateViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     queryset = ExchangeRate.objects.all()
     serializer_class = ExchangeRateSerializer
 
-class CustomerTypeViewSet(viewsets.ModelViewSet):
+class CustomerTypeViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     queryset = CustomerType.objects.all()
     serializer_class = CustomerTypeSerializer
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
 
-class SalesOrderViewSet(viewsets.ModelViewSet):
+class SalesOrderViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (SalesOrderItem, ProductVariant, Product)
     queryset = SalesOrder.objects.all()
     serializer_class = SalesOrderSerializer
 
@@ -515,57 +427,159 @@ class SalesOrderItemViewSet(viewsets.ModelViewSet):
     queryset = SalesOrderItem.objects.all()
     serializer_class = SalesOrderItemSerializer
 
-class QuotationViewSet(viewsets.ModelViewSet):
-    queryset = Quotation.objects.all()
+class QuotationViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    conditional_models = (QuotationItem, Product)
+    # select_related dentro del prefetch: un prefetch de FK con miles de ids revienta en SQLite
+    queryset = Quotation.objects.prefetch_related(
+        Prefetch('details', queryset=QuotationItem.objects.select_related('product'))
+    )
     serializer_class = QuotationSerializer
 
 class QuotationItemViewSet(viewsets.ModelViewSet):
     queryset = QuotationItem.objects.all()
     serializer_class = QuotationItemSerializer
 
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from .stock import LOW_STOCK
+
 # Vista especial para inventario actual
+class InventoryKeysetPagination(KeysetPagination):
+    ordering = ('product_name', 'id')
+    page_size = 200
+
+
 class CurrentInventoryView(APIView):
+    """
+    Existencias por variante y almacén. Proyecta sólo las columnas necesarias con values()
+    (sin instanciar modelos) y aplica los filtros en SQL:
+    warehouse, category, brand (ids), search (nombre o SKU) y low_stock=true
+    (cantidad <= mínimo vigente, ver core.stock.STOCK_THRESHOLD).
+
+    Salida: páginas keyset por (producto, id) con ?page_size= / ?cursor=, CSV en
+    streaming con ?export=csv, o la lista completa de siempre.
+    """
     permission_classes = [IsAuthenticated]
-    
-    def get(self, request):
-        stocks = ProductWarehouseStock.objects.select_related(
-            'product_variant__product__category',
-            'product_variant__product__brand',
-            'warehouse'
-        ).all()
-        
-        data = []
-        for stock in stocks:
-            data.append({
-                'id': stock.id,
-                'product_variant': {
-                    'id': stock.product_variant.id,
-                    'name': stock.product_variant.name,
-                    'sku': stock.product_variant.sku,
-                    'product': {
-                        'name': stock.product_variant.product.name,
-                        'category': stock.product_variant.product.category.name if stock.product_variant.product.category else '',
-                        'brand': stock.product_variant.product.brand.name if stock.product_variant.product.brand else ''
-                    }
-                },
-                'warehouse': {
-                    'id': stock.warehouse.id,
-                    'name': stock.warehouse.name
+    csv_header = ['id', 'sku', 'variante', 'producto', 'categoria', 'marca', 'almacen', 'cantidad', 'minimo', 'actualizado']
+
+    def get_queryset(self, request):
+        params = request.query_params
+        queryset = ProductWarehouseStock.objects.values(
+            'id', 'warehouse_id', 'quantity', 'min_stock', 'updated_at',
+            variant_id=F('product_variant_id'),
+            variant_name=F('product_variant__name'),
+            variant_sku=F('product_variant__sku'),
+            product_name=F('product_variant__product__name'),
+            category_name=F('product_variant__product__category__name'),
+            brand_name=F('product_variant__product__brand__name'),
+            warehouse_name=F('warehouse__name'),
+        )
+        for param, lookup in (
+            ('warehouse', 'warehouse_id'),
+            ('category', 'product_variant__product__category_id'),
+            ('brand', 'product_variant__product__brand_id'),
+        ):
+            value = params.get(param, '').strip()
+            if value:
+                if not value.isdigit():
+                    raise ValidationError({param: 'Debe ser un id numérico'})
+                queryset = queryset.filter(**{lookup: value})
+        search = params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(
+                Q(product_variant__product__name__icontains=search) | Q(product_variant__sku__icontains=search)
+            )
+        if params.get('low_stock', '').lower() in ('1', 'true'):
+            queryset = queryset.filter(LOW_STOCK)
+        return queryset
+
+    @staticmethod
+    def to_row(row):
+        return {
+            'id': row['id'],
+            'product_variant': {
+                'id': row['variant_id'],
+                'name': row['variant_name'],
+                'sku': row['variant_sku'],
+                'product': {
+                    'name': row['product_name'],
+                    'category': row['category_name'] or '',
+                    'brand': row['brand_name'] or '',
                 },
-                'quantity': stock.quantity,
-                'updated_at': stock.updated_at
-            })
-        
-        return Response(data)
+            },
+            'warehouse': {
+                'id': row['warehouse_id'],
+                'name': row['warehouse_name'],
+            },
+            'quantity': row['quantity'],
+            'min_stock': row['min_stock'],
+            'updated_at': row['updated_at'],
+        }
+
+    @staticmethod
+    def to_csv_row(row):
+        return [
+            row['id'], row['variant_sku'], row['variant_name'], row['product_name'], row['category_name'] or '',
+            row['brand_name'] or '', row['warehouse_name'], row['quantity'], row['min_stock'],
+            row['updated_at'].isoformat() if row['updated_at'] else '',
+        ]
+
+    def get(self, request):
+        queryset = self.get_queryset(request)
+        if request.query_params.get('export') == 'csv':
+            return csv_response(
+                queryset.order_by(*InventoryKeysetPagination.ordering), self.csv_header, self.to_csv_row,
+                filename=f"inventario_{timezone.localdate():%Y%m%d}.csv",
+            )
+        paginator = InventoryKeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response([self.to_row(row) for row in page])
+        return Response([self.to_row(row) for row in queryset.order_by(*InventoryKeysetPagination.ordering)])
+
+# Alertas de existencia baja (ver core/alerts.py)
+class StockAlertViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    GET /api/stock-alerts/ alertas de existencia baja (canal de base de datos).
+    Filtros: status (ACTIVE por defecto, 'all' para todas), warehouse, level.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = CustomPageNumberPagination
+
+    def get_serializer_class(self):
+        from .serializers import StockAlertSerializer
+        return StockAlertSerializer
+
+    def get_queryset(self):
+        from .models import StockAlert
+        params = self.request.query_params
+        queryset = StockAlert.objects.select_related('product_variant', 'warehouse')
+        status_filter = params.get('status', 'ACTIVE').upper()
+        if status_filter != 'ALL':
+            queryset = queryset.filter(status=status_filter)
+        if params.get('warehouse', '').isdigit():
+            queryset = queryset.filter(warehouse_id=params['warehouse'])
+        if params.get('level'):
+            queryset = queryset.filter(level=params['level'].upper())
+        return queryset
+
+# Resumen del tablero: agregados en SQL con caché por sección (ver core/dashboard.py)
+class DashboardSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        from .dashboard import dashboard_summary
+        return Response({'generated_at': timezone.now(), **dashboard_summary()})
 
 # Vista para obtener lista de almacenes (simplificada)
 class WarehouseListView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        warehouses = Warehouse.objects.all()
-        data = [{'id': w.id, 'name': w.name} for w in warehouses]
-        return Response(data)
+        def build():
+            return [{'id': w.id, 'name': w.name} for w in Warehouse.objects.only('id', 'name')]
+        return cached_response(request, [Warehouse], build)
 
 # Función para obtener opciones de menú del usuario
 from django.http import JsonResponse
@@ -593,7 +607,9 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
     """
     ViewSet para movimientos de inventario con sistema de autorización
     """
-    queryset = InventoryMovement.objects.select_related('warehouse', 'user', 'authorized_by', 'cancelled_by').prefetch_related('details__product_variant__product').order_by('-created_at')
+    queryset = InventoryMovement.objects.select_related('warehouse', 'user', 'authorized_by', 'cancelled_by').prefetch_related(
+        Prefetch('details', queryset=InventoryMovementDetail.objects.select_related('product_variant__product'))
+    ).order_by('-created_at')
     serializer_class = InventoryMovementSerializer
     permission_classes = [IsAuthenticated]
 
@@ -625,93 +641,56 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
         """Asignar el usuario actual al crear un movimiento"""
         serializer.save(user=self.request.user)
     
+    def _created_movements_data(self, movements):
+        """Movimientos recién creados con el mismo select/prefetch del listado"""
+        queryset = self.get_queryset().filter(id__in=[m.id for m in movements])
+        return self.get_serializer(queryset, many=True).data
+
     def create(self, request, *args, **kwargs):
         """
-        Crear un movimiento de inventario con sus detalles
+        Crear un movimiento de inventario con sus detalles.
+        Variantes resueltas en una consulta y detalles con bulk_create (ver core/movements.py).
         """
-        import logging
-        from django.db import transaction
-        
-        logger = logging.getLogger(__name__)
-        
+        from .movements import BulkMovementError, create_movements
+        data = request.data
+        if not isinstance(data, dict):
+            return Response({'error': 'Se esperaba un objeto JSON.'}, status=status.HTTP_400_BAD_REQUEST)
+        data = {key: data.get(key) for key in data}
+        data['details'] = request.data.get('details') or []
         try:
-            # Obtener los datos del request
-            data = getattr(request, 'data', request.POST)
-            logger.info(f"📦 InventoryMovement CREATE - Data recibida: {data}")
-            
-            # Si los datos vienen como string, convertir a dict
-            if isinstance(data, str):
-                import json
-                data = json.loads(data)
-            
-            # Hacer una copia mutable de los datos
-            if hasattr(data, 'copy'):
-                data = data.copy()
-            else:
-                data = dict(data)
-            
-            # Extraer los detalles del request
-            details_data = data.pop('details', [])
-            logger.info(f"📦 Detalles extraídos: {details_data}")
-            
-            # Usar transacción para asegurar atomicidad
-            with transaction.atomic():
-                # Crear el movimiento principal
-                serializer = self.get_serializer(data=data)
-                if not serializer.is_valid():
-                    logger.error(f"📦 Error validando movimiento: {serializer.errors}")
-                    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-                
-                movement = serializer.save(user=request.user)
-                logger.info(f"📦 Movimiento creado con ID: {movement.id}")
-                
-                # Crear los detalles
-                created_details = []
-                for i, detail_data in enumerate(details_data):
-                    logger.info(f"📦 Procesando detalle {i}: {detail_data}")
-                    
-                    detail_data['movement'] = movement.id
-                    detail_serializer = InventoryMovementDetailSerializer(data=detail_data)
-                    
-                    if detail_serializer.is_valid():
-                        detail = detail_serializer.save(movement=movement)
-                        created_details.append(detail)
-                        logger.info(f"📦 Detalle creado: {detail.id}")
-                    else:
-                        logger.error(f"📦 Error validando detalle {i}: {detail_serializer.errors}")
-                        # La transacción se deshará automáticamente
-                        return Response({
-                            'error': 'Error en los detalles del movimiento',
-                            'detail_errors': detail_serializer.errors,
-                            'detail_index': i
-                        }, status=status.HTTP_400_BAD_REQUEST)
-                
-                logger.info(f"📦 Total detalles creados: {len(created_details)}")
-                
-                # Retornar el movimiento completo con detalles
-                headers = self.get_success_headers(serializer.data)
-                movement_data = self.get_serializer(movement).data
-                
-                return Response(
-                    movement_data, 
-                    status=status.HTTP_201_CREATED, 
-                    headers=headers
-                )
-                
-        except Exception as e:
-            logger.error(f"📦 Error general creando movimiento: {e}")
-            import traceback
-            traceback.print_exc()
-            return Response({
-                'error': 'Error interno del servidor',
-                'message': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
+            movement = create_movements([data], request.user)[0]
+        except BulkMovementError as exc:
+            first = exc.errors[0]
+            if 'detail_index' in first:
+                return Response({
+                    'error': 'Error en los detalles del movimiento',
+                    'detail_errors': first['errors'],
+                    'detail_index': first['detail_index'],
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return Response(first['errors'], status=status.HTTP_400_BAD_REQUEST)
+        return Response(self._created_movements_data([movement])[0], status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Alta masiva para escáneres y migraciones: {"movements": [...]} o una lista de movimientos.
+        Todo o nada en una transacción; los errores indican movement_index y detail_index.
+        """
+        from .movements import BulkMovementError, create_movements
+        movements = request.data.get('movements') if isinstance(request.data, dict) else request.data
+        if not isinstance(movements, list) or not movements:
+            return Response({'error': 'Se esperaba una lista de movimientos.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            created = create_movements(movements, request.user)
+        except BulkMovementError as exc:
+            return Response({'error': 'Movimientos inválidos', 'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'created': len(created), 'movements': self._created_movements_data(created)},
+                        status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['post'])
     def authorize(self, request, pk=None):
         """Autorizar un movimiento de inventario"""
         import logging
-        from django.utils import timezone
         
         logger = logging.getLogger(__name__)
         
@@ -739,11 +718,8 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Autorizar el movimiento
-            movement.authorized = True
-            movement.authorized_by = request.user
-            movement.authorized_at = timezone.now()
-            movement.save()
+            # Autorizar el movimiento y aplicar sus cantidades al stock
+            movement.authorize(request.user)
             
             logger.info(f"Movimiento {movement.id} autorizado por usuario {request.user.id}")
             
@@ -0,0 +1,25 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from .metrics import render_metrics
+
+
+@require_GET
+def metrics(request):
+    """
+    Endpoint de scrape para Prometheus; exige 'Authorization: Bearer <METRICS_TOKEN>'.
+    Sin METRICS_TOKEN sólo responde con DEBUG: fuera de él no se confía en que /metrics
+    quede fuera del proxy (403 hasta que se configure el token).
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token and not settings.DEBUG:
+        return HttpResponse('Defina METRICS_TOKEN para habilitar /metrics', status=403, content_type='text/plain')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return HttpResponse(status=401)
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
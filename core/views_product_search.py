@@ -1,14 +1,17 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Product
+from django.db.models import Prefetch
+from .models import Product, ProductVariant
+from .search import search_products
 from .serializers_product_search import ProductWithMainVariantSerializer
 
 class ProductSearchWithVariantView(APIView):
     def get(self, request):
         search = request.query_params.get('search', '').strip()
-        queryset = Product.objects.all()
-        if search:
-            queryset = queryset.filter(name__icontains=search)
+        queryset = Product.objects.select_related('category', 'brand').prefetch_related(
+            Prefetch('productvariant_set', queryset=ProductVariant.objects.order_by('id'))
+        )
+        queryset = search_products(queryset, search)
         serializer = ProductWithMainVariantSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
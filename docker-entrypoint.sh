@@ -15,22 +15,23 @@ echo "📋 Estado actual de migraciones:"
 python manage.py showmigrations
 
 # Estrategia de migraciones con manejo de errores
+# (sin statement_timeout: índices y rellenos de datos tardan más que una petición)
 echo "🔄 Aplicando migraciones..."
 
 # Intentar migración normal primero
-if python manage.py migrate --noinput; then
+if DATABASE_STATEMENT_TIMEOUT_MS=0 python manage.py migrate --noinput; then
     echo "✅ Migraciones aplicadas correctamente"
 else
     echo "⚠️  Error en migración normal, intentando resolución de conflictos..."
     
     # Si falla, intentar fake-initial
-    if python manage.py migrate --fake-initial; then
+    if DATABASE_STATEMENT_TIMEOUT_MS=0 python manage.py migrate --fake-initial; then
         echo "✅ Migraciones resueltas con --fake-initial"
     else
         echo "⚠️  Fake-initial falló, intentando fake completo..."
         
         # Como último recurso, marcar todo como fake
-        if python manage.py migrate --fake; then
+        if DATABASE_STATEMENT_TIMEOUT_MS=0 python manage.py migrate --fake; then
             echo "✅ Migraciones marcadas como aplicadas"
         else
             echo "❌ Error crítico en migraciones"
@@ -58,8 +59,21 @@ else:
     print('✅ Superusuario admin ya existe')
 "
 
-echo "🎉 Configuración completada, iniciando servidor Django con Gunicorn..."
-exec gunicorn maestro_inventario_backend.wsgi:application \
+# Métricas de Prometheus compartidas entre workers (se limpian en cada arranque)
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# SERVER_INTERFACE=asgi: workers de uvicorn (vistas asíncronas del Product Center)
+if [ "$SERVER_INTERFACE" = "asgi" ]; then
+    APPLICATION="maestro_inventario_backend.asgi:application --worker-class uvicorn.workers.UvicornWorker"
+else
+    APPLICATION="maestro_inventario_backend.wsgi:application"
+fi
+
+echo "🎉 Configuración completada, iniciando servidor Django con Gunicorn ($APPLICATION)..."
+exec gunicorn $APPLICATION \
+    --config gunicorn.conf.py \
     --bind 0.0.0.0:8030 \
     --workers 3 \
     --timeout 120 \
@@ -0,0 +1,10 @@
+# Configuración de gunicorn que complementa los flags de docker-entrypoint.sh.
+# Con PROMETHEUS_MULTIPROC_DIR cada worker escribe sus métricas en ese directorio;
+# al terminar un worker se marcan como muertos sus gauges para que /metrics no los sume.
+import os
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
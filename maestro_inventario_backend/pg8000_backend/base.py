@@ -1,45 +1,416 @@
 """
-Backend personalizado de Django usando pg8000 en lugar de psycopg2
+Backend personalizado de Django usando pg8000 en lugar de psycopg2.
+
+Reutiliza el backend de PostgreSQL de Django (SQL, migraciones, introspección) y cambia
+el controlador. Además de la conexión básica:
+
+- Cursores del lado del servidor: .iterator() usa DECLARE ... CURSOR y lee por bloques
+  con FETCH FORWARD, como psycopg, en lugar de traer todo el resultado a memoria.
+- Sentencias preparadas: una consulta que se repite OPTIONS['prepare_threshold'] veces en
+  la misma conexión se prepara con nombre y las siguientes ejecuciones cuestan un solo
+  viaje al servidor (pg8000 hace tres por cada sentencia sin nombre). Se guardan hasta
+  OPTIONS['prepared_max'] por conexión (LRU). prepare_threshold=None las desactiva.
+- Pool: OPTIONS['pool'] = {'min_size', 'max_size', 'timeout', 'max_idle', 'max_lifetime'}
+  (ver pool.py), con CONN_MAX_AGE=0 como exige Django para los pools.
+- OPTIONS['options'] ('-c statement_timeout=...') y OPTIONS['connect_timeout'] se pasan
+  al arranque de la conexión, como en libpq.
+
+La importación del backend de PostgreSQL de Django sigue requiriendo psycopg2 o psycopg
+instalado; las consultas sí van por pg8000.
+
+Las sentencias preparadas y los cursores usan partes internas de pg8000 (execute_named,
+execute_unnamed, _statement_nums, _transaction_status): requirements.txt fija la versión
+probada y core/tests/test_pg8000_backend.py las prueba contra PostgreSQL.
 """
-from django.db.backends.postgresql import base
+import json
+import re
+import ssl
+from collections import OrderedDict
+
 import pg8000
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.features import DatabaseFeatures as PostgresFeatures
+from django.db.backends.postgresql.operations import DatabaseOperations as PostgresOperations
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.db.backends.postgresql.schema import DatabaseSchemaEditor as PostgresSchemaEditor
+from django.utils.asyncio import async_unsafe
+from django.utils.functional import cached_property
+from pg8000.converters import JSON, JSONB, literal, make_params
+from pg8000.core import IN_FAILED_TRANSACTION
+from pg8000.dbapi import convert_paramstyle
+from pg8000.legacy import Cursor as LegacyCursor
+
+from .pool import ConnectionPool
+
+PREPARE_THRESHOLD = 5
+PREPARED_MAX = 100
+# Errores por los que una sentencia preparada deja de servir (cambio de esquema, DISCARD ALL)
+STALE_STATEMENT_CODES = {'0A000', '26000'}
+
+
+def _error_code(exc):
+    detail = exc.args[0] if exc.args else None
+    return detail.get('C') if isinstance(detail, dict) else None
+
+
+def _translate_error(exc):
+    """Misma clasificación que pg8000.legacy.Cursor.execute para los errores del servidor"""
+    detail = exc.args[0] if exc.args else None
+    if not isinstance(detail, dict):
+        return pg8000.ProgrammingError(detail)
+    if detail.get('C') == '28000':
+        return pg8000.InterfaceError(detail)
+    if detail.get('C') == '23505':
+        return pg8000.IntegrityError(detail)
+    return pg8000.ProgrammingError(detail)
+
+
+class StatementCache:
+    """Sentencias preparadas de una conexión, por texto de la consulta (LRU)"""
+
+    def __init__(self, connection, threshold=PREPARE_THRESHOLD, size=PREPARED_MAX):
+        self.connection = connection
+        self.threshold = threshold
+        self.size = size
+        self.prepared = OrderedDict()  # sentencia -> (nombre, columnas, conversores)
+        self.seen = OrderedDict()      # sentencia -> ejecuciones sin preparar
+
+    def lookup(self, statement):
+        """La sentencia preparada o None; la prepara al llegar al umbral de ejecuciones"""
+        if self.threshold is None:
+            return None
+        prepared = self.prepared.get(statement)
+        if prepared is not None:
+            self.prepared.move_to_end(statement)
+            return prepared
+        count = self.seen.pop(statement, 0) + 1
+        if count < self.threshold:
+            self.seen[statement] = count
+            if len(self.seen) > self.size * 4:
+                self.seen.popitem(last=False)
+            return None
+        prepared = self.connection.prepare_statement(statement, ())
+        self.prepared[statement] = prepared
+        if len(self.prepared) > self.size:
+            _, (name, _, _) = self.prepared.popitem(last=False)
+            self._close(name)
+        return prepared
+
+    def discard(self, statement):
+        prepared = self.prepared.pop(statement, None)
+        if prepared is not None:
+            self._close(prepared[0])
+
+    def _close(self, name):
+        try:
+            self.connection.close_prepared_statement(name)
+        except Exception:
+            self.connection._statement_nums.discard(name)
+
+
+class Cursor(LegacyCursor):
+    """
+    Cursor de pg8000 con el estilo de parámetros de psycopg (%s, %% literal aun sin
+    parámetros) y ejecución por sentencias preparadas para las consultas frecuentes.
+    """
+
+    def execute(self, operation, args=None, stream=None):
+        if args is None or stream is not None:
+            return super().execute(operation, args or (), stream=stream)
+        connection = self._c
+        if not args:
+            return super().execute(operation.replace('%%', '%'))
+        statement, values = convert_paramstyle('format', operation, args)
+        statement = statement.replace('%%', '%')  # pg8000 no lo convierte dentro de comillas
+        cache = getattr(connection, 'statement_cache', None)
+        try:
+            prepared = cache.lookup(statement) if cache is not None else None
+        except pg8000.DatabaseError as exc:
+            raise _translate_error(exc)
+        if prepared is None:
+            return self._execute_unnamed(statement, values)
+        name, columns, input_funcs = prepared
+        try:
+            if not connection._in_transaction and not connection.autocommit:
+                connection.execute_simple('begin transaction')
+            self._context = connection.execute_named(
+                name, make_params(connection.py_types, values), columns, input_funcs, statement,
+            )
+        except pg8000.DatabaseError as exc:
+            if _error_code(exc) in STALE_STATEMENT_CODES:
+                cache.discard(statement)
+            raise _translate_error(exc)
+        self._row_iter = iter(self._context.rows or [])
+        self._input_oids = ()
+        return self
+
+    def _execute_unnamed(self, statement, values):
+        connection = self._c
+        try:
+            if not connection._in_transaction and not connection.autocommit:
+                connection.execute_simple('begin transaction')
+            self._context = connection.execute_unnamed(statement, vals=values, oids=self._input_oids)
+        except pg8000.DatabaseError as exc:
+            raise _translate_error(exc)
+        self._row_iter = iter(self._context.rows or [])
+        self._input_oids = ()
+        return self
+
+
+class ServerSideCursor:
+    """
+    Cursor con nombre: DECLARE al ejecutar y FETCH FORWARD por bloques al leer. En modo
+    autocommit se declara WITH HOLD para que sobreviva fuera de la transacción (igual que
+    los cursores con nombre de psycopg en Django).
+    """
+    itersize = 2000
+
+    def __init__(self, connection, name, withhold=False):
+        self._cursor = Cursor(connection)
+        self.name = name
+        self.withhold = withhold
+        self.declared = False
+
+    @property
+    def _quoted_name(self):
+        return '"%s"' % self.name.replace('"', '""')
+
+    def execute(self, operation, args=None):
+        hold = ' WITH HOLD' if self.withhold else ''
+        declare = f'DECLARE {self._quoted_name} NO SCROLL CURSOR{hold} FOR {operation}'
+        if args:
+            statement, values = convert_paramstyle('format', declare, args)
+            self._cursor._execute_unnamed(statement.replace('%%', '%'), values)
+        else:
+            self._cursor.execute(declare, args)
+        self.declared = True
+        return self
+
+    def executemany(self, operation, param_sets):
+        raise pg8000.NotSupportedError('executemany no está disponible en cursores del lado del servidor')
+
+    def _fetch(self, amount):
+        self._cursor.execute(f'FETCH FORWARD {amount} FROM {self._quoted_name}')
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=None):
+        return self._fetch(int(size or self.itersize))
+
+    def fetchone(self):
+        rows = self._fetch(1)
+        return rows[0] if rows else None
+
+    def fetchall(self):
+        return self._fetch('ALL')
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany()
+            if not rows:
+                return
+            yield from rows
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        connection = self._cursor._c
+        if self.declared and connection is not None and connection._sock is not None:
+            self.declared = False
+            try:
+                # en una transacción fallida el cursor ya no existe y el CLOSE fallaría
+                if connection._transaction_status != IN_FAILED_TRANSACTION:
+                    connection.execute_simple(f'CLOSE {self._quoted_name}')
+            except pg8000.Error:
+                pass
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DatabaseFeatures(PostgresFeatures):
+    empty_fetchmany_value = ()  # pg8000 devuelve tuplas en fetchmany()
+
+
+class DatabaseOperations(PostgresOperations):
+    def compose_sql(self, sql, params):
+        return sql % tuple(literal(param) for param in params or ())
+
+    def last_executed_query(self, cursor, sql, params):
+        return BaseDatabaseOperations.last_executed_query(self, cursor, sql, params)
+
+    def adapt_json_value(self, value, encoder):
+        return json.dumps(value, cls=encoder)
+
+    def adapt_ipaddressfield_value(self, value):
+        return value or None
+
+
+class DatabaseSchemaEditor(PostgresSchemaEditor):
+    def quote_value(self, value):
+        return literal(value)
 
 
 class DatabaseWrapper(base.DatabaseWrapper):
     """
     Wrapper de base de datos que usa pg8000 en lugar de psycopg2
     """
-    
-    def __init__(self, *args, **kwargs):
-        # Reemplazar el módulo Database con pg8000
-        super().__init__(*args, **kwargs)
-        self.Database = pg8000
-        
+    Database = pg8000
+    features_class = DatabaseFeatures
+    ops_class = DatabaseOperations
+    SchemaEditorClass = DatabaseSchemaEditor
+    _pg8000_pools = {}
+
+    @property
+    def pool(self):
+        pool_options = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+        if self.alias not in self._pg8000_pools:
+            if self.settings_dict.get('CONN_MAX_AGE', 0) != 0:
+                raise ImproperlyConfigured("Pooling doesn't support persistent connections.")
+            conn_params = self.get_connection_params()
+            pool = ConnectionPool(
+                connect=lambda: self._connect(conn_params),
+                configure=self._configure_connection,
+                check=self._check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+                **({} if pool_options is True else pool_options),
+            )
+            self._pg8000_pools.setdefault(self.alias, pool)
+        return self._pg8000_pools[self.alias]
+
+    def close_pool(self):
+        pool = self._pg8000_pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        """Parámetros de pg8000.connect a partir de DATABASES (NAME/USER/.../OPTIONS)"""
+        settings_dict = self.settings_dict
+        options = settings_dict['OPTIONS']
+        if not settings_dict['NAME'] and settings_dict['NAME'] is not None:
+            raise ImproperlyConfigured('settings.DATABASES is improperly configured. Please supply the NAME value.')
+        startup = {}
+        if options.get('options'):
+            startup['options'] = options['options']
+        if self.timezone_name:
+            startup['TimeZone'] = self.timezone_name  # evita el SET TIME ZONE posterior
+        params = {
+            'database': settings_dict['NAME'] or 'postgres',
+            'user': settings_dict['USER'],
+            'password': settings_dict['PASSWORD'] or None,
+            'host': settings_dict['HOST'] or 'localhost',
+            'port': int(settings_dict['PORT'] or 5432),
+            'application_name': options.get('application_name'),
+            'timeout': options.get('connect_timeout'),
+            'startup_params': startup,
+        }
+        sslmode = options.get('sslmode', 'prefer')
+        if sslmode in ('require', 'verify-ca', 'verify-full'):
+            context = ssl.create_default_context(cafile=options.get('sslrootcert'))
+            if sslmode == 'require':
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            elif sslmode == 'verify-ca':
+                context.check_hostname = False
+            params['ssl_context'] = context
+        return params
+
+    def _connect(self, conn_params):
+        connection = pg8000.connect(**conn_params)
+        # JSON como texto: JSONField.from_db_value hace json.loads (igual que con psycopg2)
+        connection.register_in_adapter(JSON, str)
+        connection.register_in_adapter(JSONB, str)
+        options = self.settings_dict['OPTIONS']
+        connection.statement_cache = StatementCache(
+            connection,
+            threshold=options.get('prepare_threshold', PREPARE_THRESHOLD),
+            size=options.get('prepared_max', PREPARED_MAX),
+        )
+        return connection
+
+    @async_unsafe
     def get_new_connection(self, conn_params):
         """
-        Crear una nueva conexión usando pg8000
+        Crear una nueva conexión usando pg8000 (o tomarla del pool)
         """
-        # Mapear los parámetros de Django a pg8000
-        pg8000_params = {
-            'database': conn_params['database'],
-            'user': conn_params['user'],
-            'password': conn_params['password'],
-            'host': conn_params['host'],
-            'port': conn_params['port'],
-        }
-        
-        # Establecer UTF-8 como encoding por defecto
-        pg8000_params['client_encoding'] = 'utf8'
-        
-        return pg8000.connect(**pg8000_params)
-        
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel(isolation_level) if isolation_level is not None else IsolationLevel.READ_COMMITTED
+        except ValueError:
+            raise ImproperlyConfigured(f'Invalid transaction isolation level {isolation_level} specified.')
+        if self.pool:
+            self.pool.open()
+            connection = self.pool.getconn()
+        else:
+            connection = self._connect(conn_params)
+        if isolation_level is not None:
+            level = self.isolation_level.name.replace('_', ' ')
+            connection.execute_simple(f'SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL {level}')
+        return connection
+
+    def _configure_timezone(self, connection):
+        timezone_name = self.timezone_name
+        if timezone_name and connection.parameter_statuses.get('TimeZone') != timezone_name:
+            connection.execute_simple(f'SET TIME ZONE {literal(timezone_name)}')
+            return True
+        return False
+
+    def _configure_role(self, connection):
+        new_role = self.settings_dict['OPTIONS'].get('assume_role')
+        if new_role:
+            connection.execute_simple(f'SET ROLE {self.ops.quote_name(new_role)}')
+            return True
+        return False
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                if self.pool:
+                    self.pool.putconn(self.connection)
+                    self.connection = None
+                else:
+                    return self.connection.close()
+
+    @async_unsafe
     def create_cursor(self, name=None):
         """
-        Crear un cursor personalizado
+        Crear un cursor; con nombre es un cursor del lado del servidor (chunked_cursor / .iterator())
         """
         if name:
-            # pg8000 no soporta cursores con nombre directamente
-            cursor = self.connection.cursor()
-        else:
-            cursor = self.connection.cursor()
-        return cursor
+            return ServerSideCursor(self.connection, name, withhold=self.connection.autocommit)
+        return Cursor(self.connection)
+
+    @staticmethod
+    def _check_connection(connection):
+        try:
+            connection.execute_simple('SELECT 1')
+        except (pg8000.Error, OSError):
+            return False
+        return True
+
+    def is_usable(self):
+        return self.connection is not None and self._check_connection(self.connection)
+
+    @staticmethod
+    def parse_server_version(value):
+        """'16.2 (Debian 16.2-1)' -> 160002, el formato de server_version_num"""
+        match = re.match(r'(\d+)(?:\.(\d+))?', value)
+        return int(match.group(1)) * 10000 + int(match.group(2) or 0)
+
+    @cached_property
+    def pg_version(self):
+        with self.temporary_connection():
+            return self.parse_server_version(self.connection.parameter_statuses['server_version'])
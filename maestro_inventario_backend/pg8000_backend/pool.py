@@ -0,0 +1,173 @@
+"""
+Pool de conexiones para el backend pg8000 (equivalente a OPTIONS['pool'] de psycopg 3).
+
+Un pool por proceso y alias de base de datos. Las conexiones libres se reutilizan en orden
+LIFO (la última devuelta conserva calientes sus sentencias preparadas); se cierran las que
+superan max_lifetime y, por encima de min_size, las que llevan más de max_idle ociosas.
+Si el proceso se bifurca (fork) el hijo descarta las conexiones heredadas sin tocarlas.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import pg8000
+
+
+class PoolTimeout(pg8000.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, configure=None, check=None, min_size=2, max_size=10, timeout=10.0,
+                 max_idle=300.0, max_lifetime=3600.0):
+        if min_size > max_size:
+            raise ValueError('min_size no puede ser mayor que max_size')
+        self.connect = connect        # () -> conexión nueva
+        self.configure = configure    # (conexión) -> None, al crearla
+        self.check = check            # (conexión) -> bool, antes de entregar una conexión libre
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._condition = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = deque()          # (conexión, creada, devuelta)
+        self._size = 0                # conexiones abiertas: libres + prestadas
+        self._closed = False
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset()  # los sockets son del padre: no se cierran desde el hijo
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def open(self):
+        """Crea de antemano min_size conexiones"""
+        with self._condition:
+            self._check_fork()
+            self._closed = False
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            try:
+                connection, created = self._new_connection()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            self.putconn(connection, created=created)
+
+    def _new_connection(self):
+        connection = self.connect()
+        if self.configure:
+            self.configure(connection)
+        return connection, time.monotonic()
+
+    def _expire_idle(self, now):
+        """Saca de la cola las conexiones vencidas (se cierran fuera del candado)"""
+        expired = []
+        kept = deque()
+        for connection, created, returned in self._idle:  # de la más antigua a la más reciente
+            too_old = now - created > self.max_lifetime
+            too_idle = now - returned > self.max_idle and self._size - len(expired) > self.min_size
+            if too_old or too_idle:
+                expired.append(connection)
+            else:
+                kept.append((connection, created, returned))
+        self._idle = kept
+        self._size -= len(expired)
+        return expired
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            create = False
+            expired = []
+            with self._condition:
+                self._check_fork()
+                if self._closed:
+                    raise pg8000.OperationalError('El pool de conexiones está cerrado')
+                while True:
+                    now = time.monotonic()
+                    expired += self._expire_idle(now)
+                    if self._idle:
+                        connection, created, _ = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolTimeout(f'Sin conexiones libres tras {self.timeout:g}s ({self.max_size} en uso)')
+                    self._condition.wait(remaining)
+            self._close_all(expired)
+
+            if create:
+                try:
+                    connection, created = self._new_connection()
+                except Exception:
+                    self._discard()
+                    raise
+            elif self.check and not self.check(connection):
+                self._close_all([connection])
+                self._discard()
+                continue
+            connection._pool_created = created
+            return connection
+
+    def putconn(self, connection, created=None):
+        """Devuelve una conexión: se revierte la transacción abierta o se cierra si está rota"""
+        created = getattr(connection, '_pool_created', created)
+        try:
+            if connection._in_transaction:
+                connection.rollback()
+            connection.autocommit = True
+            reusable = True
+        except Exception:
+            reusable = False
+        with self._condition:
+            if self._pid != os.getpid():
+                return
+            now = time.monotonic()
+            if reusable and not self._closed and now - created <= self.max_lifetime:
+                self._idle.append((connection, created, now))
+                self._condition.notify()
+                return
+        self._close_all([connection])
+        self._discard()
+
+    def _discard(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._check_fork()
+            self._closed = True
+            connections = [connection for connection, _, _ in self._idle]
+            self._size -= len(connections)
+            self._idle.clear()
+            self._condition.notify_all()
+        self._close_all(connections)
+
+    @staticmethod
+    def _close_all(connections):
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
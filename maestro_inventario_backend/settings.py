@@ -1,4 +1,5 @@
 import os
+import sys
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 """
@@ -56,6 +57,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -105,6 +107,47 @@ DATABASE_PORT = os.getenv('DATABASE_PORT', '5438')
 
 # Configuración para la base de datos (SQLite para desarrollo, PostgreSQL para producción)
 
+# Conexiones: persistentes por worker (CONN_MAX_AGE segundos, con chequeo de salud antes de
+# reutilizarlas) o, con DATABASE_POOL=True, un pool por proceso: el de psycopg 3 (requiere
+# `pip install "psycopg[binary,pool]"`) o el del backend pg8000. Django no admite pool y
+# CONN_MAX_AGE a la vez.
+# DATABASE_STATEMENT_TIMEOUT_MS (0 = sin límite) corta en el servidor las consultas que excedan
+# ese tiempo; los respaldos y los demás comandos largos lo desactivan en su conexión
+# (core/db.py: without_statement_timeout). migrate se corre con DATABASE_STATEMENT_TIMEOUT_MS=0
+# (como en docker-entrypoint.sh).
+# Con SERVER_INTERFACE=asgi (uvicorn, ver docker-entrypoint.sh) cada petición abre su conexión
+# en su propio contexto y una persistente nunca se reutiliza: CONN_MAX_AGE es 0 por defecto
+# y conviene DATABASE_POOL=True.
+SERVER_INTERFACE = os.getenv('SERVER_INTERFACE', 'wsgi')
+DATABASE_CONN_MAX_AGE = int(os.getenv('DATABASE_CONN_MAX_AGE', '0' if SERVER_INTERFACE == 'asgi' else '60'))
+DATABASE_CONN_HEALTH_CHECKS = os.getenv('DATABASE_CONN_HEALTH_CHECKS', 'True') == 'True'
+DATABASE_CONNECT_TIMEOUT = int(os.getenv('DATABASE_CONNECT_TIMEOUT', '10'))
+DATABASE_STATEMENT_TIMEOUT_MS = int(os.getenv('DATABASE_STATEMENT_TIMEOUT_MS', '0'))
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'False') == 'True'
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+    'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),        # espera máxima por una conexión libre
+    'max_idle': float(os.getenv('DATABASE_POOL_MAX_IDLE', '300')),     # cierra las ociosas por encima de min_size
+    'max_lifetime': float(os.getenv('DATABASE_POOL_MAX_LIFETIME', '3600')),
+}
+
+# Backend pg8000 (sin libpq): DATABASE_ENGINE=maestro_inventario_backend.pg8000_backend. Usa el
+# mismo pool y prepara las consultas que se repiten DATABASE_PREPARE_THRESHOLD veces por conexión.
+PG8000_ENGINE = 'maestro_inventario_backend.pg8000_backend'
+DATABASE_PREPARE_THRESHOLD = int(os.getenv('DATABASE_PREPARE_THRESHOLD', '5'))
+
+DATABASE_OPTIONS = {}
+if DATABASE_ENGINE in ('django.db.backends.postgresql', PG8000_ENGINE):
+    server_options = '-c client_encoding=UTF8'
+    if DATABASE_STATEMENT_TIMEOUT_MS:
+        server_options += f' -c statement_timeout={DATABASE_STATEMENT_TIMEOUT_MS}'
+    DATABASE_OPTIONS = {'options': server_options, 'connect_timeout': DATABASE_CONNECT_TIMEOUT}
+    if DATABASE_POOL:
+        DATABASE_OPTIONS['pool'] = DATABASE_POOL_OPTIONS
+    if DATABASE_ENGINE == PG8000_ENGINE:
+        DATABASE_OPTIONS['prepare_threshold'] = DATABASE_PREPARE_THRESHOLD or None
+
 DATABASES = {
         'default': {
             'ENGINE': DATABASE_ENGINE,
@@ -113,9 +156,9 @@ DATABASES = {
             'PASSWORD': DATABASE_PASSWORD,
             'HOST': DATABASE_HOST,
             'PORT': DATABASE_PORT,
-            'OPTIONS': {
-                'options': '-c client_encoding=UTF8'
-            } if DATABASE_ENGINE == 'django.db.backends.postgresql' else {},
+            'CONN_MAX_AGE': 0 if 'pool' in DATABASE_OPTIONS else DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DATABASE_CONN_HEALTH_CHECKS,
+            'OPTIONS': DATABASE_OPTIONS,
         }
     }
 
@@ -198,6 +241,82 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+from celery.schedules import crontab
+CELERY_BEAT_SCHEDULE = {
+    # Cierre mensual de saldos para el kardex (día 1 de cada mes)
+    'create-stock-snapshots': {
+        'task': 'core.tasks.create_stock_snapshots',
+        'schedule': crontab(minute=30, hour=0, day_of_month=1),
+    },
+    # Alertas de existencia baja: sólo escribe/notifica cambios de estado
+    'scan-stock-alerts': {
+        'task': 'core.tasks.send_low_stock_report',
+        'schedule': int(os.getenv('STOCK_ALERT_SCAN_SECONDS', '300')),
+    },
+}
+
+# Canales de las alertas de stock (core/alerts.py): DatabaseChannel, EmailChannel, WebhookChannel
+STOCK_ALERT_CHANNELS = [
+    f'core.alerts.{name.strip()}' for name in os.getenv('STOCK_ALERT_CHANNELS', 'DatabaseChannel').split(',') if name.strip()
+]
+STOCK_ALERT_EMAILS = [email.strip() for email in os.getenv('STOCK_ALERT_EMAILS', '').split(',') if email.strip()]
+STOCK_ALERT_WEBHOOK_URL = os.getenv('STOCK_ALERT_WEBHOOK_URL', '')
+
+# Respaldos por tabla (core/backup.py): directorio, filas por archivo y cuánto antes del
+# inicio de un respaldo empieza el siguiente incremental (transacciones largas, relojes desfasados)
+BACKUP_DIR = Path(os.getenv('BACKUP_DIR', BASE_DIR / 'backups'))
+BACKUP_CHUNK_ROWS = int(os.getenv('BACKUP_CHUNK_ROWS', '100000'))
+BACKUP_WATERMARK_MARGIN_SECONDS = int(os.getenv('BACKUP_WATERMARK_MARGIN_SECONDS', '300'))
+
+# Resumen del Product Center (core/product_center.py): secciones en paralelo, cada una en su
+# hilo y con su conexión. Sólo conviene con pool: sin él cada sección abre una conexión nueva.
+PRODUCT_OVERVIEW_CONCURRENT = os.getenv('PRODUCT_OVERVIEW_CONCURRENT', str(DATABASE_POOL)) == 'True'
+
+# Importaciones CSV: en modo eager (por defecto) se procesan dentro de la petición y responden
+# 201 con el resultado. False las encola en Celery (202 con el ImportJob): sólo con un worker
+# corriendo (celery -A maestro_inventario_backend worker), o los trabajos quedan en PENDING.
+IMPORT_JOBS_EAGER = os.getenv('IMPORT_JOBS_EAGER', 'True') == 'True'
+
+# Caché de catálogos en Redis; memoria local en pruebas o con USE_REDIS_CACHE=False
+TESTING = 'test' in sys.argv or 'pytest' in sys.modules
+if os.getenv('USE_REDIS_CACHE', 'True') == 'True' and not TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/1'),
+            'KEY_PREFIX': 'maestro',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'maestro-inventario',
+        }
+    }
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '3600'))
+# TTL corto de cada sección de /api/dashboard/summary/ (además se invalida por versión)
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '60'))
+
+# Índice de autocompletado en memoria: reconstrucción completa por worker cada N segundos
+AUTOCOMPLETE_REFRESH_SECONDS = int(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', '300'))
+
+# Métricas por petición (core/middleware.py): Server-Timing y log estructurado en 'core.requests'
+REQUEST_METRICS = {
+    'ENABLED': os.getenv('REQUEST_METRICS_ENABLED', 'True') == 'True',
+    'QUERY_BUDGET': int(os.getenv('REQUEST_QUERY_BUDGET', '50')),
+    'DUPLICATE_QUERY_BUDGET': int(os.getenv('REQUEST_DUPLICATE_QUERY_BUDGET', '20')),
+    'TIME_BUDGET_MS': int(os.getenv('REQUEST_TIME_BUDGET_MS', '1000')),
+    'DB_TIME_BUDGET_MS': int(os.getenv('REQUEST_DB_TIME_BUDGET_MS', '500')),
+    'SERVER_TIMING': os.getenv('REQUEST_SERVER_TIMING', 'True') == 'True',
+    'TIMING_ALLOW_ORIGIN': os.getenv('REQUEST_TIMING_ALLOW_ORIGIN', ''),
+    'PROMETHEUS': os.getenv('REQUEST_PROMETHEUS', 'True') == 'True',
+}
+
+# /metrics (Prometheus): con varios workers de gunicorn definir PROMETHEUS_MULTIPROC_DIR (ver core/metrics.py).
+# Con DEBUG=False sólo responde si METRICS_TOKEN está definido (403 si no) y se envía como Bearer.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOWED_ORIGINS = [
@@ -228,6 +347,9 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'filename': 'django_error.log',
         },
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
     },
     'loggers': {
         'django': {
@@ -235,5 +357,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        # Una línea JSON por petición; WARNING si excede los presupuestos de REQUEST_METRICS
+        'core.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'WARNING' if TESTING else 'INFO'),
+            'propagate': False,
+        },
     },
 }
@@ -29,27 +29,18 @@ def limpiar_precio(precio_str):
         print(f"⚠️  Precio inválido encontrado: '{precio_str}', usando 0.00")
         return Decimal('0.00')
 
+_matcher = None
+
 def buscar_producto(nombre_csv):
-    """Buscar producto en la base de datos por nombre"""
+    """Buscar producto en la base de datos por nombre (coincidencia difusa de core.matching)"""
+    global _matcher
     try:
-        # Buscar exacto primero
-        producto = Product.objects.filter(name__iexact=nombre_csv).first()
-        if producto:
-            return producto
-        
-        # Buscar que contenga el nombre
-        producto = Product.objects.filter(name__icontains=nombre_csv).first()
-        if producto:
-            return producto
-        
-        # Buscar por palabras clave principales
-        palabras = nombre_csv.split()[:3]  # Primeras 3 palabras
-        for palabra in palabras:
-            if len(palabra) > 3:  # Solo palabras significativas
-                producto = Product.objects.filter(name__icontains=palabra).first()
-                if producto:
-                    return producto
-        
+        if _matcher is None:
+            from core.matching import catalog_matcher
+            _matcher = catalog_matcher()  # una consulta para todo el archivo
+        resultado = _matcher.match(nombre_csv)
+        if resultado:
+            return Product.objects.get(id=resultado.product_id)
         return None
     except Exception as e:
         print(f"Error buscando producto '{nombre_csv}': {e}")